@@ -0,0 +1,125 @@
+'''
+Compares the time from request to visible popup for a resident daemon and for a fresh process.
+
+The daemon is started once with "python -m popui serve" and then asked to show a popup over its
+socket or pipe. The cold start runs a new Python process per show, which imports popui and
+builds the popup before showing it, like a script that creates its own Popup.
+
+Run from the repository root:
+    python -m benchmarks.daemon --simulated
+    python -m benchmarks.daemon --runs 20 --buttons 200
+'''
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from popui.daemon import request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+BUILD = '''
+def build(popup):
+    for i in range({buttons}):
+        popup.add_button(f'Button {{i}}', popup.no_op)
+'''
+
+SERVE = BUILD + '''
+def add(daemon):
+    daemon.add('bench', build)
+'''
+
+COLD = BUILD + '''
+from popui import Popup
+backend = None
+if {simulated}:
+    from popui.simulated import SimulatedBackend
+    backend = SimulatedBackend()
+popup = Popup(None, build, backend=backend)
+popup.show()
+print('shown', flush=True)
+popup.quit()
+popup.step()
+'''
+
+
+def percentiles(samples):
+    samples = sorted(samples)
+    return samples[len(samples) // 2] * 1000, samples[int(len(samples) * 0.95)] * 1000
+
+
+def warm(runs: int, buttons: int, simulated: bool):
+    directory = tempfile.mkdtemp()
+    with open(os.path.join(directory, 'bench_popups.py'), 'w') as file:
+        file.write(SERVE.format(buttons=buttons))
+    address = rf'\\.\pipe\popui-bench-{os.getpid()}' if sys.platform == 'win32' \
+        else os.path.join(directory, 'popui.sock')
+    command = [sys.executable, '-m', 'popui', '--address', address, 'serve', '--render-on-demand',
+               '--popups', 'bench_popups:add']
+    if simulated:
+        command.append('--simulated')
+    environment = dict(os.environ, PYTHONPATH=os.pathsep.join([ROOT, directory]))
+    daemon = subprocess.Popen(command, env=environment)
+    try:
+        start = time.perf_counter()
+        while True:
+            try:
+                request({'op': 'ping'}, address)
+                break
+            except OSError:
+                if daemon.poll() is not None or time.perf_counter() - start > 30:
+                    raise RuntimeError("The daemon did not start")
+                time.sleep(0.01)
+        startup = time.perf_counter() - start
+
+        shows, pings = [], []
+        for _ in range(runs):
+            start = time.perf_counter()
+            request({'op': 'ping'}, address)
+            pings.append(time.perf_counter() - start)
+            start = time.perf_counter()
+            response = request({'op': 'show', 'popup': 'bench'}, address)
+            shows.append(time.perf_counter() - start)
+            assert response['ok'], response
+            request({'op': 'hide'}, address)
+        request({'op': 'quit'}, address)
+        daemon.wait(10)
+    finally:
+        if daemon.poll() is None:
+            daemon.kill()
+    return startup, shows, pings
+
+
+def cold(runs: int, buttons: int, simulated: bool):
+    script = COLD.format(buttons=buttons, simulated=simulated)
+    environment = dict(os.environ, PYTHONPATH=ROOT)
+    shows = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        process = subprocess.Popen([sys.executable, '-c', script], env=environment, stdout=subprocess.PIPE, text=True)
+        process.stdout.readline()
+        shows.append(time.perf_counter() - start)
+        process.wait(10)
+    return shows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--buttons', type=int, default=100, help='Buttons in the benchmarked popup')
+    parser.add_argument('--simulated', action='store_true', help='Use the simulated backend')
+    args = parser.parse_args()
+
+    startup, shows, pings = warm(args.runs, args.buttons, args.simulated)
+    cold_shows = cold(args.runs, args.buttons, args.simulated)
+    print(f"daemon startup: {startup * 1000:.1f} ms (once)\n")
+    print(f"{'path':<22}{'p50 ms':>10}{'p95 ms':>10}")
+    for name, samples in (('daemon ping', pings), ('daemon show', shows), ('cold process show', cold_shows)):
+        p50, p95 = percentiles(samples)
+        print(f"{name:<22}{p50:>10.2f}{p95:>10.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+'''
+Measures how slow button callbacks stall the main loop, running them on the render thread
+and in the background.
+
+Each run clicks a button whose callback blocks for --work milliseconds, then times the frames
+that follow. On the render thread each click stalls a frame for the whole callback; in the
+background the frames keep their pace and the result is delivered on the main loop.
+
+Run from the repository root:
+    python -m benchmarks.executor --simulated
+    python -m benchmarks.executor --simulated --work 100 --clicks 10
+'''
+import argparse
+import time
+
+from popui import Popup
+from popui.simulated import SimulatedBackend
+
+
+def measure(background: bool, clicks: int, work: float, simulated: bool):
+    completed = []
+
+    def slow():
+        time.sleep(work)
+        completed.append(time.perf_counter())
+
+    def build(popup):
+        popup.button = popup.add_button('Work', slow, close=False, background=background)
+
+    popup = Popup('^!+w', build, backend=SimulatedBackend() if simulated else None)
+    popup.show()
+    popup.step()
+    frames = []
+    for _ in range(clicks):
+        popup.gui.click(popup.button)
+        deadline = time.perf_counter() + work * 1.5
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            popup.step()
+            frames.append(time.perf_counter() - start)
+            time.sleep(1 / 240)
+    while len(completed) < clicks:
+        popup.step()
+    popup.quit()
+    popup.step()
+    frames.sort()
+    return frames[len(frames) // 2], frames[-1], len(completed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--clicks', type=int, default=5)
+    parser.add_argument('--work', type=float, default=50, help='Milliseconds each callback blocks for')
+    parser.add_argument('--simulated', action='store_true', help='Use the simulated backend')
+    args = parser.parse_args()
+
+    print(f"{'mode':>12}{'p50 frame ms':>16}{'max frame ms':>16}{'completed':>12}")
+    for background in (False, True):
+        p50, worst, completed = measure(background, args.clicks, args.work / 1000, args.simulated)
+        mode = 'background' if background else 'render'
+        print(f"{mode:>12}{p50 * 1000:>16.3f}{worst * 1000:>16.3f}{completed:>12}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+'''
+Compares viewport creation and showing a popup on each monitor with the font DPI cache cold and warm.
+
+    cold: the cache directory is empty, so only the primary monitor's DPI is registered before the
+          first frame and the first show on a monitor with another DPI adds a font
+    warm: a second run with the same cache directory, which registers every DPI seen by the cold
+          run before the first frame
+
+"create" is the time spent in the Popup constructor and its first frame, where Dear PyGui builds the
+font atlas, and RSS the resident memory it added. "show max" is the slowest show on a monitor,
+hotkey to rendered frame, and "added" counts the fonts registered after the viewport was created,
+each of which rebuilt the atlas. Each run uses its own process.
+
+The simulated desktop has a 1920x1080 monitor at 96 DPI and a 3840x2160 monitor at 192 DPI. It does
+not rasterize fonts, so its times leave out the atlas builds; run without --simulated on a desktop
+with monitors at different scalings for those.
+
+Run from the repository root:
+    python -m benchmarks.fonts --simulated
+    python -m benchmarks.fonts --font C:/Windows/Fonts/segoeui.ttf --size 15
+'''
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from time import perf_counter
+
+from benchmarks.lazy_sections import resident_memory
+from popui import PopupManager
+
+MODES = ('cold', 'warm')
+
+
+def build(popup):
+    for i in range(100):
+        popup.gui.add_text(default_value=f'Line {i}: the quick brown fox jumps over the lazy dog', parent=popup.root)
+
+
+def measure(font: str, size: float, cache_dir: str, simulated: bool):
+    backend = None
+    if simulated:
+        from screeninfo import Monitor
+        from popui.simulated import SimulatedBackend
+        backend = SimulatedBackend(monitors=[Monitor(x=0, y=0, width=1920, height=1080, is_primary=True),
+                                             Monitor(x=1920, y=0, width=3840, height=2160)],
+                                   dpis=[96, 192])
+    manager = PopupManager(backend=backend, font=font, font_size=size)
+    manager.fonts.cache_dir = cache_dir
+
+    rss = resident_memory()
+    start = perf_counter()
+    popup = manager.add(None, build)
+    popup.step()
+    create = perf_counter() - start
+    rss = resident_memory() - rss if rss is not None else None
+
+    shows = []
+    for monitor in manager.monitors.monitors:
+        center = (monitor.x + monitor.width // 2, monitor.y + monitor.height // 2)
+        if simulated:
+            backend.desktop.mouse = center
+        else:
+            manager.ahk.mouse_move(*center, speed=0, coord_mode='Screen')
+        start = perf_counter()
+        popup.show()
+        popup.step()
+        shows.append(perf_counter() - start)
+        popup.hide()
+        popup.step()
+    stats = manager.fonts.stats()
+    popup.quit()
+    popup.step()
+    return {'create': create, 'rss': rss, 'show max': max(shows), 'added': stats['added'], 'fonts': stats['fonts']}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--font', default=os.path.join(os.environ.get('WINDIR', 'C:/Windows'), 'Fonts', 'segoeui.ttf'))
+    parser.add_argument('--size', type=float, default=15, help='Font size in pixels at 96 DPI')
+    parser.add_argument('--simulated', action='store_true', help='Use the simulated backend')
+    parser.add_argument('--cache-dir', help=argparse.SUPPRESS)  # Set for the child processes
+    args = parser.parse_args()
+
+    if args.cache_dir:
+        print(json.dumps(measure(args.font, args.size, args.cache_dir, args.simulated)))
+        return
+
+    print(f"{'cache':<8}{'create ms':>11}{'RSS MiB':>10}{'show max ms':>13}{'added':>7}{'fonts':>7}")
+    with tempfile.TemporaryDirectory() as cache_dir:
+        for mode in MODES:
+            command = [sys.executable, '-m', 'benchmarks.fonts', '--font', args.font, '--size', str(args.size),
+                       '--cache-dir', cache_dir]
+            if args.simulated:
+                command.append('--simulated')
+            result = json.loads(subprocess.run(command, capture_output=True, text=True, check=True).stdout.splitlines()[-1])
+            rss = f"{result['rss'] / 2 ** 20:.1f}" if result['rss'] is not None else 'n/a'
+            print(f"{mode:<8}{result['create'] * 1000:>11.2f}{rss:>10}{result['show max'] * 1000:>13.2f}"
+                  f"{result['added']:>7}{result['fonts']:>7}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,137 @@
+'''
+Drives a popup on the simulated backend through scripted toggles, keystrokes and button clicks,
+and reports per-operation latency percentiles and memory growth.
+
+Run from the repository root:
+    python -m benchmarks.hot_paths --iterations 20000
+    python -m benchmarks.hot_paths --save baseline.json
+    python -m benchmarks.hot_paths --baseline baseline.json --tolerance 1.5
+
+With --baseline, the exit status is 1 if any p95 latency grew by more than the tolerance factor.
+'''
+import argparse
+import json
+import os
+import sys
+import tracemalloc
+from statistics import quantiles
+from time import perf_counter_ns
+
+import popui
+from popui import Popup
+from popui.keys import KEYS
+from popui.simulated import SimulatedBackend
+
+HOTKEY = '^space'
+BUTTONS = 50
+KEYBINDS = 300
+
+
+def build(popup: Popup):
+    popup.buttons = []
+    for i in range(BUTTONS):
+        popup.buttons.append(popup.add_button(f'Button {i}', popup.no_op, close=False))
+    names = [name for name in KEYS if len(name) == 1]
+    modifiers = [(), ('control',), ('shift',), ('control', 'shift'), ('alt',), ('control', 'alt')]
+    for i in range(KEYBINDS):
+        popup.add_keybind(names[i % len(names)], popup.no_op, modifiers=modifiers[i // len(names) % len(modifiers)])
+
+
+class Timings:
+    def __init__(self):
+        self.samples = {}
+
+    def time(self, name: str, function, *args):
+        start = perf_counter_ns()
+        function(*args)
+        self.samples.setdefault(name, []).append(perf_counter_ns() - start)
+
+    def summary(self):
+        result = {}
+        for name, samples in self.samples.items():
+            percentiles = quantiles(samples, n=100, method='inclusive')
+            result[name] = {
+                'count': len(samples),
+                'p50_us': percentiles[49] / 1000,
+                'p95_us': percentiles[94] / 1000,
+                'p99_us': percentiles[98] / 1000,
+                'max_us': max(samples) / 1000,
+            }
+        return result
+
+
+def run(iterations: int):
+    backend = SimulatedBackend()
+    backend.desktop.open_window('Editor', exe='editor.exe', width=1200, height=900)
+    popup = Popup(HOTKEY, build, backend=backend)
+    popup.cooldown = 0  # Toggles follow each other faster than a person could press the hotkey
+    gui, ahk = backend.gui, backend.ahk
+    popup.step()
+    popup.step()
+    timings = Timings()
+    keys = [KEYS[name] for name in ('a', 'b', 'c', 'tab', 'return')]
+    modifiers = [(), (KEYS['control'],), (KEYS['control'], KEYS['shift'])]
+
+    def toggle():
+        ahk.trigger(HOTKEY)
+        popup.step()
+
+    # Only count allocations made by popui itself, not the collected samples
+    package = [tracemalloc.Filter(True, os.path.join(os.path.dirname(popui.__file__), '*'))]
+    tracemalloc.start()
+    for i in range(iterations):
+        if i == iterations // 10:  # Measure growth after warm-up
+            baseline = tracemalloc.take_snapshot().filter_traces(package)
+        timings.time('toggle open', toggle)
+        timings.time('anchor', popup.anchor)
+        gui.press_key(keys[i % len(keys)], modifiers[i % len(modifiers)])
+        timings.time('keystroke', popup.step)
+        gui.click(popup.buttons[i % BUTTONS])
+        timings.time('click', popup.step)
+        for key in keys:
+            popup._key_callback(None, key, Popup.KEY_PRESS)
+        timings.time('evaluate keybinds', popup.manager.actions.drain)
+        timings.time('hide', popup.hide)
+        timings.time('show', popup.show)
+        timings.time('toggle close', toggle)
+    growth = sum(stat.size_diff for stat in
+                 tracemalloc.take_snapshot().filter_traces(package).compare_to(baseline, 'filename'))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    popup.quit()
+    popup.step()
+    return timings.summary(), {'growth_kib': growth / 1024, 'peak_kib': peak / 1024}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--iterations', type=int, default=20000)
+    parser.add_argument('--save', help='Write the results to a JSON file')
+    parser.add_argument('--baseline', help='Compare against results saved with --save')
+    parser.add_argument('--tolerance', type=float, default=1.5, help='Allowed p95 slowdown factor')
+    args = parser.parse_args()
+
+    summary, memory = run(args.iterations)
+    print(f"{'operation':<20}{'count':>8}{'p50 us':>10}{'p95 us':>10}{'p99 us':>10}{'max us':>10}")
+    for name, stats in summary.items():
+        print(f"{name:<20}{stats['count']:>8}{stats['p50_us']:>10.1f}{stats['p95_us']:>10.1f}"
+              f"{stats['p99_us']:>10.1f}{stats['max_us']:>10.1f}")
+    print(f"memory growth: {memory['growth_kib']:.1f} KiB, peak: {memory['peak_kib']:.1f} KiB")
+
+    if args.save:
+        with open(args.save, 'w') as file:
+            json.dump({'operations': summary, 'memory': memory}, file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)['operations']
+        regressions = [name for name, stats in summary.items()
+                       if name in baseline and stats['p95_us'] > baseline[name]['p95_us'] * args.tolerance]
+        for name in regressions:
+            print(f"REGRESSION: {name} p95 {summary[name]['p95_us']:.1f} us "
+                  f"(baseline {baseline[name]['p95_us']:.1f} us)")
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+'''
+Measures how long importing popui takes, from `python -X importtime` in fresh interpreters, and checks
+that the heavy dependencies are only imported once a popup is created.
+
+    import popui:             what a tool reading a layout or talking to the daemon pays
+    from popui import Popup:  what a script pays before constructing its first popup
+
+Each statement runs --runs times in a new process and the median is reported, leaving out modules the
+interpreter imports at startup. The modules with the largest self time are listed, as -X importtime
+would show them.
+
+Run from the repository root:
+    python -m benchmarks.import_time
+    python -m benchmarks.import_time --max-ms 5 --max-popup-ms 50
+
+The exit status is 1 if a statement is over its budget or imports Dear PyGui, AHK, screeninfo, tempfile or Pillow.
+'''
+import argparse
+import subprocess
+import sys
+from statistics import median
+
+DEFERRED = ('dearpygui', 'ahk', 'screeninfo', 'tempfile', 'PIL')
+
+
+def import_times(statement: str):
+    '''
+    Runs a statement under -X importtime and returns {module: (self us, cumulative us, top level)}
+    '''
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', statement],
+                            capture_output=True, text=True, check=True)
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        times[name.strip()] = (int(self_us), int(cumulative_us), not name[1:].startswith(' '))
+    return times
+
+
+def measure(statement: str, runs: int):
+    '''
+    Returns the median milliseconds spent importing the statement's modules, the median self time
+    of each of them and the names of the modules it imported
+    '''
+    startup = set(import_times('pass'))
+    totals = []
+    selves = {}
+    for _ in range(runs):
+        times = {name: time for name, time in import_times(statement).items() if name not in startup}
+        totals.append(sum(cumulative for _, cumulative, top_level in times.values() if top_level) / 1000)
+        for name, (self_us, _, _) in times.items():
+            selves.setdefault(name, []).append(self_us / 1000)
+    return median(totals), {name: median(values) for name, values in selves.items()}, set(selves)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--top', type=int, default=8, help='Slowest modules to list per statement')
+    parser.add_argument('--max-ms', type=float, default=5, help='Budget for import popui')
+    parser.add_argument('--max-popup-ms', type=float, default=50, help='Budget for from popui import Popup')
+    args = parser.parse_args()
+
+    failed = False
+    for statement, budget in (('import popui', args.max_ms), ('from popui import Popup', args.max_popup_ms)):
+        total, selves, modules = measure(statement, args.runs)
+        print(f"{statement:<26}{total:>9.1f} ms  (budget {budget:g} ms)")
+        for name, self_ms in sorted(selves.items(), key=lambda item: -item[1])[:args.top]:
+            print(f"    {self_ms:>8.2f} ms  {name}")
+        imported = sorted({name.split('.')[0] for name in modules} & set(DEFERRED))
+        if imported:
+            print(f"{statement} imported {', '.join(imported)}")
+            failed = True
+        if total > budget:
+            print(f"{statement} took {total:.1f} ms, over its {budget:g} ms budget")
+            failed = True
+        print()
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
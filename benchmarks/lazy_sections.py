@@ -0,0 +1,127 @@
+'''
+Compares startup time, memory and the cost of opening a tab for a popup with many tabs,
+built eagerly in build() and as lazy sections.
+
+    eager:      every tab's content is built in build()
+    lazy:       each tab is a lazy_section() built the first time the tab is opened
+    lazy steps: like lazy, with a generator build that yields every 20 items, so opening a tab
+                spreads its build over several frames of at most build_budget seconds
+
+Startup is the time spent in Popup(...) and RSS the resident memory it added. Opening a tab in the
+middle is timed per frame until its content is built: "open frames" counts the frames and
+"open max" is the longest. Each mode runs in its own process, so the memory figures do not mix.
+
+Run from the repository root:
+    python -m benchmarks.lazy_sections --simulated
+    python -m benchmarks.lazy_sections --tabs 50 --items 200
+'''
+import argparse
+import json
+import os
+import subprocess
+import sys
+from time import perf_counter
+
+from popui import Popup
+
+MODES = ('eager', 'lazy', 'lazy steps')
+
+
+def resident_memory():
+    '''
+    Returns the resident set size in bytes, or None if it cannot be read
+    '''
+    try:
+        import psutil
+    except ImportError:
+        psutil = None
+    if psutil:
+        return psutil.Process().memory_info().rss
+    try:
+        with open('/proc/self/statm') as file:
+            return int(file.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except OSError:
+        return None
+
+
+def build_tab(popup: Popup, tab: int, items: int):
+    for i in range(items):
+        popup.add_button(f'Tab {tab} action {i}', popup.no_op, close=False)
+
+
+def build_tab_steps(popup: Popup, tab: int, items: int):
+    for i in range(items):
+        popup.add_button(f'Tab {tab} action {i}', popup.no_op, close=False)
+        if i % 20 == 19:
+            yield
+
+
+def make_build(mode: str, tabs: int, items: int):
+    def build(popup: Popup):
+        with popup.gui.tab_bar(parent=popup.root) as popup.tab_bar:
+            popup.tabs = []
+            for tab in range(tabs):
+                with popup.gui.tab(label=f'Tab {tab}') as item:
+                    popup.tabs.append(item)
+                    if mode == 'eager':
+                        build_tab(popup, tab, items)
+                    elif mode == 'lazy':
+                        popup.lazy_section(lambda popup, tab=tab: build_tab(popup, tab, items), name=f'tab {tab}')
+                    else:
+                        popup.lazy_section(lambda popup, tab=tab: build_tab_steps(popup, tab, items), name=f'tab {tab}')
+    return build
+
+
+def measure(mode: str, tabs: int, items: int, simulated: bool):
+    backend = None
+    if simulated:
+        from popui.simulated import SimulatedBackend
+        backend = SimulatedBackend()
+    rss = resident_memory()
+    start = perf_counter()
+    popup = Popup(None, make_build(mode, tabs, items), backend=backend)
+    startup = perf_counter() - start
+    rss = resident_memory() - rss if rss is not None else None
+
+    popup.show()
+    popup.step()
+    frames = []
+    popup.gui.set_value(popup.tab_bar, popup.tabs[tabs // 2])  # Open a tab in the middle
+    section = popup._sections.get(f'tab {tabs // 2}')
+    while True:
+        start = perf_counter()
+        popup.step()
+        frames.append(perf_counter() - start)
+        if section is None or section.built:
+            break
+    popup.quit()
+    popup.step()
+    return {'startup': startup, 'rss': rss, 'open frames': len(frames), 'open max': max(frames)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tabs', type=int, default=50)
+    parser.add_argument('--items', type=int, default=200, help='Buttons per tab')
+    parser.add_argument('--simulated', action='store_true', help='Use the simulated backend')
+    parser.add_argument('--mode', choices=MODES, help=argparse.SUPPRESS)  # Set for the child processes
+    args = parser.parse_args()
+
+    if args.mode:
+        print(json.dumps(measure(args.mode, args.tabs, args.items, args.simulated)))
+        return
+
+    print(f"{'mode':<12}{'startup ms':>12}{'RSS MiB':>10}{'open frames':>13}{'open max ms':>13}")
+    for mode in MODES:
+        command = [sys.executable, '-m', 'benchmarks.lazy_sections', '--mode', mode,
+                   '--tabs', str(args.tabs), '--items', str(args.items)]
+        if args.simulated:
+            command.append('--simulated')
+        result = json.loads(subprocess.run(command, capture_output=True, text=True, check=True).stdout.splitlines()[-1])
+        rss = f"{result['rss'] / 2 ** 20:.1f}" if result['rss'] is not None else 'n/a'
+        print(f"{mode:<12}{result['startup'] * 1000:>12.1f}{rss:>10}"
+              f"{result['open frames']:>13}{result['open max'] * 1000:>13.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+'''
+Measures the memory and main loop CPU time each additional popup adds to a PopupManager.
+
+Run from the repository root:
+    python -m benchmarks.manager --popups 1 2 5 10 20
+    python -m benchmarks.manager --simulated
+'''
+import argparse
+import time
+import tracemalloc
+
+from popui.manager import PopupManager
+from popui.simulated import SimulatedBackend
+
+
+def build(popup):
+    for i in range(50):
+        popup.add_button(f'Button {i}', popup.no_op, keybind='f1' if i == 0 else None)
+    popup.add_keybind('tab', popup.no_op)
+
+
+def measure(count: int, frames: int, simulated: bool):
+    backend = SimulatedBackend() if simulated else None
+    tracemalloc.start()
+    manager = PopupManager(backend=backend)
+    popups = [manager.add(f'^!+F{i % 12 + 1}' + ' up' * (i // 12), build) for i in range(count)]
+    manager.step()
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    popups[0].show()
+    start = time.process_time()
+    for _ in range(frames):
+        manager.step()
+    cpu = (time.process_time() - start) / frames
+    manager.quit()
+    manager.step()
+    return memory, cpu
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--popups', type=int, nargs='+', default=[1, 2, 5, 10, 20])
+    parser.add_argument('--frames', type=int, default=500, help='Frames to time per popup count')
+    parser.add_argument('--simulated', action='store_true', help='Use the simulated backend')
+    args = parser.parse_args()
+
+    print(f"{'popups':>8}{'memory KiB':>14}{'per popup KiB':>16}{'cpu us/frame':>16}{'per popup us':>16}")
+    measure(1, args.frames, args.simulated)  # Warm up: the first run also traces lazy imports and first-use caches
+    base_memory, base_cpu = measure(1, args.frames, args.simulated)
+    for count in args.popups:
+        memory, cpu = measure(count, args.frames, args.simulated)
+        extra = max(count - 1, 1)
+        print(f"{count:>8}{memory / 1024:>14.1f}{(memory - base_memory) / 1024 / extra:>16.1f}"
+              f"{cpu * 1e6:>16.1f}{(cpu - base_cpu) * 1e6 / extra:>16.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+'''
+Measures the command palette's fuzzy search over tens of thousands of labels: the time to build
+the index, and for each keystroke of a typed query, the number of results, the total matching
+time, the number of frames it is spread over and the longest slice spent in a single frame. The
+"rescan" columns repeat each query on a fresh index, without refining the previous keystroke's matches.
+
+The first keystroke, which matches the most labels, must show its results in the frame it was
+typed in, and every later keystroke within --max-frames frames.
+
+Run from the repository root:
+    python -m benchmarks.palette
+    python -m benchmarks.palette --entries 100000 --query "open recent"
+
+The exit status is 1 if a keystroke took more frames than that.
+'''
+import argparse
+import random
+import string
+import sys
+import time
+
+from popui.palette import FuzzyIndex
+
+
+def make_labels(count: int, seed: int = 0):
+    rng = random.Random(seed)
+    words = [''.join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 9))) for _ in range(5000)]
+    words += ['open', 'recent', 'file', 'close', 'window', 'settings', 'run', 'task', 'git', 'commit']
+    return [' '.join(rng.choices(words, k=rng.randint(2, 4))).title() for _ in range(count)]
+
+
+def run(index: FuzzyIndex, query: str, budget: float, limit: int):
+    '''
+    Runs a search the way the palette does, one budgeted slice per frame until its best results are known
+    '''
+    start = time.perf_counter()
+    search = index.search(query)
+    frames, total, longest = 0, 0, 0
+    while True:
+        done = search.ready(limit) or search.run(start + budget)
+        if done:
+            results = search.results(limit)
+        elapsed = time.perf_counter() - start
+        frames += 1
+        total += elapsed
+        longest = max(longest, elapsed)
+        if done:
+            return total, frames, longest, len(results)
+        start = time.perf_counter()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--entries', type=int, default=50000)
+    parser.add_argument('--query', default='opnrcnt')
+    parser.add_argument('--budget', type=float, default=4, help='Milliseconds of matching per frame')
+    parser.add_argument('--limit', type=int, default=500, help='Results ranked per query, as CommandPalette(limit=...)')
+    parser.add_argument('--max-frames', type=int, default=10, help='Frames allowed for keystrokes after the first')
+    args = parser.parse_args()
+
+    labels = make_labels(args.entries)
+    start = time.perf_counter()
+    index = FuzzyIndex(labels)
+    print(f"index of {args.entries} labels built in {(time.perf_counter() - start) * 1000:.1f} ms\n")
+    rescan_index = FuzzyIndex(labels, cache_size=0)  # Keeps no searches to refine
+
+    budget = args.budget / 1000
+    print(f"{'query':<16}{'results':>9}{'total ms':>10}{'frames':>8}{'slice ms':>10}"
+          f"{'rescan ms':>11}{'frames':>8}")
+    failed = []
+    for length in range(1, len(args.query) + 1):
+        query = args.query[:length]
+        total, frames, longest, results = run(index, query, budget, args.limit)
+        rescan, rescan_frames, _, _ = run(rescan_index, query, budget, args.limit)
+        print(f"{query!r:<16}{results:>9}{total * 1000:>10.2f}{frames:>8}{longest * 1000:>10.2f}"
+              f"{rescan * 1000:>11.2f}{rescan_frames:>8}")
+        allowed = 1 if length == 1 else args.max_frames
+        if frames > allowed:
+            failed.append(f"{query!r} took {frames} frames, over its {allowed}")
+    for failure in failed:
+        print(failure)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,71 @@
+'''
+Reports the CPU time a resident popup spends per hour while hidden, visible but idle,
+and visible with constant activity, for both render modes.
+
+Run from the repository root:
+    python -m benchmarks.render_scheduler --seconds 10
+    python -m benchmarks.render_scheduler --simulated  # Without a desktop, measures scheduling overhead only
+'''
+import argparse
+import threading
+import time
+
+from popui import Popup
+from popui.simulated import SimulatedBackend
+
+
+def build(popup: Popup):
+    popup.add_button('Do something', callback=popup.no_op)
+    popup.add_button_row([('Left', popup.no_op), ('Right', popup.no_op)])
+
+
+def measure(popup: Popup, seconds: float, activity: bool = False):
+    '''
+    Returns the process CPU time in seconds spent over ``seconds`` of wall time,
+    extrapolated to an hour
+    '''
+    stop = time.monotonic() + seconds
+    start = time.process_time()
+    while time.monotonic() < stop:
+        if activity:
+            popup.mark_dirty()
+        time.sleep(1 / 60)
+    return (time.process_time() - start) * 3600 / seconds
+
+
+def run(render_mode: int, seconds: float, simulated: bool = False):
+    backend = SimulatedBackend() if simulated else None
+    popup = Popup('^!+F12', build, render_mode=render_mode, backend=backend, width=300, height=200)
+    results = {}
+
+    def drive():
+        time.sleep(1)  # Let the initial frames settle
+        results['hidden'] = measure(popup, seconds)
+        popup.run_on_main(popup.show)  # Window calls belong on the main loop's thread
+        results['idle-visible'] = measure(popup, seconds)
+        results['active'] = measure(popup, seconds, activity=True)
+        popup.run_on_main(popup.hide)
+        popup.run_on_main(popup.quit)
+
+    thread = threading.Thread(target=drive, daemon=True)
+    thread.start()
+    popup.block()
+    thread.join()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--seconds', type=float, default=10, help='Sample length per state')
+    parser.add_argument('--simulated', action='store_true', help='Use the simulated backend')
+    args = parser.parse_args()
+
+    modes = {'continuous': Popup.RENDER_CONTINUOUS, 'on demand': Popup.RENDER_ON_DEMAND}
+    print(f"{'mode':<12}{'state':<14}{'cpu s/hour':>12}")
+    for name, mode in modes.items():
+        for state, cpu in run(mode, args.seconds, args.simulated).items():
+            print(f"{name:<12}{state:<14}{cpu:>12.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+'''
+Counts the AHK round-trips and times each toggle when the show path reads the desktop one call at a
+time, as backends without a batched query do, and from a single DesktopSnapshot.
+
+Each scenario shows and hides a popup over an active editor window:
+    mouse:     anchored to the mouse, shown in every application
+    app rule:  anchored to the active application, shown only in editor.exe
+    title rule: anchored to the mouse, shown only in windows matching "glob:Editor*"
+
+The simulated backend spends --latency seconds on each round-trip, like the real AHK process.
+
+Run from the repository root:
+    python -m benchmarks.round_trips
+    python -m benchmarks.round_trips --latency 0.001 --toggles 100
+'''
+import argparse
+from statistics import median
+from time import perf_counter
+
+from popui import Popup
+from popui.backend import Backend
+from popui.simulated import SimulatedBackend
+
+SCENARIOS = {
+    'mouse': dict(anchor=Popup.ON_MOUSE),
+    'app rule': dict(anchor=Popup.ON_APP, application='ahk_exe editor.exe'),
+    'title rule': dict(anchor=Popup.ON_MOUSE, application='glob:Editor*'),
+}
+
+
+class SeparateCallsBackend(SimulatedBackend):
+    '''
+    A simulated backend which reads the desktop with the fallback snapshot, one AHK call per value
+    '''
+    snapshot = Backend.snapshot
+
+
+def build(popup: Popup):
+    for i in range(20):
+        popup.add_button(f'Button {i}', popup.no_op)
+
+
+def measure(backend: SimulatedBackend, toggles: int, popup_args: dict):
+    popup = Popup(None, build, backend=backend, **popup_args)
+    popup.cooldown = 0
+    popup.step()
+    backend.desktop.open_window('Editor - notes.txt', class_='EditorWindow', exe='editor.exe', width=1200, height=900)
+    samples = {'show': [], 'hide': []}
+    for i in range(toggles * 2):
+        action = 'hide' if popup.open else 'show'
+        round_trips = backend.desktop.round_trips
+        start = perf_counter()
+        popup.toggle()
+        popup.step()
+        samples[action].append((backend.desktop.round_trips - round_trips, perf_counter() - start))
+    popup.quit()
+    popup.step()
+    return {action: (median(trips for trips, _ in values), median(time for _, time in values) * 1000)
+            for action, values in samples.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--toggles', type=int, default=50, help='Shows and hides per scenario')
+    parser.add_argument('--latency', type=float, default=0.0005, help='Simulated AHK round-trip time in seconds')
+    args = parser.parse_args()
+
+    print(f"{'scenario':<12}{'desktop reads':<16}{'show trips':>12}{'show ms':>10}{'hide trips':>12}{'hide ms':>10}")
+    for name, popup_args in SCENARIOS.items():
+        for label, backend_class in (('separate', SeparateCallsBackend), ('snapshot', SimulatedBackend)):
+            result = measure(backend_class(latency=args.latency), args.toggles, popup_args)
+            (show_trips, show_ms), (hide_trips, hide_ms) = result['show'], result['hide']
+            print(f"{name:<12}{label:<16}{show_trips:>12.0f}{show_ms:>10.2f}{hide_trips:>12.0f}{hide_ms:>10.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,148 @@
+'''
+Rebuilds a dynamic section and toggles the popup over and over, like a popup left running for weeks,
+and checks that item, handler, keybind and callback counts and memory use stay flat.
+
+Each cycle rebuilds a section of buttons with keybinds, a background button, a bound text item and a
+virtual list, then shows and hides the popup. The bounded latency sample buffers fill up over the
+first thousand or so cycles, so the run first warms up in blocks of WARM_UP_BLOCK cycles until a
+block grows memory by less than --settled KiB, or for at most --max-warm-up cycles. Counts
+are then sampled every --every cycles, must not change, and memory must not grow by more than
+--max-growth KiB over the measured --cycles.
+
+Run from the repository root:
+    python -m benchmarks.soak --simulated
+    python -m benchmarks.soak --simulated --cycles 1000000 --every 50000
+
+The exit status is 1 if anything grew.
+'''
+import argparse
+import asyncio
+import gc
+import sys
+import tracemalloc
+from contextlib import suppress
+from time import perf_counter
+
+from popui import Popup
+
+BUTTONS = 10
+WARM_UP_BLOCK = 200
+
+
+def build_results(popup: Popup):
+    popup.cycle = getattr(popup, 'cycle', 0) + 1
+    for i in range(BUTTONS):
+        popup.add_button(f'Result {popup.cycle}.{i}', popup.no_op, close=False, keybind=str(i))
+    popup.add_button('Refresh', popup.no_op, close=False, background=True)
+    status = popup.gui.add_text(default_value='')
+    popup.binding = popup.bind(status, lambda: popup.cycle, interval=60)
+    popup.add_virtual_list(range(popup.cycle, popup.cycle + 100), popup.no_op, rows=5)
+
+
+def build(popup: Popup):
+    popup.add_button('Close', popup.hide)
+    popup.add_section('results', build_results)
+
+
+def cycle(popup: Popup):
+    popup.rebuild_section('results')
+    popup.toggle()
+    popup.step()
+    popup.toggle()
+    popup.step()
+
+
+def memory():
+    gc.collect()
+    return tracemalloc.get_traced_memory()[0] / 1024
+
+
+def warm_up(popup: Popup, block: int, settled: float, limit: int):
+    '''
+    Runs cycles in blocks until a block grows memory by less than settled KiB, and returns how many ran
+    '''
+    cycles, previous = 0, memory()
+    while cycles < limit:
+        for _ in range(min(block, limit - cycles)):
+            cycle(popup)
+        cycles += min(block, limit - cycles)
+        current = memory()
+        if current - previous < settled:
+            break
+        previous = current
+    return cycles
+
+
+def stop_binding(binding):
+    '''
+    Stops a binding and waits for its polling task to finish, so none is left pending at exit
+    '''
+    binding.stop()
+    if binding._loop is None:
+        return
+
+    async def finished():
+        if binding._task:  # Cancelled by stop(), which was scheduled first
+            with suppress(asyncio.CancelledError):
+                await binding._task
+    asyncio.run_coroutine_threadsafe(finished(), binding._loop).result(timeout=5)
+
+
+def counts(popup: Popup):
+    gui = popup.gui
+    items = gui.get_all_items()
+    return {
+        'items': len(items),
+        'handlers': sum('handler' in str(gui.get_item_type(item)).lower() for item in items),
+        'keybinds': len(popup.keybinds),
+        'visibility callbacks': len(popup._visibility_callbacks),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--cycles', type=int, default=100_000)
+    parser.add_argument('--every', type=int, default=10_000, help='Cycles between samples')
+    parser.add_argument('--max-growth', type=float, default=256, help='Allowed memory growth after warm-up, in KiB')
+    parser.add_argument('--settled', type=float, default=16, help='Growth per warm-up block at which memory is flat, in KiB')
+    parser.add_argument('--max-warm-up', type=int, default=20_000, help='Most cycles to warm up for')
+    parser.add_argument('--simulated', action='store_true', help='Use the simulated backend')
+    args = parser.parse_args()
+
+    backend = None
+    if args.simulated:
+        from popui.simulated import SimulatedBackend
+        backend = SimulatedBackend()
+    popup = Popup(None, build, backend=backend)
+    popup.cooldown = 0
+    popup.step()
+
+    tracemalloc.start()
+    warmed = warm_up(popup, WARM_UP_BLOCK, args.settled, args.max_warm_up)
+    print(f"warmed up for {warmed} cycles\n")
+    baseline = counts(popup), memory()
+    grew = False
+    start = perf_counter()
+    print(f"{'cycle':>9}{'items':>8}{'handlers':>10}{'keybinds':>10}{'callbacks':>11}{'memory KiB':>12}")
+    for number in range(1, args.cycles + 1):
+        cycle(popup)
+        if number % args.every == 0:
+            sample, current = counts(popup), memory()
+            print(f"{number:>9}{sample['items']:>8}{sample['handlers']:>10}{sample['keybinds']:>10}"
+                  f"{sample['visibility callbacks']:>11}{current:>12.1f}")
+            if sample != baseline[0]:
+                print(f"Counts changed since the warm-up: {baseline[0]} -> {sample}")
+                grew = True
+            if current - baseline[1] > args.max_growth:
+                print(f"Memory grew by {current - baseline[1]:.1f} KiB since the warm-up")
+                grew = True
+    elapsed = perf_counter() - start
+    stop_binding(popup.binding)
+    popup.quit()
+    popup.step()
+    print(f"\n{args.cycles} cycles in {elapsed:.1f} s ({elapsed / args.cycles * 1e6:.0f} us per cycle)")
+    return 1 if grew else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,67 @@
+'''
+Compares startup time and first-show latency of eager, lazy and prewarmed popups.
+
+    constructor: time spent in Popup(...)
+    ready:       time until the first hotkey press is handled without building the window
+    first show:  hotkey callback to first rendered frame of the first show
+
+Run from the repository root:
+    python -m benchmarks.startup
+    python -m benchmarks.startup --simulated --latency 0.0005
+'''
+import argparse
+from statistics import median
+from time import perf_counter
+
+from popui import Popup
+from popui.simulated import SimulatedBackend
+
+HOTKEY = '^!+F11'
+
+
+def make_build(buttons: int):
+    def build(popup: Popup):
+        for i in range(buttons):
+            popup.add_button(f'Button {i}', popup.no_op)
+    return build
+
+
+def measure(mode: str, buttons: int, simulated: bool, latency: float):
+    backend = SimulatedBackend(latency=latency) if simulated else None
+    records = []
+
+    start = perf_counter()
+    popup = Popup(HOTKEY, make_build(buttons), backend=backend, lazy=mode != 'eager')
+    constructor = perf_counter() - start
+    popup.add_latency_hook(records.append)
+    if mode == 'prewarm':
+        popup.prewarm()
+        popup.step()
+    ready = perf_counter() - start
+
+    popup.toggle()
+    while not records:
+        popup.step()
+    popup.quit()
+    while popup.step():
+        pass
+    return constructor, ready, records[0].total / 1e9
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--buttons', type=int, default=500, help='Buttons added by the build function')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--simulated', action='store_true', help='Use the simulated backend')
+    parser.add_argument('--latency', type=float, default=0, help='Simulated AHK round-trip time in seconds')
+    args = parser.parse_args()
+
+    print(f"{'mode':<10}{'constructor ms':>16}{'ready ms':>12}{'first show ms':>16}")
+    for mode in ('eager', 'lazy', 'prewarm'):
+        runs = [measure(mode, args.buttons, args.simulated, args.latency) for _ in range(args.runs)]
+        constructor, ready, first_show = (median(values) * 1000 for values in zip(*runs))
+        print(f"{mode:<10}{constructor:>16.2f}{ready:>12.2f}{first_show:>16.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+'''
+Compares a list of buttons with add_virtual_list() as the number of entries grows:
+the time build() takes, the memory it allocates, and the time per frame while scrolling.
+
+Run from the repository root:
+    python -m benchmarks.virtual_list --counts 100 1000 10000 --simulated
+'''
+import argparse
+import time
+import tracemalloc
+
+from popui import Popup
+from popui.keys import KEYS
+from popui.simulated import SimulatedBackend
+
+
+def make_build(widget: str, count: int):
+    entries = [f'Entry {i}' for i in range(count)]
+
+    def build(popup):
+        if widget == 'buttons':
+            for entry in entries:
+                popup.add_button(entry, popup.no_op)
+        else:
+            popup.add_virtual_list(entries, popup.no_op, rows=20)
+    return build
+
+
+def measure(widget: str, count: int, frames: int, simulated: bool):
+    popup = Popup('^!+v', make_build(widget, count), backend=SimulatedBackend() if simulated else None, lazy=True)
+    popup.step()
+    tracemalloc.start()
+    start = time.perf_counter()
+    popup.setup(hidden=True)
+    build = time.perf_counter() - start
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    popup.show()
+    popup.step()
+    start = time.perf_counter()
+    for _ in range(frames):
+        popup.gui.press_key(KEYS['down'])
+        popup.step()
+    frame = (time.perf_counter() - start) / frames
+    popup.quit()
+    popup.step()
+    return build, memory, frame
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--counts', type=int, nargs='+', default=[100, 1000, 10000])
+    parser.add_argument('--frames', type=int, default=200, help='Frames to time while scrolling')
+    parser.add_argument('--simulated', action='store_true', help='Use the simulated backend')
+    args = parser.parse_args()
+
+    print(f"{'widget':<10}{'entries':>10}{'build ms':>12}{'memory KiB':>14}{'frame us':>12}")
+    for count in args.counts:
+        for widget in ('buttons', 'virtual'):
+            build, memory, frame = measure(widget, count, args.frames, args.simulated)
+            print(f"{widget:<10}{count:>10}{build * 1000:>12.2f}{memory / 1024:>14.1f}{frame * 1e6:>12.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1 +1,23 @@
-from .popup import Popup
+_EXPORTS = {
+    'Popup': ('.popup', 'Popup'),
+    'PopupManager': ('.manager', 'PopupManager'),
+}
+
+
+def __getattr__(name: str):
+    # Imported on first use, so importing popui, or one of its modules such as popui.layout, stays cheap
+    # and Dear PyGui, AHK and screeninfo are only imported when a popup creates its backend
+    if name == 'gui':
+        import dearpygui.dearpygui as gui
+        return gui
+    if name in _EXPORTS:
+        from importlib import import_module
+        module, attribute = _EXPORTS[name]
+        value = getattr(import_module(module, __name__), attribute)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted({*globals(), 'gui', *_EXPORTS})
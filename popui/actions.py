@@ -0,0 +1,115 @@
+import threading
+from collections import deque
+from time import perf_counter
+from typing import Callable
+
+
+class ActionQueue:
+    '''
+    A thread-safe queue of UI actions, submitted from any thread and run by the main loop.
+
+    Actions can carry a key. While an action with the same key is pending, or within the key's
+    cooldown after it was submitted, further submissions are coalesced into it, so a burst of
+    hotkey presses becomes a single toggle. When the queue is full, new unkeyed actions are dropped.
+    '''
+
+    def __init__(self, maxsize: int = 1024, wake: Callable = None):
+        '''
+        :param maxsize: How many actions may be pending before new ones are dropped
+        :param wake: Called after each accepted submission, to wake a sleeping main loop
+        '''
+        self.maxsize = maxsize
+        self.wake = wake
+        self._queue = deque()
+        self._pending = set()
+        self._submitted_at = {}
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.executed = 0
+        self.coalesced = 0
+        self.dropped = 0
+        self.peak = 0
+
+    def __len__(self):
+        return len(self._queue)
+
+    @property
+    def depth(self):
+        return len(self._queue)
+
+    def submit(self, action: Callable, key=None, cooldown: float = 0):
+        '''
+        Queues an action to run on the main loop. Safe to call from any thread.
+
+        :param action: The function to call
+        :param key: Identifies actions which coalesce, e.g. the toggles of one popup
+        :param cooldown: Seconds after a keyed submission during which the key's
+                         further submissions are coalesced even once it has run
+
+        :return: Whether the action was queued
+        '''
+        with self._lock:
+            if key is not None:
+                now = perf_counter()
+                if key in self._pending or now < self._submitted_at.get(key, 0):
+                    self.coalesced += 1
+                    return False
+                self._pending.add(key)
+                if cooldown:
+                    self._submitted_at[key] = now + cooldown
+            elif len(self._queue) >= self.maxsize:
+                self.dropped += 1
+                return False
+            self._queue.append((action, key))
+            self.submitted += 1
+            self.peak = max(self.peak, len(self._queue))
+        if self.wake:
+            self.wake()
+        return True
+
+    def drain(self, budget: float = None):
+        '''
+        Runs the pending actions in submission order. Call from the main loop's thread.
+        At least one action runs per call, so work always progresses.
+
+        :param budget: Seconds after which to stop and leave the remaining actions for the next frame,
+                       or None to run everything pending when the call started
+
+        :return: How many actions are still pending
+        '''
+        deadline = None if budget is None else perf_counter() + budget
+        for _ in range(len(self._queue)):
+            with self._lock:
+                action, key = self._queue.popleft()
+                self._pending.discard(key)
+            try:
+                action()
+            except Exception as e:
+                print(f"Error in callback: {e}")
+            self.executed += 1
+            if deadline is not None and perf_counter() >= deadline:
+                break
+        return len(self._queue)
+
+    def stats(self):
+        '''
+        Returns the counters: {'depth', 'peak', 'submitted', 'executed', 'coalesced', 'dropped'}
+        '''
+        return {
+            'depth': len(self._queue),
+            'peak': self.peak,
+            'submitted': self.submitted,
+            'executed': self.executed,
+            'coalesced': self.coalesced,
+            'dropped': self.dropped,
+        }
+
+    def clear(self):
+        '''
+        Drops every pending action without running it
+        '''
+        with self._lock:
+            self.dropped += len(self._queue)
+            self._queue.clear()
+            self._pending.clear()
+            self._submitted_at.clear()
@@ -0,0 +1,154 @@
+from functools import cache
+
+from .monitors import BASE_DPI, display_signature, enable_dpi_awareness, get_monitors, monitor_dpi
+
+
+class DesktopSnapshot:
+    '''
+    The desktop state a popup reads when it is shown, gathered at once: the cursor position in
+    screen coordinates, the active window with its executable, class, title and position, and
+    whether the popup's own window is visible.
+
+    A field a backend did not gather is None, and is then read from the window when it is needed.
+    '''
+    __slots__ = ('mouse', 'active', 'exe', 'class_', 'title', 'position', 'own_visible')
+
+    def __init__(self, mouse: tuple, active=None, exe: str = None, class_: str = None, title: str = None,
+                 position: tuple = None, own_visible: bool = None):
+        self.mouse = mouse
+        self.active = active
+        self.exe = exe
+        self.class_ = class_
+        self.title = title
+        self.position = position
+        self.own_visible = own_visible
+
+    def __repr__(self):
+        return f"DesktopSnapshot(mouse={self.mouse}, active={self.active!r}, exe={self.exe!r})"
+
+    def active_position(self):
+        '''
+        Returns the (x, y, width, height) of the active window
+        '''
+        if self.position is None:
+            self.position = tuple(self.active.get_position())
+        return self.position
+
+
+class Backend:
+    '''
+    The platform services a Popup depends on.
+
+    A backend provides:
+        gui: A Dear PyGui compatible module, used for rendering
+        ahk: An AHK compatible object, used for hotkeys and window management
+        get_monitors(): The monitor layout, as screeninfo monitors
+        display_signature(): A cheap fingerprint of the display configuration
+        monitor_dpi(monitor): A monitor's DPI, 96 at 100% scaling
+        snapshot(window): The DesktopSnapshot a show reads, ideally in one AHK round-trip
+    '''
+    gui = None
+    ahk = None
+
+    def get_monitors(self):
+        raise NotImplementedError
+
+    def display_signature(self):
+        return None
+
+    def monitor_dpi(self, monitor):
+        return BASE_DPI
+
+    def snapshot(self, window=None):
+        '''
+        Returns the cursor position and active window. This fallback makes one AHK call for each,
+        and leaves the rest of the snapshot to be read on demand.
+
+        :param window: The popup's own AHK window, if it exists yet
+        '''
+        return DesktopSnapshot(tuple(self.ahk.get_mouse_position(coord_mode='Screen')), self.ahk.get_active_window())
+
+
+_SNAPSHOT_SCRIPT = r'''
+PopuiSnapshot(args*) {
+    own := args[1]
+    coord_mode := A_CoordModeMouse
+    detect_hidden := A_DetectHiddenWindows
+    CoordMode, Mouse, Screen
+    MouseGetPos, mouse_x, mouse_y
+    CoordMode, Mouse, %coord_mode%
+    DetectHiddenWindows, Off
+    visible := (own != "" && WinExist("ahk_id " own)) ? 1 : 0
+    active := WinExist("A")
+    if (active) {
+        WinGet, exe, ProcessName, ahk_id %active%
+        WinGetClass, class, ahk_id %active%
+        WinGetPos, x, y, w, h, ahk_id %active%
+        WinGetTitle, title, ahk_id %active%
+    }
+    DetectHiddenWindows, %detect_hidden%
+    payload := mouse_x "`n" mouse_y "`n" visible "`n" Format("0x{:x}", active) "`n" exe "`n" class "`n" x "`n" y "`n" w "`n" h "`n" title
+    return FormatResponse("ahk.message.StringResponseMessage", payload)
+}
+'''
+
+@cache
+def _snapshot_extension():
+    '''
+    Returns the AHK extension that adds ahk.popui_snapshot(), created on first use so importing
+    popui does not import ahk
+    '''
+    from ahk.extensions import Extension
+
+    extension = Extension(script_text=_SNAPSHOT_SCRIPT, requires_autohotkey='v1')
+
+    @extension.register
+    def popui_snapshot(ahk, own_id: str) -> str:
+        return ahk.function_call('PopuiSnapshot', [own_id])
+
+    return extension
+
+
+class DesktopBackend(Backend):
+    '''
+    The default backend, using Dear PyGui, AutoHotkey and screeninfo on the Windows desktop.
+    They are imported when the backend is created rather than when popui is.
+    '''
+
+    def __init__(self):
+        from ahk import AHK
+        from ahk.directives import NoTrayIcon
+        from dearpygui import dearpygui
+
+        enable_dpi_awareness()
+        self.gui = dearpygui
+        self.ahk = AHK(directives=[NoTrayIcon(apply_to_hotkeys_process=True)], extensions=[_snapshot_extension()])
+
+    def get_monitors(self):
+        return get_monitors()
+
+    def display_signature(self):
+        return display_signature()
+
+    def monitor_dpi(self, monitor):
+        return monitor_dpi(monitor)
+
+    def snapshot(self, window=None):
+        '''
+        Returns the whole DesktopSnapshot from a single call into the AHK process
+        '''
+        from ahk import Window
+
+        fields = self.ahk.popui_snapshot(window.id if window else '').split('\n', 10)
+        mouse_x, mouse_y, visible, active, exe, class_, x, y, w, h, title = fields
+        if int(active, 16) == 0:
+            return DesktopSnapshot((int(mouse_x), int(mouse_y)), own_visible=visible == '1')
+        return DesktopSnapshot(
+            (int(mouse_x), int(mouse_y)),
+            Window(engine=self.ahk, ahk_id=active),
+            exe=exe,
+            class_=class_,
+            title=title,
+            position=(int(x), int(y), int(w), int(h)),
+            own_visible=visible == '1',
+        )
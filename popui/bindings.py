@@ -0,0 +1,162 @@
+import asyncio
+import inspect
+from functools import partial
+from typing import Callable
+
+from .manager import background_loop
+
+_DONE = object()  # Returned by a poll when an iterator source is exhausted
+_UNSET = object()
+
+
+class Binding:
+    '''
+    Keeps an item showing the latest value of a source while its popup is visible.
+
+    The source is polled every interval seconds. Blocking sources run on a background thread and
+    asynchronous ones on the event loop of run_async(), or on a shared background loop under block().
+    Polling pauses while the popup is hidden and resumes with an immediate poll when it is shown.
+    A value equal to the last one is not written, and values arriving faster than frames are
+    coalesced into a single write of the newest, queued like any other main loop action.
+    '''
+
+    def __init__(self,
+                 popup,
+                 item: int,
+                 source,
+                 *,
+                 interval: float = 1.0,
+                 format: Callable = None,
+                 attribute: str = None):
+        '''
+        :param popup: The popup the item belongs to
+        :param item: The item to write values to
+        :param source: A function returning the current value, an iterator or iterable yielding values,
+                       a coroutine function, or an async iterator
+        :param interval: Seconds between polls while the popup is visible. With 0, iterators are
+                         consumed as fast as they yield, e.g. for sources which wait for changes
+        :param format: A function converting each value before it is written, e.g. str
+        :param attribute: The item configuration to write to instead of the value, e.g. 'items'
+                          for a listbox or 'label' for a button
+        '''
+        if interval < 0:
+            raise ValueError("interval must not be negative")
+        self.popup = popup
+        self.item = item
+        self.interval = interval
+        self.format = format
+        self.attribute = attribute
+        self.value = _UNSET  # The newest value read from the source
+        self.polls = 0
+        self.writes = 0
+        self._poll = self._poller(source)
+        self._active = asyncio.Event()  # Set while the popup is visible
+        self._refresh = asyncio.Event()  # Set to cut the wait before the next poll short
+        self._loop = None
+        self._task = None
+        self._stopped = False
+        popup.add_visibility_callback(self._visibility)
+        if popup.open:
+            self._visibility(True)
+
+    def _poller(self, source):
+        '''
+        Returns a coroutine function which reads the next value of a source
+        '''
+        if callable(source) and not self.interval:
+            raise ValueError("interval must be positive for functions, only iterators can be consumed continuously")
+        if inspect.iscoroutinefunction(source):
+            return source
+        if hasattr(source, '__aiter__'):
+            iterator = source.__aiter__()
+
+            async def next_():
+                try:
+                    return await iterator.__anext__()
+                except StopAsyncIteration:
+                    return _DONE
+            return next_
+        if not callable(source):
+            source = partial(next, iter(source), _DONE)
+
+        async def call():
+            return await asyncio.wrap_future(self.popup.manager._workers.submit(source, key=self))
+        return call
+
+    def refresh(self):
+        '''
+        Polls the source now instead of at the end of the interval, if the popup is visible.
+        Safe to call from any thread.
+        '''
+        if self._loop:
+            self._loop.call_soon_threadsafe(self._refresh.set)
+
+    def stop(self):
+        '''
+        Stops polling. The item keeps the last value written.
+        '''
+        self._stopped = True
+        self.popup.remove_visibility_callback(self._visibility)
+        if self._loop:
+            self._loop.call_soon_threadsafe(self._cancel)
+
+    def _visibility(self, visible: bool):
+        if self._stopped:
+            return
+        if self._loop is None:
+            if not visible:
+                return
+            self._loop = self.popup.manager.loop or background_loop()
+            self._loop.call_soon_threadsafe(self._start)
+        self._loop.call_soon_threadsafe(self._resume if visible else self._active.clear)
+
+    def _start(self):
+        self._task = self._loop.create_task(self._run())
+
+    def _cancel(self):
+        if self._task:  # Runs after _start(), which was scheduled first
+            self._task.cancel()
+
+    def _resume(self):
+        self._active.set()
+        self._refresh.set()
+
+    async def _run(self):
+        while True:
+            await self._active.wait()
+            self._refresh.clear()
+            try:
+                value = await self._poll()
+            except Exception as e:
+                print(f"Error in binding: {e}")
+            else:
+                if value is _DONE:
+                    return
+                self.polls += 1
+                self._push(value)
+            if self.interval:
+                try:
+                    await asyncio.wait_for(self._refresh.wait(), self.interval)
+                except asyncio.TimeoutError:
+                    pass
+
+    def _push(self, value):
+        '''
+        Queues a write of a changed value. A write already queued writes the newest value instead.
+        '''
+        if self.value is not _UNSET and value == self.value:
+            return
+        self.value = value
+        self.popup.run_on_main(self._write, key=(self, 'write'))
+
+    def _write(self):
+        gui = self.popup.gui
+        if not gui.does_item_exist(self.item):  # Deleted since, e.g. by a layout reload
+            self.stop()
+            return
+        value = self.format(self.value) if self.format else self.value
+        if self.attribute:
+            gui.configure_item(self.item, **{self.attribute: value})
+        else:
+            gui.set_value(self.item, value)
+        self.writes += 1
@@ -0,0 +1,345 @@
+'''
+A resident popui process which keeps popups built and shows them on request.
+
+Clients connect over a Unix socket, or a named pipe on Windows, and exchange JSON messages,
+one per request and one per response:
+
+    {"op": "show", "popup": "launcher"}             -> {"ok": true}
+    {"op": "choose", "items": ["a", "b"]}           -> {"ok": true, "index": 1, "choice": "b"}
+    {"op": "hide"} / {"op": "ping"} / {"op": "quit"} -> {"ok": true}
+
+A choose request shows a search box over the items and answers with the selection, or a null
+index and choice if the chooser is closed without one, the client disconnects or no selection is
+made within the daemon's timeout. Failed requests are answered with
+{"ok": false, "error": "..."}. Each client gets its own thread, so slow choosers do not
+hold up other requests.
+
+Run the daemon with "python -m popui serve" and talk to it with request(), or from the shell
+with "python -m popui choose first second third".
+'''
+import argparse
+import getpass
+import importlib
+import json
+import os
+import sys
+import tempfile
+import threading
+from concurrent.futures import Future, wait
+from functools import partial
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Listener
+from typing import Callable
+
+from .manager import PopupManager
+
+
+def default_address():
+    if sys.platform == 'win32':
+        return rf'\\.\pipe\popui-{getpass.getuser()}'
+    return os.path.join(tempfile.gettempdir(), f'popui-{os.getuid()}.sock')
+
+
+def _family(address: str):
+    return 'AF_PIPE' if address.startswith('\\\\.\\pipe\\') else 'AF_UNIX'
+
+
+class PopupDaemon:
+    '''
+    Serves show and choose requests for the popups of a PopupManager
+    '''
+
+    def __init__(self,
+                 manager: PopupManager = None,
+                 address: str = None,
+                 authkey: bytes = None,
+                 timeout: float = 600,
+                 **chooser_args: any):
+        '''
+        :param manager: The manager whose popups are shown, a new one by default
+        :param address: The socket path or pipe name to listen on, see default_address()
+        :param authkey: A shared secret clients must also pass to request()
+        :param timeout: Seconds a request waits for the main loop, and a choose request for a selection,
+                        before it is answered with an error or, for a choose request, without a selection
+        :param chooser_args: Additional Popup arguments for the chooser, e.g. width and height
+        '''
+        self.manager = manager or PopupManager()
+        self.address = address or default_address()
+        self.authkey = authkey
+        self.timeout = timeout
+        self.popups = {}
+        self.listener = None
+        self._chooser_lock = threading.Lock()  # One choose request is shown at a time
+        self._choice = None  # The future of the shown choose request
+        chooser_args.setdefault('width', 400)
+        chooser_args.setdefault('height', 300)
+        self.chooser = self.manager.add(None, self._build_chooser, **chooser_args)
+
+    def add(self, name: str, build: Callable, hotkey: str = None, **popup_args: any):
+        '''
+        Adds a popup clients can show by name
+
+        :param name: The name clients refer to the popup by
+        :param build: The function that builds the popup window
+        :param hotkey: An optional keybind that also toggles the popup
+        :param popup_args: Additional Popup arguments
+
+        :return: The popup
+        '''
+        popup = self.manager.add(hotkey, build, **popup_args)
+        self.popups[name] = popup
+        return popup
+
+    def serve(self):
+        '''
+        Listens for clients and runs the main loop until a quit request or quit() is called
+        '''
+        if _family(self.address) == 'AF_UNIX' and os.path.exists(self.address):
+            try:  # A socket file left behind by a daemon which did not exit cleanly
+                request({'op': 'ping'}, self.address, self.authkey)
+            except OSError:
+                os.unlink(self.address)
+            except AuthenticationError:  # Listening, but with another authkey
+                raise RuntimeError(f"A popui daemon is already listening on {self.address}") from None
+            else:
+                raise RuntimeError(f"A popui daemon is already listening on {self.address}")
+        self.listener = Listener(self.address, _family(self.address), authkey=self.authkey)
+        threading.Thread(target=self._accept, daemon=True).start()
+        try:
+            self.manager.block()
+        finally:
+            listener, self.listener = self.listener, None
+            listener.close()
+
+    def quit(self):
+        self.manager.quit()
+
+    def _accept(self):
+        while self.listener:
+            try:
+                connection = self.listener.accept()
+            except (OSError, EOFError, AuthenticationError):  # Including clients with the wrong authkey
+                if self.listener:
+                    continue
+                return
+            threading.Thread(target=self._serve_client, args=(connection,), daemon=True).start()
+
+    def _serve_client(self, connection):
+        with connection:
+            while True:
+                try:
+                    message = json.loads(connection.recv_bytes())
+                except (EOFError, OSError):
+                    return
+                except ValueError as e:
+                    response = {'ok': False, 'error': f"Invalid message: {e}"}
+                else:
+                    response = self.handle(message, connection)
+                try:
+                    connection.send_bytes(json.dumps(response, separators=(',', ':')).encode())
+                except OSError:
+                    return
+
+    def handle(self, message: dict, connection=None):
+        '''
+        Handles a request on the calling thread and returns the response
+
+        :param message: The request
+        :param connection: The client's connection, whose closing cancels a choose request
+        '''
+        op = message.get('op') if isinstance(message, dict) else None
+        try:
+            if op == 'ping':
+                return {'ok': True}
+            if op == 'show':
+                popup = self.popups.get(message.get('popup'))
+                if popup is None:
+                    return {'ok': False, 'error': f"Unknown popup: {message.get('popup')}"}
+                return self._on_main_response(partial(self._show, popup), connection)
+            if op == 'hide':
+                return self._on_main_response(self._hide, connection)
+            if op == 'choose':
+                return self._choose(message.get('items') or [], message.get('prompt', ''), connection)
+            if op == 'quit':
+                self.quit()
+                return {'ok': True}
+        except Exception as e:
+            return {'ok': False, 'error': str(e)}
+        return {'ok': False, 'error': f"Unknown op: {op}"}
+
+    def _on_main_response(self, function: Callable, connection=None):
+        '''
+        Runs a function on the main loop and returns the response, or an error if the main loop does
+        not run it within the timeout
+        '''
+        future = self._on_main(function)
+        if not self._wait(future, connection):
+            return {'ok': False, 'error': "Timed out waiting for the main loop"}
+        future.result()
+        return {'ok': True}
+
+    @staticmethod
+    def _show(popup):
+        if not popup.open:
+            popup.show()
+
+    def _hide(self):
+        popup = self.manager.active
+        if popup and popup.open:
+            popup.hide()
+
+    def _on_main(self, function: Callable):
+        '''
+        Runs a function on the main loop and returns a future of its result
+        '''
+        future = Future()
+
+        def run():
+            try:
+                future.set_result(function())
+            except Exception as e:
+                future.set_exception(e)
+        self.manager.run_on_main(run)
+        return future
+
+    # Chooser
+    def _build_chooser(self, popup):
+        self.prompt = popup.gui.add_text(default_value='', parent=popup.root, show=False)
+        self.palette = popup.add_command_palette([], close=False, parent=popup.root)
+        popup.add_visibility_callback(self._chooser_visibility)
+
+    def _choose(self, items: list, prompt: str, connection=None):
+        if not self._chooser_lock.acquire(timeout=self.timeout):
+            return {'ok': False, 'error': "Timed out waiting for another choose request"}
+        try:
+            choice = Future()
+
+            def open_():
+                if choice.cancelled():  # Timed out before the main loop got to it
+                    return
+                self._choice = choice
+                self.chooser.gui.set_value(self.prompt, prompt)
+                self.chooser.gui.configure_item(self.prompt, show=bool(prompt))
+                self.palette.set_commands([(str(item), partial(self._chosen, index)) for index, item in enumerate(items)])
+                self.chooser.show()
+            opened = self._on_main(open_)
+            index = None
+            if self._wait(opened, connection):
+                opened.result()
+                self._wait(choice, connection)
+            if choice.cancel():  # Neither chosen nor closed, close it without a selection
+                self._on_main(partial(self._close_chooser, choice))
+            else:
+                index = choice.result()
+        finally:
+            self._chooser_lock.release()
+        return {'ok': True, 'index': index, 'choice': items[index] if index is not None else None}
+
+    def _wait(self, future: Future, connection=None):
+        '''
+        Waits for a future until the timeout or the client disconnects, and returns whether it finished
+        '''
+        for _ in range(max(round(self.timeout / 0.1), 1)):
+            if wait([future], timeout=0.1).done:
+                return True
+            if connection is not None and _disconnected(connection):
+                return False
+        return future.done()
+
+    def _chosen(self, index: int):
+        choice, self._choice = self._choice, None
+        if choice and choice.set_running_or_notify_cancel():
+            choice.set_result(index)
+        self.chooser.hide()
+
+    def _close_chooser(self, choice: Future):
+        if self._choice is choice:
+            self._choice = None
+            if self.chooser.open:
+                self.chooser.hide()
+
+    def _chooser_visibility(self, visible: bool):
+        if not visible and self._choice:  # Closed without a selection
+            choice, self._choice = self._choice, None
+            if choice.set_running_or_notify_cancel():
+                choice.set_result(None)
+
+
+def _disconnected(connection):
+    '''
+    Returns whether a client closed its connection. Clients send nothing while they wait for a
+    response, so a readable connection is one at its end.
+    '''
+    try:
+        return connection.poll()
+    except (OSError, EOFError, AuthenticationError):
+        return True
+
+
+def request(message: dict, address: str = None, authkey: bytes = None):
+    '''
+    Sends a request to a running daemon and returns its response
+
+    :param message: The request, e.g. {'op': 'choose', 'items': ['a', 'b']}
+    :param address: The daemon's socket path or pipe name, see default_address()
+    :param authkey: The daemon's shared secret, if it has one
+    '''
+    address = address or default_address()
+    with Client(address, _family(address), authkey=authkey) as connection:
+        connection.send_bytes(json.dumps(message, separators=(',', ':')).encode())
+        return json.loads(connection.recv_bytes())
+
+
+def main(arguments: list[str] = None):
+    parser = argparse.ArgumentParser(prog='popui', description='Runs or talks to a resident popui daemon')
+    parser.add_argument('--address', help='The socket path or pipe name, a per-user default if omitted')
+    commands = parser.add_subparsers(dest='command', required=True)
+    serve = commands.add_parser('serve', help='Run the daemon')
+    serve.add_argument('--popups', action='append', default=[],
+                       help='A "module:function" called with the daemon to add popups, may be repeated')
+    serve.add_argument('--render-on-demand', action='store_true', help='Render only when needed while idle')
+    serve.add_argument('--simulated', action='store_true', help='Use the simulated backend, for testing')
+    show = commands.add_parser('show', help='Show a popup added by --popups')
+    show.add_argument('popup')
+    choose = commands.add_parser('choose', help='Choose one of the items and print it')
+    choose.add_argument('items', nargs='+')
+    choose.add_argument('--prompt', default='')
+    commands.add_parser('ping', help='Check that the daemon is running')
+    commands.add_parser('quit', help='Stop the daemon')
+    args = parser.parse_args(arguments)
+
+    if args.command == 'serve':
+        backend = None
+        if args.simulated:
+            from .simulated import SimulatedBackend
+            backend = SimulatedBackend()
+        render_mode = PopupManager.RENDER_ON_DEMAND if args.render_on_demand else PopupManager.RENDER_CONTINUOUS
+        daemon = PopupDaemon(PopupManager(render_mode=render_mode, backend=backend), args.address)
+        for reference in args.popups:
+            module, _, function = reference.partition(':')
+            getattr(importlib.import_module(module), function)(daemon)
+        daemon.serve()
+        return 0
+
+    message = {'op': args.command}
+    if args.command == 'show':
+        message['popup'] = args.popup
+    elif args.command == 'choose':
+        message.update(items=args.items, prompt=args.prompt)
+    try:
+        response = request(message, args.address)
+    except (OSError, AuthenticationError) as e:
+        print(f"Could not reach the popui daemon: {e}", file=sys.stderr)
+        return 2
+    if not response.get('ok'):
+        print(response.get('error'), file=sys.stderr)
+        return 1
+    if args.command == 'choose':
+        if response['index'] is None:
+            return 1
+        print(response['choice'])
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,76 @@
+import threading
+from collections import Counter
+from typing import Callable
+
+
+class CallbackExecutor:
+    '''
+    Runs callbacks off the render thread on a bounded thread or process pool.
+
+    Each callback can limit how many of its invocations run at once. An invocation past the
+    limit is dropped, which stops repeated clicks on a slow button from piling up work.
+    The pool, and concurrent.futures with it, is created by the first submit().
+    '''
+
+    def __init__(self, max_workers: int = 4, processes: bool = False):
+        '''
+        :param max_workers: The size of the pool
+        :param processes: Use a process pool instead of a thread pool. Callbacks and their
+                          results must then be picklable, e.g. module level functions
+        '''
+        self.max_workers = max_workers
+        self.processes = processes
+        self._pool = None
+        self._running = Counter()
+        self._lock = threading.Lock()
+
+    def running(self, key=None):
+        '''
+        Returns how many invocations of a callback, or of all callbacks, are running
+        '''
+        with self._lock:
+            return self._running[key] if key is not None else sum(self._running.values())
+
+    def submit(self, function: Callable, *, key=None, limit: int = None, done: Callable = None):
+        '''
+        Runs a function on the pool
+
+        :param function: The function to run
+        :param key: What the limit is counted against, the function itself by default
+        :param limit: The maximum number of invocations with this key running at once, or None
+        :param done: Called with the finished future, on a worker thread
+
+        :return: The future, or None if the invocation was dropped because of the limit
+        '''
+        key = function if key is None else key
+        with self._lock:
+            if limit is not None and self._running[key] >= limit:
+                return None
+            self._running[key] += 1
+            if self._pool is None:
+                if self.processes:
+                    from concurrent.futures import ProcessPoolExecutor as pool_type
+                else:
+                    from concurrent.futures import ThreadPoolExecutor as pool_type
+                self._pool = pool_type(max_workers=self.max_workers)
+
+        def finished(future):
+            with self._lock:
+                self._running[key] -= 1
+                if not self._running[key]:
+                    del self._running[key]
+            if done:
+                done(future)
+
+        future = self._pool.submit(function)
+        future.add_done_callback(finished)
+        return future
+
+    def shutdown(self, wait: bool = False):
+        '''
+        Stops the pool, cancelling callbacks that have not started yet
+        '''
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool:
+            pool.shutdown(wait=wait, cancel_futures=True)
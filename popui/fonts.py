@@ -0,0 +1,167 @@
+'''
+Fonts rasterized at the DPI of the monitor the viewport is on, so text is crisp at any display scaling.
+
+Dear PyGui rasterizes every registered font into a single atlas, rebuilt on the next frame whenever a
+font is added. Each font is registered once per (file, size, DPI, glyph ranges) for the life of the
+context, so moving between monitors binds a font which is already in the atlas.
+
+Dear PyGui cannot save or load a rasterized atlas, so the disk cache records which DPIs each font
+was needed at instead. A later start registers all of them before its first frame, and its one
+atlas build then covers every monitor, where a cold start rebuilds the atlas on the first show on
+a monitor with a new DPI.
+'''
+import json
+import os
+
+from .monitors import BASE_DPI
+
+
+def default_cache_dir():
+    base = os.environ.get('LOCALAPPDATA') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'popui', 'fonts')
+
+
+class FontCache:
+    '''
+    The font of a manager's popups, registered at each DPI it is shown at
+    '''
+
+    def __init__(self,
+                 manager,
+                 font: str = None,
+                 size: float = 13,
+                 glyph_ranges: list = (),
+                 cache_dir: str = None,
+                 scale_builtin: bool = False):
+        '''
+        :param manager: The manager whose Dear PyGui context holds the fonts
+        :param font: A TTF or OTF font file, or None to use Dear PyGui's built-in font
+        :param size: The font size in pixels at 96 DPI (100% scaling)
+        :param glyph_ranges: Glyphs to rasterize besides the default Latin ones, each a Dear PyGui
+                             range hint (e.g. dpg.mvFontRangeHint_Cyrillic) or a (first, last) pair of code points
+        :param cache_dir: Where the DPIs each font was needed at are recorded, or False to disable the cache
+        :param scale_builtin: Scale the built-in font to the DPI when there is no font file. The built-in
+                              font is a bitmap, so scaled text is blurry and every popup's text changes size
+        '''
+        self.manager = manager
+        self.gui = manager.gui
+        self.font = os.path.abspath(font) if font else None
+        self.size = size
+        self.glyph_ranges = tuple(tuple(entry) if isinstance(entry, (list, tuple)) else entry for entry in glyph_ranges)
+        self.cache_dir = default_cache_dir() if cache_dir is None else cache_dir
+        self.scale_builtin = scale_builtin
+        self.dpi = None  # The DPI of the bound font
+        self.added = 0  # Fonts registered since setup(), each of which rebuilt the atlas
+        self._fonts = {}  # (file, size, DPI, glyph ranges) -> font item
+        self._registry = None
+
+    @property
+    def _key(self):
+        return json.dumps([self.font, self.size, self.glyph_ranges])
+
+    def setup(self, dpi: float):
+        '''
+        Registers the font at every DPI recorded for it and binds it at a DPI. Called when the
+        viewport is created, before its first frame.
+        '''
+        if self.font:
+            try:
+                for recorded in self._recorded():
+                    self._get_font(recorded)
+            except Exception:  # Reported by apply(), which falls back to the built-in font
+                pass
+        self.apply(dpi)
+        self.added = 0
+
+    def apply(self, dpi: float):
+        '''
+        Binds the font rasterized at a DPI, registering it the first time that DPI is needed.
+        Without a font file, or if it cannot be loaded, keeps the built-in font at its own size
+        unless scale_builtin is set.
+        '''
+        if dpi == self.dpi:
+            return
+        self.dpi = dpi
+        if self.font is None:
+            self._scale_builtin(dpi)
+            return
+        known = len(self._fonts)
+        try:
+            font = self._get_font(dpi)
+        except Exception as e:
+            print(f"Error loading font {self.font}: {e}")
+            self.font = None
+            self._scale_builtin(dpi)
+            return
+        if len(self._fonts) != known:
+            self.added += 1
+            self._record(dpi)
+        self.gui.bind_font(font)
+
+    def _scale_builtin(self, dpi: float):
+        if self.scale_builtin:
+            self.gui.set_global_font_scale(dpi / BASE_DPI)
+
+    def _get_font(self, dpi: float):
+        key = (self.font, self.size, dpi, self.glyph_ranges)
+        font = self._fonts.get(key)
+        if font is None:
+            if self._registry is None:
+                self._registry = self.gui.add_font_registry()
+            font = self.gui.add_font(file=self.font, size=round(self.size * dpi / BASE_DPI), parent=self._registry)
+            for entry in self.glyph_ranges:
+                if isinstance(entry, tuple):
+                    self.gui.add_font_range(first_char=entry[0], last_char=entry[1], parent=font)
+                else:
+                    self.gui.add_font_range_hint(hint=entry, parent=font)
+            self._fonts[key] = font
+        return font
+
+    def _recorded(self):
+        '''
+        Returns the DPIs the font was needed at by earlier runs
+        '''
+        if not self.cache_dir:
+            return []
+        try:
+            with open(os.path.join(self.cache_dir, 'dpis.json'), encoding='utf-8') as file:
+                return json.load(file).get(self._key, [])
+        except (OSError, ValueError):
+            return []
+
+    def _record(self, dpi: float):
+        if not self.cache_dir:
+            return
+        path = os.path.join(self.cache_dir, 'dpis.json')
+        try:
+            with open(path, encoding='utf-8') as file:
+                recorded = json.load(file)
+        except (OSError, ValueError):
+            recorded = {}
+        dpis = recorded.setdefault(self._key, [])
+        if dpi in dpis:
+            return
+        dpis.append(dpi)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            temporary = f'{path}.{os.getpid()}.tmp'
+            with open(temporary, 'w', encoding='utf-8') as file:
+                json.dump(recorded, file)
+            os.replace(temporary, path)
+        except OSError:
+            pass  # The cache is an optimization, a read-only directory is not an error
+
+    def stats(self):
+        '''
+        Returns {'fonts', 'added', 'dpi'}: the fonts registered, how many were registered after
+        setup() and so rebuilt the atlas, and the DPI of the bound font
+        '''
+        return {'fonts': len(self._fonts), 'added': self.added, 'dpi': self.dpi}
+
+    def clear(self):
+        '''
+        Forgets every font, e.g. after the Dear PyGui context was destroyed
+        '''
+        self._fonts.clear()
+        self._registry = None
+        self.dpi = None
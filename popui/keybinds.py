@@ -0,0 +1,118 @@
+from collections import Counter
+from itertools import count
+from typing import Callable
+
+
+class Keybind:
+    '''
+    A compiled keybind, returned by Popup.add_keybind() and accepted by Popup.remove_keybind()
+    '''
+    __slots__ = ('key', 'modifiers', 'action', 'callback', 'order', 'condition')
+
+    def __init__(self, key: int, modifiers: frozenset, action: int, callback: Callable, order: int,
+                 condition: Callable[[], bool] = None):
+        self.key = key
+        self.modifiers = modifiers
+        self.action = action
+        self.callback = callback
+        self.order = order
+        self.condition = condition  # While it returns False, the keybind neither fires nor shadows others
+
+    def __repr__(self):
+        return f"Keybind(key={self.key}, modifiers={set(self.modifiers)}, action={self.action})"
+
+
+class KeybindDispatcher:
+    '''
+    Resolves key events to keybinds through a single handler per key action.
+
+    Keybinds are indexed by (action, key) and ordered by modifier specificity, so that when
+    several keybinds match, the one with the most modifiers wins and ties go to the most
+    recently added. Keybinds whose condition is false, e.g. those of a hidden tab, are skipped
+    before that rule is applied. The matching keybinds are memoized per modifier snapshot, so
+    a lookup only evaluates conditions until the keybinds change.
+    '''
+
+    def __init__(self, is_key_down: Callable[[int], bool]):
+        '''
+        :param is_key_down: Returns whether a key is currently held down
+        '''
+        self._is_key_down = is_key_down
+        self._index = {}
+        self._resolved = {}
+        self._modifier_counts = Counter()
+        self._modifier_keys = ()
+        self._order = count()
+
+    def add(self, key: int, modifiers, action: int, callback: Callable, condition: Callable[[], bool] = None):
+        '''
+        Registers a keybind and returns it
+
+        :param key: The key code
+        :param modifiers: The modifier key codes that must be held down
+        :param action: The key action to listen for
+        :param callback: The function to call when the keybind fires
+        :param condition: A function returning whether the keybind is active, or None if it always is
+        '''
+        keybind = Keybind(key, frozenset(modifiers), action, callback, next(self._order), condition)
+        bucket = self._index.setdefault((action, key), [])
+        bucket.append(keybind)
+        bucket.sort(key=lambda keybind: (len(keybind.modifiers), keybind.order), reverse=True)
+        self._modifier_counts.update(keybind.modifiers)
+        self._modifier_keys = tuple(self._modifier_counts)
+        self._resolved.clear()
+        return keybind
+
+    def remove(self, keybind: Keybind):
+        '''
+        Unregisters a keybind. Removing a keybind twice has no effect.
+        '''
+        bucket = self._index.get((keybind.action, keybind.key))
+        if not bucket or keybind not in bucket:
+            return
+        bucket.remove(keybind)
+        if not bucket:
+            del self._index[(keybind.action, keybind.key)]
+        self._modifier_counts.subtract(keybind.modifiers)
+        self._modifier_counts += Counter()  # Drop modifiers that are no longer used
+        self._modifier_keys = tuple(self._modifier_counts)
+        self._resolved.clear()
+
+    def __len__(self):
+        return sum(len(bucket) for bucket in self._index.values())
+
+    def actions(self):
+        '''
+        Returns the key actions that have at least one keybind
+        '''
+        return {action for action, _ in self._index}
+
+    def snapshot(self):
+        '''
+        Returns the set of modifier keys currently held down, polling only the keys that
+        are used as modifiers by some keybind
+        '''
+        return frozenset(key for key in self._modifier_keys if self._is_key_down(key))
+
+    def resolve(self, action: int, key: int, snapshot: frozenset = None):
+        '''
+        Returns the keybind that should fire for a key event, or None
+
+        :param action: The key action that occurred
+        :param key: The key code
+        :param snapshot: The modifiers held down, taken with snapshot() if omitted
+        '''
+        bucket = self._index.get((action, key))
+        if not bucket:
+            return None
+        if snapshot is None:
+            snapshot = self.snapshot()
+        lookup = (action, key, snapshot)
+        try:
+            candidates = self._resolved[lookup]
+        except KeyError:
+            candidates = self._resolved[lookup] = [keybind for keybind in bucket if keybind.modifiers <= snapshot]
+        for keybind in candidates:
+            if keybind.condition is None or keybind.condition():
+                return keybind
+        return None
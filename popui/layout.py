@@ -0,0 +1,371 @@
+'''
+Declarative popup layouts.
+
+A layout is a list of items, given as Python data or in a JSON or TOML file:
+
+    [[items]]
+    button = "Copy"
+    callback = "copy"
+    keybind = "c"
+
+    [[items]]
+    row = [{button = "Left", callback = "left"}, {button = "Right", callback = "right"}]
+
+Item types are button, text, separator, row (buttons side by side in table cells),
+group (optionally horizontal) and key (a keybind without a button). Callbacks are names looked
+up in the callbacks given to the layout, "module:function" import paths, or hide, quit and no_op
+for the popup's own.
+Any item can have an id, which keeps it identified across edits when the layout is reloaded.
+
+Layouts are compiled into a flat plan of construction steps. Plans compiled from files are cached
+on disk by the file's path and the hash of its contents, so later starts skip parsing and validating
+the file. Only the plan of each file's latest contents is kept.
+'''
+import hashlib
+import importlib
+import json
+import os
+import threading
+from typing import Callable
+
+try:
+    import tomllib
+except ImportError:  # Python < 3.11
+    try:
+        import tomli as tomllib
+    except ImportError:
+        tomllib = None
+
+PLAN_VERSION = 1  # Bump when the plan format changes, to invalidate cached plans
+
+_FIELDS = {
+    'button': {'callback': str, 'close': bool, 'keybind': str, 'width': int},
+    'text': {},
+    'separator': {},
+    'row': {},
+    'group': {'horizontal': bool},
+    'key': {'callback': str, 'modifiers': list, 'action': str},
+}
+_CONTAINERS = ('row', 'group')
+_ACTIONS = {'press': 0, 'down': 1, 'up': 2}  # Popup.KEY_PRESS, Popup.KEY_DOWN, Popup.KEY_UP
+_LABELS = {'button': 'label', 'text': 'value'}  # Arguments which can be updated in place
+
+
+def default_cache_dir():
+    base = os.environ.get('LOCALAPPDATA') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'popui', 'layouts')
+
+
+def compile_layout(spec):
+    '''
+    Validates a layout and compiles it into a flat plan: a list of steps in construction order,
+    each a dictionary of its key, type, parent key, table cell and arguments
+
+    :param spec: A list of items, or a dictionary with an "items" list
+    '''
+    if isinstance(spec, dict):
+        spec = spec.get('items', [])
+    if not isinstance(spec, list):
+        raise ValueError("Invalid layout: expected a list of items")
+    plan = []
+    for index, item in enumerate(spec):
+        _compile_item(item, None, None, str(index), plan)
+    keys = [step['key'] for step in plan]
+    if len(keys) != len(set(keys)):
+        raise ValueError("Invalid layout: item ids must be unique")
+    return plan
+
+
+def _compile_item(item, parent, cell, path, plan):
+    if not isinstance(item, dict):
+        raise ValueError(f"Invalid layout item {path}: expected a table of fields")
+    types = [type_ for type_ in _FIELDS if type_ in item]
+    if len(types) != 1:
+        raise ValueError(f"Invalid layout item {path}: expected exactly one of {', '.join(_FIELDS)}")
+    type_ = types[0]
+    fields = _FIELDS[type_]
+    for field, value in item.items():
+        if field in (type_, 'id'):
+            continue
+        if field not in fields:
+            raise ValueError(f"Invalid layout item {path}: unknown field {field!r} for {type_}")
+        if not isinstance(value, fields[field]):
+            raise ValueError(f"Invalid layout item {path}: {field} must be a {fields[field].__name__}")
+    key = str(item.get('id', path))
+    value = item[type_]
+    args = {field: value for field, value in item.items() if field not in (type_, 'id')}
+
+    if type_ in _CONTAINERS:
+        if not isinstance(value, list):
+            raise ValueError(f"Invalid layout item {path}: {type_} must be a list of items")
+        if type_ == 'row' and not value:
+            raise ValueError(f"Invalid layout item {path}: a row needs at least one item")
+        if type_ == 'row':
+            args['cells'] = len(value)
+        plan.append({'key': key, 'type': type_, 'parent': parent, 'cell': cell, 'args': args})
+        for index, child in enumerate(value):
+            _compile_item(child, key, index if type_ == 'row' else None, f'{path}.{index}', plan)
+        return
+
+    if type_ == 'button':
+        if not isinstance(value, str) or 'callback' not in args:
+            raise ValueError(f"Invalid layout item {path}: a button needs a label and a callback")
+        args['label'] = value
+    elif type_ == 'text':
+        args['value'] = str(value)
+    elif type_ == 'key':
+        if not isinstance(value, str) or 'callback' not in args:
+            raise ValueError(f"Invalid layout item {path}: a keybind needs a key and a callback")
+        if args.get('action', 'press') not in _ACTIONS:
+            raise ValueError(f"Invalid layout item {path}: action must be one of {', '.join(_ACTIONS)}")
+        args['key'] = value
+    plan.append({'key': key, 'type': type_, 'parent': parent, 'cell': cell, 'args': args})
+
+
+def load_plan(path: str, cache_dir: str = None):
+    '''
+    Returns the compiled plan of a JSON or TOML layout file, from the plan cache if the file is unchanged
+
+    :param path: The layout file
+    :param cache_dir: Where compiled plans are cached, or False to disable caching
+    '''
+    with open(path, 'rb') as file:
+        source = file.read()
+    digest = hashlib.sha256(source + str(PLAN_VERSION).encode()).hexdigest()
+    prefix = hashlib.sha256(os.path.abspath(path).encode()).hexdigest()[:16] + '-'
+    cache_dir = default_cache_dir() if cache_dir is None else cache_dir
+    cached = os.path.join(cache_dir, prefix + digest + '.json') if cache_dir else None
+    if cached:
+        try:
+            with open(cached, encoding='utf-8') as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            pass
+
+    if path.endswith('.toml'):
+        if tomllib is None:
+            raise ImportError("Reading TOML layouts requires Python 3.11 or the tomli package")
+        spec = tomllib.loads(source.decode('utf-8'))
+    else:
+        spec = json.loads(source)
+    plan = compile_layout(spec)
+    if cached:
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            temporary = f'{cached}.{os.getpid()}.tmp'
+            with open(temporary, 'w', encoding='utf-8') as file:
+                json.dump(plan, file, separators=(',', ':'))
+            os.replace(temporary, cached)
+            for name in os.listdir(cache_dir):  # The plans of the file's earlier contents
+                if name.startswith(prefix) and name.endswith('.json') and name != os.path.basename(cached):
+                    os.remove(os.path.join(cache_dir, name))
+        except OSError:
+            pass  # The cache is an optimization, a read-only directory is not an error
+    return plan
+
+
+class Layout:
+    '''
+    Builds a compiled layout into a popup and keeps the created items, so that a reloaded
+    layout can be applied by creating, updating and deleting only the items that changed
+    '''
+
+    def __init__(self, popup, source, callbacks: dict[str, Callable] = None, cache_dir: str = None, parent: int = None):
+        '''
+        :param popup: The popup to build the layout into
+        :param source: The path of a JSON or TOML layout file, or the layout as Python data
+        :param callbacks: The functions the layout's callbacks refer to, by name
+        :param cache_dir: Where compiled plans are cached, or False to disable caching
+        :param parent: The container to build into, the current container by default
+        '''
+        self.popup = popup
+        self.gui = popup.gui
+        self.source = source
+        self.cache_dir = cache_dir
+        self.callbacks = {'hide': popup.hide, 'quit': popup.quit, 'no_op': popup.no_op, **(callbacks or {})}
+        self.parent = parent or self.gui.top_container_stack() or popup.root
+        self.plan = []
+        self.items = {}  # Step key -> item ID, or cell IDs for rows
+        self._rows = {}  # Step key -> table ID for rows
+        self.keybinds = {}  # Step key -> Keybind
+        self._mtime = None
+        self._watcher = None
+        self._stop = threading.Event()
+
+    def _load(self):
+        if isinstance(self.source, (str, os.PathLike)):
+            path = os.fspath(self.source)
+            self._mtime = os.stat(path).st_mtime_ns
+            return load_plan(path, self.cache_dir)
+        return compile_layout(self.source)
+
+    def build(self):
+        '''
+        Builds the layout for the first time
+
+        :return: The layout, for chaining
+        '''
+        self.plan = self._load()
+        for step in self.plan:
+            self._create(step)
+        return self
+
+    def reload(self, source=None):
+        '''
+        Applies the current contents of the layout, or a new layout, to the built items.
+        Items whose label or text changed are updated in place, removed items are deleted,
+        and new or otherwise changed items are created in their place.
+
+        :return: The number of steps which were applied
+        '''
+        if source is not None:
+            self.source = source
+        plan = self._load()
+        previous = {step['key']: step for step in self.plan}
+        current = {step['key']: step for step in plan}
+
+        recreated = set()
+        updated = []
+        for step in plan:
+            old = previous.get(step['key'])
+            if old == step:
+                if step['parent'] in recreated:
+                    recreated.add(step['key'])
+            elif old and step['parent'] not in recreated and self._updatable(old, step):
+                updated.append(step)
+            else:
+                recreated.add(step['key'])
+        removed = {key for key in previous if key not in current or key in recreated}
+
+        for key in removed:
+            # Deleting a container deletes its children
+            self._delete(previous[key], delete_item=previous[key]['parent'] not in removed)
+        for step in updated:
+            field = _LABELS[step['type']]
+            if step['type'] == 'text':
+                self.gui.set_value(self.items[step['key']], step['args'][field])
+            else:
+                self.gui.configure_item(self.items[step['key']], label=step['args'][field])
+        for index, step in enumerate(plan):
+            if step['key'] in recreated:
+                self._create(step, before=self._next_sibling(plan, index))
+        self.plan = plan
+        self.popup.mark_dirty()
+        return len(removed) + len(updated) + len(recreated)
+
+    def watch(self, interval: float = 0.5):
+        '''
+        Reloads the layout file on the main loop whenever it changes
+
+        :param interval: Seconds between checks of the file's modification time
+        '''
+        if self._watcher or not isinstance(self.source, (str, os.PathLike)):
+            return self
+        self._stop = threading.Event()  # Its own, so a stopping watcher cannot miss its stop
+        self._watcher = threading.Thread(target=self._watch, args=(interval, self._stop), daemon=True)
+        self._watcher.start()
+        return self
+
+    def stop_watching(self):
+        '''
+        Stops watching the layout file and waits for the watcher to exit
+        '''
+        watcher, self._watcher = self._watcher, None
+        self._stop.set()
+        if watcher and watcher is not threading.current_thread():
+            watcher.join()
+
+    def _watch(self, interval: float, stop: threading.Event):
+        while not stop.wait(interval):
+            try:
+                changed = os.stat(self.source).st_mtime_ns != self._mtime
+            except OSError:
+                continue
+            if changed:
+                self.popup.run_on_main(self._reload_changed, key=(self, 'reload'))
+
+    def _reload_changed(self):
+        try:
+            self.reload()
+        except Exception as e:  # Keep the previous layout while the file is being edited
+            print(f"Error in callback: {e}")
+
+    @staticmethod
+    def _updatable(old: dict, new: dict):
+        '''
+        Returns whether a step differs only in its label or text, which can be changed in place
+        '''
+        field = _LABELS.get(new['type'])
+        if not field or old['type'] != new['type'] or (old['parent'], old['cell']) != (new['parent'], new['cell']):
+            return False
+        return {**old['args'], field: None} == {**new['args'], field: None}
+
+    def _next_sibling(self, plan: list, index: int):
+        '''
+        Returns the item of the next existing step in the same container, to create a step before it
+        '''
+        step = plan[index]
+        for sibling in plan[index + 1:]:
+            if (sibling['parent'], sibling['cell']) == (step['parent'], step['cell']) and sibling['key'] in self.items:
+                if sibling['type'] != 'key':
+                    return self.items[sibling['key']] if sibling['type'] != 'row' else self._rows[sibling['key']]
+        return 0
+
+    def _callback(self, name: str):
+        if name in self.callbacks:
+            return self.callbacks[name]
+        module, _, attribute = name.partition(':')
+        if not attribute:
+            raise ValueError(f"Unknown layout callback: {name}")
+        return getattr(importlib.import_module(module), attribute)
+
+    def _container(self, step: dict):
+        if step['parent'] is None:
+            return self.parent
+        parent = self.items[step['parent']]
+        return parent[step['cell']] if step['cell'] is not None else parent
+
+    def _create(self, step: dict, before: int = 0):
+        gui, popup, args = self.gui, self.popup, step['args']
+        parent = self._container(step)
+        type_ = step['type']
+        if type_ == 'button':
+            kwargs = {'width': args['width']} if 'width' in args else {}
+            button = popup.add_button(args['label'],
+                                      self._callback(args['callback']),
+                                      close=args.get('close', True),
+                                      parent=parent,
+                                      before=before,
+                                      **kwargs)
+            if 'keybind' in args:
+                callback = gui.get_item_configuration(button)['callback']
+                self.keybinds[step['key']] = popup.add_keybind(args['keybind'], callback,
+                                                               condition=popup._is_visible(button))
+            self.items[step['key']] = button
+        elif type_ == 'text':
+            self.items[step['key']] = gui.add_text(default_value=args['value'], parent=parent, before=before)
+        elif type_ == 'separator':
+            self.items[step['key']] = gui.add_separator(parent=parent, before=before)
+        elif type_ == 'group':
+            self.items[step['key']] = gui.add_group(horizontal=args.get('horizontal', False), parent=parent, before=before)
+        elif type_ == 'row':
+            cells = popup.add_horizontal_group(args['cells'], parent=parent, before=before)
+            self._rows[step['key']] = gui.get_item_parent(gui.get_item_parent(cells[0]))  # Cell -> row -> table
+            self.items[step['key']] = cells
+        elif type_ == 'key':
+            action = _ACTIONS[args.get('action', 'press')]
+            self.keybinds[step['key']] = popup.add_keybind(args['key'],
+                                                           self._callback(args['callback']),
+                                                           modifiers=tuple(args.get('modifiers', ())),
+                                                           action=action)
+            self.items[step['key']] = None
+
+    def _delete(self, step: dict, delete_item: bool = True):
+        key = step['key']
+        keybind = self.keybinds.pop(key, None)
+        if keybind:
+            self.popup.remove_keybind(keybind)
+        item = self._rows.pop(key, None) if step['type'] == 'row' else self.items.get(key)
+        self.items.pop(key, None)
+        if delete_item and item is not None:
+            self.gui.delete_item(item)
@@ -0,0 +1,358 @@
+import sys
+import threading
+import faulthandler
+from time import perf_counter, perf_counter_ns
+from typing import Callable
+
+from .actions import ActionQueue
+from .backend import Backend, DesktopBackend
+from .executor import CallbackExecutor
+from .monitors import MonitorIndex
+from .profiler import Profiler
+from .fonts import FontCache
+from .textures import TextureCache
+
+
+_loop = None
+_loop_lock = threading.Lock()
+
+
+def background_loop():
+    '''
+    Returns the event loop that runs coroutine callbacks and polls bindings when the main loop was
+    started with block(), starting it on a daemon thread the first time
+    '''
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            import asyncio
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name='popui-async', daemon=True).start()
+        return _loop
+
+
+def _enable_crash_reports():
+    '''
+    Reports crashes inside Dear PyGui with faulthandler, to a temporary file if the process has no stderr (pythonw)
+    '''
+    if not sys.stderr:
+        from tempfile import NamedTemporaryFile
+        sys.stderr = NamedTemporaryFile(delete=False)
+    faulthandler.enable()
+
+
+class PopupManager:
+    '''
+    Runs many popups in one process, sharing a single Dear PyGui context and viewport,
+    a single hotkey listener and a single main loop.
+
+    Only one popup is shown at a time. Showing a popup makes its root window the primary
+    window and resizes the viewport to the popup's width and height.
+    A Popup created without a manager gets a private one.
+    '''
+
+    RENDER_CONTINUOUS = 0
+    RENDER_ON_DEMAND = 1
+
+    OFFSCREEN = -32000  # Where hidden viewports are created, so they never flash on screen
+
+    def __init__(self,
+                 *,
+                 render_mode: int = RENDER_CONTINUOUS,
+                 idle_fps: float = 10,
+                 backend: Backend = None,
+                 executor: CallbackExecutor = None,
+                 frame_budget: float = 0.004,
+                 profile: bool = False,
+                 texture_budget: int = 64 * 2 ** 20,
+                 font: str = None,
+                 font_size: float = 13,
+                 glyph_ranges: list = (),
+                 scale_builtin_font: bool = False,
+                 **viewport_args: any):
+        '''
+        :param render_mode: How block() schedules frames (PopupManager.RENDER_CONTINUOUS, PopupManager.RENDER_ON_DEMAND).
+                            On demand, a hidden popup sleeps until the hotkey wakes it and a visible one
+                            renders only on input, due frame callbacks or after mark_dirty()
+        :param idle_fps: The frame rate cap for a visible but idle popup in PopupManager.RENDER_ON_DEMAND mode
+        :param backend: The platform services to use, a DesktopBackend by default
+        :param executor: The pool that runs background callbacks, four threads by default
+        :param frame_budget: Seconds per frame the main loop may spend running queued actions
+                             before leaving the rest for the next frame
+        :param profile: Record the main loop's stages and callback durations, see enable_profiling()
+        :param texture_budget: Bytes of image textures to keep before evicting those no item shows
+        :param font: A TTF or OTF font file, rasterized at the DPI of the monitor the popup is shown on.
+                     Without one, Dear PyGui's built-in font is used at its own size
+        :param font_size: The font size in pixels at 100% display scaling
+        :param glyph_ranges: Glyphs to rasterize besides the default Latin ones, each a Dear PyGui
+                             range hint (e.g. mvFontRangeHint_Cyrillic) or a (first, last) pair of code points
+        :param scale_builtin_font: Without a font file, scale the built-in font to the DPI. It is a bitmap,
+                                   so scaled text is blurry, and popup sizes are not scaled with it
+        :param viewport_args: Additional arguments for the Dear PyGUI viewport
+        '''
+        _enable_crash_reports()
+        self.backend = backend or DesktopBackend()
+        self.monitors = MonitorIndex(self.backend.get_monitors, self.backend.display_signature, self.backend.monitor_dpi)
+        self.ahk = self.backend.ahk
+        self.gui = self.backend.gui
+        self.executor = executor or CallbackExecutor()
+        self._workers = CallbackExecutor()  # The library's own background work, on threads whatever the executor
+        self.actions = ActionQueue(wake=self.mark_dirty)
+        self.frame_budget = frame_budget
+        self.profiler = Profiler() if profile else None
+        self.textures = TextureCache(self, texture_budget)
+        self.fonts = FontCache(self, font, font_size, glyph_ranges, scale_builtin=scale_builtin_font)
+
+        self.scheduler = None
+        if render_mode == self.RENDER_ON_DEMAND:
+            from .scheduler import RenderScheduler
+            self.scheduler = RenderScheduler(idle_fps=idle_fps)
+        elif render_mode != self.RENDER_CONTINUOUS:
+            raise ValueError(f"Invalid render mode: {render_mode}")
+
+        viewport_args.setdefault('width', 400)
+        viewport_args.setdefault('height', 300)
+        self.viewport_args = viewport_args
+
+        self.popups = []
+        self.active = None
+        self.window = None
+        self.previous_window = None  # The window that was active before a popup was shown
+        self.built = False
+        self.quit_event = threading.Event()
+        self.loop = None  # The asyncio event loop while run_async() is running
+        self._hotkeys_started = False
+
+    def add(self, hotkey: str, build: Callable, **popup_args: any):
+        '''
+        Creates a popup which shares this manager's context, hotkey listener and main loop
+
+        :param hotkey: The keybind that toggles the popup window, or None for a popup shown only from code
+        :param build: The function that builds the popup window
+        :param popup_args: Additional Popup arguments, e.g. anchor, application, lazy, width and height
+
+        :return: The popup
+        '''
+        from .popup import Popup
+        return Popup(hotkey, build, manager=self, **popup_args)
+
+    def register(self, popup, hotkey: str):
+        '''
+        Registers a popup and its hotkey. Called by the Popup constructor.
+        '''
+        self.popups.append(popup)
+        if hotkey is None:  # Shown only by calling show() or toggle()
+            return
+        self.ahk.add_hotkey(hotkey, callback=popup.toggle)
+        if self._hotkeys_started:  # Restart the listener to pick up the new hotkey
+            self.ahk.stop_hotkeys()
+            self.ahk.start_hotkeys()
+
+    def start_hotkeys(self):
+        '''
+        Starts listening for the registered hotkeys, if not already listening
+        '''
+        if not self._hotkeys_started:
+            self.ahk.start_hotkeys()
+            self._hotkeys_started = True
+
+    def setup(self, hidden: bool = False):
+        '''
+        Creates the shared context and viewport. Called when the first popup is built.
+
+        :param hidden: Create the viewport off screen and hide it
+        '''
+        self.gui.create_context()
+        self.gui.setup_dearpygui()
+        viewport_args = dict(self.viewport_args)
+        if hidden:
+            viewport_args.update(x_pos=self.OFFSCREEN, y_pos=self.OFFSCREEN)
+        self.gui.create_viewport(**viewport_args)
+        self.fonts.setup(self.monitors.dpi_at(0, 0))  # The primary monitor, until a popup is shown
+        self.gui.set_viewport_always_top(True)
+        self.gui.show_viewport()
+        title = self.gui.get_viewport_title()
+        self.window = self.ahk.find_window_by_class(title)
+        if hidden:
+            self.window.hide()
+        self.built = True
+
+    def prewarm(self):
+        '''
+        Schedules every lazy popup to be built hidden by the main loop. Safe to call from any thread.
+
+        :return: The manager, for chaining
+        '''
+        for popup in self.popups:
+            popup.prewarm()
+        return self
+
+    def activate(self, popup):
+        '''
+        Makes a popup's root window the one shown in the viewport,
+        closing the previously active popup without hiding the viewport
+        '''
+        if self.active is popup:
+            return
+        previous, self.active = self.active, popup
+        if previous:
+            self.gui.hide_item(previous.root)
+            previous._deactivate()
+        self.gui.show_item(popup.root)
+        self.gui.set_primary_window(popup.root, True)
+        if self.gui.get_viewport_width() != popup.width:
+            self.gui.set_viewport_width(popup.width)
+        if self.gui.get_viewport_height() != popup.height:
+            self.gui.set_viewport_height(popup.height)
+
+    @property
+    def visible(self):
+        return self.active is not None and self.active.open
+
+    def block(self):
+        '''
+        Blocks the main thread and starts the main loop,
+        which listens for the keybindings that toggle the popup windows
+        '''
+        while self.step():
+            if self.scheduler:
+                self.scheduler.wait(self.visible)
+            elif not self.built:
+                self.quit_event.wait(1 / 60)  # Nothing to render, wait about as long as a frame
+
+    async def run_async(self):
+        '''
+        Runs the main loop on the running asyncio event loop until quit() is called,
+        yielding to other tasks between frames.
+
+        Vsync is turned off, since waiting for the display's refresh would block the event loop
+        for most of every frame. Rendering continuously, frames are instead paced at 60 per second
+        by sleeping on the event loop, so other tasks run during the rest of each frame.
+        '''
+        import asyncio
+
+        self.loop = asyncio.get_running_loop()
+        try:
+            start = perf_counter()
+            while self.step():
+                if self.built and self.gui.is_viewport_vsync_on():
+                    self.gui.set_viewport_vsync(False)
+                if self.scheduler:
+                    await self.scheduler.wait_async(self.visible)
+                else:
+                    await asyncio.sleep(max(1 / 60 - (perf_counter() - start), 0))
+                start = perf_counter()
+        finally:
+            self.loop = None
+
+    def run_coroutine(self, coroutine):
+        '''
+        Runs a coroutine from a callback without blocking rendering. Safe to call from any thread.
+        The coroutine runs as a task on the event loop of run_async(), or on a shared background
+        event loop if the main loop was started with block(). On the background loop, use
+        run_on_main() to change items.
+        '''
+        import asyncio
+
+        future = asyncio.run_coroutine_threadsafe(coroutine, self.loop or background_loop())
+        future.add_done_callback(_report_error)
+
+    def step(self):
+        '''
+        Steps the main loop once
+        '''
+        try:
+            profiler = self.profiler
+            start = perf_counter_ns() if profiler else 0
+            self.start_hotkeys()
+            if self.built:
+                self.gui.render_dearpygui_frame()  # Also runs item and frame callbacks
+            if profiler:
+                rendered = perf_counter_ns()
+                profiler.record('render', 'frame', start, rendered - start)
+            for popup in self.popups:
+                popup._process_frame()
+            if self.actions and self.actions.drain(self.frame_budget):
+                self.mark_dirty()  # Render another frame soon for the actions left over
+            if profiler:
+                end = perf_counter_ns()
+                profiler.record('actions', 'frame', rendered, end - rendered)
+                profiler.record('step', 'frame', start, end - start)
+            if self.quit_event.is_set() or (self.built and not self.gui.is_dearpygui_running()):
+                self._teardown()
+                return False
+            return True
+        except KeyboardInterrupt:
+            self._teardown()
+            return False
+
+    def enable_profiling(self, capacity: int = 4096, slow_callback: float = 0.05):
+        '''
+        Starts recording the duration of each step, split into render and actions, and of each
+        callback registered from now on, labeled by its button or keybind
+
+        :param capacity: How many of the most recent spans to keep
+        :param slow_callback: Seconds after which a callback is reported as slow, or None to never report
+
+        :return: The profiler
+        '''
+        if self.profiler is None:
+            self.profiler = Profiler(capacity, slow_callback)
+        return self.profiler
+
+    def disable_profiling(self):
+        '''
+        Stops recording. Callbacks registered while profiling still record into the old profiler.
+        '''
+        self.profiler = None
+
+    def run_on_main(self, callback: Callable, key=None, cooldown: float = 0):
+        '''
+        Queues a callback to run on the main loop's thread after the next frame. Safe to call from any thread.
+
+        :param callback: The function to call
+        :param key: Callbacks with the same key are coalesced while one is pending or within the cooldown
+        :param cooldown: Seconds after the callback was queued during which its key's callbacks are coalesced
+
+        :return: Whether the callback was queued
+        '''
+        return self.actions.submit(callback, key=key, cooldown=cooldown)
+
+    def quit(self):
+        '''
+        Closes the popup windows and breaks the main blocking loop
+        '''
+        self.quit_event.set()
+        self.mark_dirty()
+
+    def mark_dirty(self):
+        '''
+        Marks the content as changed so that the next frames are rendered
+        even when rendering on demand. Safe to call from any thread.
+        '''
+        if self.scheduler:
+            self.scheduler.wake()
+
+    def _teardown(self):
+        '''
+        Tears down the viewport and the Dear PyGUI context
+        '''
+        self.ahk.stop_hotkeys()
+        self._hotkeys_started = False
+        self.executor.shutdown()
+        self._workers.shutdown()
+        self.actions.clear()
+        if self.built:
+            self.gui.destroy_context()
+            self.built = False
+        self.textures.clear()
+        self.fonts.clear()
+        self.active = None
+        for popup in self.popups:
+            popup.built = False
+            popup.open = False
+
+
+def _report_error(future):
+    if not future.cancelled() and future.exception():
+        print(f"Error in callback: {future.exception()}")
@@ -0,0 +1,193 @@
+import re
+from collections import OrderedDict
+from fnmatch import translate
+from typing import Callable
+
+_CRITERIA = re.compile(r'\bahk_(exe|class)\s+(\S+)')
+
+
+def _compile_pattern(value, ignore_case: bool = False):
+    '''
+    Compiles an exact value, a glob (prefixed with "glob:", e.g. "glob:code*.exe") or a regex
+    (prefixed with "re:") into a function which tests a string
+    '''
+    flags = re.IGNORECASE if ignore_case else 0
+    if isinstance(value, re.Pattern):
+        return value.search
+    if value.startswith('re:'):
+        return re.compile(value[3:], flags).search
+    if value.startswith('glob:'):
+        return re.compile(translate(value[5:]), flags).match
+    if ignore_case:
+        value = value.lower()
+        return lambda candidate: candidate.lower() == value
+    return value.__eq__
+
+
+class ApplicationRule:
+    '''
+    A window rule in AHK title format, compiled once. The rule "Title ahk_exe code.exe" matches
+    windows titled "Title" belonging to code.exe, "ahk_class Notepad" matches by window class,
+    and an empty rule matches every window. Each value can be exact, a glob prefixed with "glob:"
+    or a regex prefixed with "re:", and titles can also be given as compiled regexes. Executable names ignore case.
+
+    A rule can carry its own build function and anchor point, used while it is the matching rule.
+    '''
+
+    def __init__(self, spec: str | re.Pattern = '', build: Callable = None, anchor: int = None):
+        '''
+        :param spec: The rule, in AHK title format
+        :param build: A function which builds content shown only while this rule matches
+        :param anchor: The anchor point to use while this rule matches
+        '''
+        self.spec = spec
+        self.build = build
+        self.anchor = anchor
+        self.exe = self.class_ = self.title = None
+        if isinstance(spec, re.Pattern):
+            self.title = spec.search
+            return
+        criteria = dict(_CRITERIA.findall(spec))
+        title = _CRITERIA.sub('', spec).strip()
+        if 'exe' in criteria:
+            self.exe = _compile_pattern(criteria['exe'], ignore_case=True)
+        if 'class' in criteria:
+            self.class_ = _compile_pattern(criteria['class'])
+        if title:
+            self.title = _compile_pattern(title)
+
+    def __repr__(self):
+        return f"ApplicationRule({self.spec!r})"
+
+    def matches(self, window: 'WindowInfo'):
+        if self.exe and not self.exe(window.exe):
+            return False
+        if self.class_ and not self.class_(window.class_):
+            return False
+        if self.title and not self.title(window.title):
+            return False
+        return True
+
+
+class WindowInfo:
+    '''
+    Lazily reads the properties of a window the rules need, caching its executable and class by handle
+    '''
+    __slots__ = ('_window', '_cache', '_identity', '_title')
+
+    def __init__(self, window, cache: 'ApplicationMatcher', identity: tuple = None, title: str = None):
+        self._window = window
+        self._cache = cache
+        self._identity = identity
+        self._title = title
+
+    @property
+    def exe(self):
+        return self._lookup()[0]
+
+    @property
+    def class_(self):
+        return self._lookup()[1]
+
+    @property
+    def title(self):
+        if self._title is None:
+            self._title = self._window.title or ''
+        return self._title
+
+    def _lookup(self):
+        if self._identity is None:
+            self._identity = self._cache.identify(self._window)
+        return self._identity
+
+
+class ApplicationMatcher:
+    '''
+    Matches the active window against compiled include and exclude rules.
+    A window matches if it matches no exclude rule and either any include rule or, when there
+    are no include rules, nothing at all. The executable and class of recently seen windows are
+    kept in a bounded cache, so repeated toggles in the same application skip the AHK calls.
+    '''
+
+    def __init__(self, include=(), exclude=(), cache_size: int = 256):
+        '''
+        :param include: Rules, or a single rule, which windows must match
+        :param exclude: Rules, or a single rule, which windows must not match
+        :param cache_size: How many window handles to remember the executable and class of
+        '''
+        self.include = []
+        self.exclude = []
+        self.cache_size = cache_size
+        self._identities = OrderedDict()
+        self._any = ApplicationRule()
+        for rule in self._rules(include):
+            self.add(rule)
+        for rule in self._rules(exclude):
+            self.add(rule, exclude=True)
+
+    @staticmethod
+    def _rules(rules):
+        if rules is None:
+            return []
+        if isinstance(rules, (str, re.Pattern, ApplicationRule)):
+            return [rules]
+        return list(rules)
+
+    def add(self, rule: str | re.Pattern | ApplicationRule, exclude: bool = False):
+        '''
+        Adds an include or exclude rule and returns it compiled
+        '''
+        if not isinstance(rule, ApplicationRule):
+            rule = ApplicationRule(rule)
+        (self.exclude if exclude else self.include).append(rule)
+        return rule
+
+    @property
+    def matches_everything(self):
+        return not self.include and not self.exclude
+
+    def match(self, window, exe: str = None, class_: str = None, title: str = None):
+        '''
+        Returns the first include rule matching the window, a rule matching every window if there
+        are no include rules, or None if the window does not match or is excluded
+
+        :param window: The AHK window to match
+        :param exe: The window's executable, if already known, e.g. from a DesktopSnapshot
+        :param class_: The window's class, if already known
+        :param title: The window's title, if already known
+        '''
+        if window is None:
+            return None
+        identity = (exe, class_) if exe is not None and class_ is not None else None
+        info = WindowInfo(window, self, identity, title)
+        if any(rule.matches(info) for rule in self.exclude):
+            return None
+        if not self.include:
+            return self._any
+        return next((rule for rule in self.include if rule.matches(info)), None)
+
+    def identify(self, window):
+        '''
+        Returns the (executable, class) of a window, from the cache if possible
+        '''
+        key = window.id
+        try:
+            self._identities.move_to_end(key)
+            return self._identities[key]
+        except KeyError:
+            pass
+        exe = window.get_process_name() if hasattr(window, 'get_process_name') else window.get_exe()
+        identity = (exe or '', window.get_class() or '')
+        self._identities[key] = identity
+        if len(self._identities) > self.cache_size:
+            self._identities.popitem(last=False)
+        return identity
+
+    def forget(self, window=None):
+        '''
+        Drops a window, or every window, from the cache
+        '''
+        if window is None:
+            self._identities.clear()
+        else:
+            self._identities.pop(window.id, None)
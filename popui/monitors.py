@@ -0,0 +1,157 @@
+import sys
+from typing import Callable
+
+try:
+    import win32api
+    import win32con
+except ImportError:  # Not on Windows, only explicit refreshes invalidate the layout
+    win32api = None
+
+BASE_DPI = 96  # The DPI of a monitor at 100% scaling
+
+
+def get_monitors():
+    '''
+    Returns the monitor layout from screeninfo, which is imported on first use
+    '''
+    from screeninfo import get_monitors
+    return get_monitors()
+
+
+def enable_dpi_awareness():
+    '''
+    Makes the process per-monitor DPI aware on Windows, so the viewport is rendered at each monitor's
+    resolution instead of being scaled up and blurred by Windows
+    '''
+    if sys.platform != 'win32':
+        return
+    import ctypes
+    try:
+        ctypes.windll.shcore.SetProcessDpiAwareness(2)  # PROCESS_PER_MONITOR_DPI_AWARE
+    except (AttributeError, OSError):  # Before Windows 8.1
+        pass
+
+
+def monitor_dpi(monitor):
+    '''
+    Returns the effective DPI of a monitor, or BASE_DPI where it cannot be read
+    '''
+    if sys.platform != 'win32':
+        return BASE_DPI
+    import ctypes
+    from ctypes import wintypes
+    center = wintypes.POINT(monitor.x + monitor.width // 2, monitor.y + monitor.height // 2)
+    user32 = ctypes.windll.user32
+    user32.MonitorFromPoint.restype = wintypes.HMONITOR
+    handle = user32.MonitorFromPoint(center, 2)  # MONITOR_DEFAULTTONEAREST
+    dpi_x, dpi_y = wintypes.UINT(), wintypes.UINT()
+    try:
+        if ctypes.windll.shcore.GetDpiForMonitor(wintypes.HMONITOR(handle), 0,  # MDT_EFFECTIVE_DPI
+                                                 ctypes.byref(dpi_x), ctypes.byref(dpi_y)) == 0:
+            return dpi_x.value
+    except (AttributeError, OSError):  # Before Windows 8.1
+        pass
+    return BASE_DPI
+
+
+def display_signature():
+    '''
+    Returns a cheap fingerprint of the display configuration which changes whenever monitors
+    are added, removed, moved or resized, without enumerating the monitors
+    '''
+    if not win32api:
+        return None
+    return tuple(win32api.GetSystemMetrics(metric) for metric in (win32con.SM_CMONITORS,
+                                                                  win32con.SM_XVIRTUALSCREEN,
+                                                                  win32con.SM_YVIRTUALSCREEN,
+                                                                  win32con.SM_CXVIRTUALSCREEN,
+                                                                  win32con.SM_CYVIRTUALSCREEN))
+
+
+class MonitorIndex:
+    '''
+    A cached monitor layout which answers point-to-monitor lookups in constant time.
+
+    The virtual desktop is divided into a grid of cells no larger than the smallest monitor,
+    so each cell overlaps only a handful of monitors. The layout, and the DPI of each monitor,
+    is rebuilt when the display configuration changes or when refresh() is called.
+    '''
+
+    def __init__(self,
+                 enumerate_monitors: Callable[[], list] = get_monitors,
+                 signature: Callable[[], object] = display_signature,
+                 dpi: Callable[[object], float] = monitor_dpi):
+        '''
+        :param enumerate_monitors: The function that lists the monitors (screeninfo.get_monitors)
+        :param signature: A cheap function whose result changes when the display configuration changes
+        :param dpi: The function that reads a monitor's DPI
+        '''
+        self._enumerate_monitors = enumerate_monitors
+        self._signature = signature
+        self._dpi = dpi
+        self.refresh()
+
+    def refresh(self):
+        '''
+        Enumerates the monitors again and rebuilds the lookup grid
+        '''
+        self._current_signature = self._signature()
+        self.monitors = list(self._enumerate_monitors())
+        self._cells = {}
+        self._dpis = [self._dpi(monitor) for monitor in self.monitors]
+        self._cell_width = self._cell_height = None
+        if not self.monitors:
+            return
+        self._cell_width = min(monitor.width for monitor in self.monitors)
+        self._cell_height = min(monitor.height for monitor in self.monitors)
+        for monitor in self.monitors:
+            first_x, first_y = self._cell(monitor.x, monitor.y)
+            last_x, last_y = self._cell(monitor.x + monitor.width - 1, monitor.y + monitor.height - 1)
+            for cell_x in range(first_x, last_x + 1):
+                for cell_y in range(first_y, last_y + 1):
+                    self._cells.setdefault((cell_x, cell_y), []).append(monitor)
+
+    def monitor_at(self, x: int, y: int):
+        '''
+        Returns the monitor containing the point, or None if the point is outside every monitor
+        '''
+        if self._signature() != self._current_signature:
+            self.refresh()
+        if not self.monitors:
+            return None
+        for monitor in self._cells.get(self._cell(x, y), ()):
+            if monitor.x <= x < monitor.x + monitor.width and \
+               monitor.y <= y < monitor.y + monitor.height:
+                return monitor
+        return None
+
+    def nearest(self, x: int, y: int):
+        '''
+        Returns the monitor containing the point or, if the point is outside every monitor,
+        the monitor closest to it. Returns None only when there are no monitors at all.
+        '''
+        monitor = self.monitor_at(x, y)
+        if monitor or not self.monitors:
+            return monitor
+        return min(self.monitors, key=lambda monitor: self._distance(monitor, x, y))
+
+    def dpi_at(self, x: int, y: int):
+        '''
+        Returns the DPI of the monitor containing the point, or of the nearest monitor
+        '''
+        monitor = self.nearest(x, y)
+        if monitor is None:
+            return BASE_DPI
+        for known, dpi in zip(self.monitors, self._dpis):
+            if known is monitor:
+                return dpi
+        return BASE_DPI
+
+    def _cell(self, x: int, y: int):
+        return int(x // self._cell_width), int(y // self._cell_height)
+
+    @staticmethod
+    def _distance(monitor, x: int, y: int):
+        dx = max(monitor.x - x, 0, x - (monitor.x + monitor.width - 1))
+        dy = max(monitor.y - y, 0, y - (monitor.y + monitor.height - 1))
+        return dx * dx + dy * dy
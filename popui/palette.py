@@ -0,0 +1,309 @@
+import heapq
+from collections import OrderedDict
+from functools import partial
+from itertools import islice
+from time import perf_counter
+from typing import Callable, Iterator
+
+from .virtual_list import VirtualList
+
+
+class FuzzyIndex:
+    '''
+    A fuzzy search index over a fixed list of labels.
+
+    A label matches a query if the query's characters appear in it in order, ignoring case.
+    The lowercase form of every label and a bitmask of the labels containing each character
+    are computed once, so a search only scores the labels containing all of the query's characters.
+    A query extending a recent one only rescans that query's matches.
+
+    The labels starting with each character are also ranked once. They outrank every other match
+    of that character, so a single-character query, which matches the most labels, has its best
+    results without scoring anything when those labels fill them. Longer queries are scored in
+    slices under a time budget, and may take several frames over tens of thousands of labels.
+    '''
+
+    CHUNK = 256  # How many candidates to score between deadline checks
+
+    def __init__(self, labels: list[str], cache_size: int = 32):
+        '''
+        :param labels: The labels to search
+        :param cache_size: How many recent searches to keep for refining and backtracking
+        '''
+        self.labels = list(labels)
+        self.lower = [label.lower() for label in self.labels]
+        self.cache_size = cache_size
+        bitmaps = {}
+        leading = {}
+        size = len(self.labels) // 8 + 1
+        for id_, label in enumerate(self.lower):
+            if label:
+                leading.setdefault(label[0], []).append(id_)
+            byte, bit = divmod(id_, 8)
+            for character in set(label):
+                bitmap = bitmaps.get(character)
+                if bitmap is None:
+                    bitmap = bitmaps[character] = bytearray(size)
+                bitmap[byte] |= 1 << bit
+        self._masks = {character: int.from_bytes(bitmap, 'little') for character, bitmap in bitmaps.items()}
+        # Ranked as _score() ranks prefixes: shorter labels first, then in label order
+        self._leading = {character: sorted(ids, key=lambda id_: len(self.lower[id_])) for character, ids in leading.items()}
+        self._searches = OrderedDict()
+
+    def __len__(self):
+        return len(self.labels)
+
+    def search(self, query: str):
+        '''
+        Starts a search. Run it to completion with FuzzySearch.run(), which can be spread over several frames.
+        '''
+        query = query.lower()
+        try:
+            self._searches.move_to_end(query)
+            return self._searches[query]
+        except KeyError:
+            pass
+        search = FuzzySearch(self, query, self._candidates(query))
+        if len(query) == 1:
+            search.leading = self._leading.get(query, [])
+        self._searches[query] = search
+        if len(self._searches) > self.cache_size:
+            self._searches.popitem(last=False)
+        return search
+
+    def _candidates(self, query: str):
+        '''
+        Returns the ids of the labels which may match: the labels containing every character
+        of the query, or the matches of the longest finished search it extends if there are fewer
+        '''
+        if not query:
+            return iter(())
+        mask = -1
+        for character in set(query):
+            mask &= self._masks.get(character, 0)
+            if not mask:
+                return iter(())
+        for length in range(len(query) - 1, 0, -1):
+            previous = self._searches.get(query[:length])
+            if previous and previous.done:
+                if len(previous.matches) <= mask.bit_count():
+                    return iter(previous.matches)
+                break
+        return _set_bits(mask)
+
+
+def _set_bits(mask: int):
+    '''
+    Yields the positions of the set bits of a mask, lowest first
+    '''
+    bits = bin(mask)[:1:-1]
+    position = bits.find('1')
+    while position >= 0:
+        yield position
+        position = bits.find('1', position + 1)
+
+
+class FuzzySearch:
+    '''
+    A search over a FuzzyIndex which can be run in slices under a time budget
+    '''
+
+    def __init__(self, index: FuzzyIndex, query: str, candidates: Iterator[int]):
+        self.index = index
+        self.query = query
+        self.matches = []  # The ids of the matching labels, in label order
+        self.done = False
+        self.leading = None  # The ranked ids of the labels starting with a single-character query
+        self._scores = []
+        self._candidates = candidates
+        self._ranked = None
+
+    def run(self, deadline: float = None):
+        '''
+        Scores candidates until all are scored or the deadline, a perf_counter() time, passes
+
+        :return: Whether the search is done
+        '''
+        lower, query, score_ = self.index.lower, self.query, _score
+        candidates, matches, scores = self._candidates, self.matches, self._scores
+        while not self.done:
+            chunk = list(islice(candidates, FuzzyIndex.CHUNK))
+            for id_ in chunk:
+                score = score_(query, lower[id_])
+                if score is not None:
+                    matches.append(id_)
+                    scores.append((score, -id_))
+            self.done = len(chunk) < FuzzyIndex.CHUNK
+            if deadline is not None and perf_counter() >= deadline:
+                break
+        return self.done
+
+    def ready(self, limit: int):
+        '''
+        Returns whether the best limit results are known, because the search is done or because
+        the labels starting with a single-character query fill them
+        '''
+        return self.done or (self.leading is not None and len(self.leading) >= limit)
+
+    def results(self, limit: int = None):
+        '''
+        Returns the ids of the best matches so far, best first
+        '''
+        if not self.query:  # Everything matches, in label order
+            return range(len(self.index))
+        if not self.done and limit is not None and self.ready(limit):
+            return self.leading[:limit]
+        if self.done and self._ranked is not None and (limit is None or len(self._ranked) >= limit):
+            return self._ranked[:limit]
+        if limit is None:
+            ranked = sorted(self._scores, reverse=True)
+        else:
+            ranked = heapq.nlargest(limit, self._scores)
+        ranked = [-id_ for _, id_ in ranked]
+        if self.done:
+            self._ranked = ranked
+        return ranked
+
+
+def _score(query: str, text: str):
+    '''
+    Scores a lowercase label against a lowercase query, or returns None if it does not match.
+    Prefixes rank above substrings, substrings above scattered matches, and shorter labels
+    and tighter matches rank higher within each tier.
+    '''
+    position = text.find(query)
+    if position == 0:
+        return 3_000_000 - len(text)
+    if position > 0:
+        boundary = 1000 if not text[position - 1].isalnum() else 0
+        return 2_000_000 + boundary - position - len(text)
+    position = -1
+    gaps = 0
+    for character in query:
+        found = text.find(character, position + 1)
+        if found < 0:
+            return None
+        gaps += found - position - 1
+        position = found
+    return 1_000_000 - gaps * 100 - len(text)
+
+
+class CommandPalette:
+    '''
+    A search box over a list of commands, with the ranked matches in a virtual list below it.
+
+    The index is built on a background thread, so building the popup does not wait for it,
+    and is kept for the popup's lifetime. Each keystroke refines the previous search and is
+    scored in slices under a per-frame time budget, so typing never stalls rendering. Over tens
+    of thousands of commands, a query of two or three characters can take several frames.
+    '''
+
+    def __init__(self,
+                 popup,
+                 commands: dict[str, Callable] | list[tuple[str, Callable]],
+                 *,
+                 rows: int = 10,
+                 limit: int = 500,
+                 budget: float = 0.004,
+                 hint: str = 'Search',
+                 close: bool = True,
+                 parent: int = None,
+                 width: int = -1):
+        '''
+        :param popup: The popup the palette belongs to
+        :param commands: The label and callback of each command
+        :param rows: The number of visible result rows
+        :param limit: The maximum number of results to rank
+        :param budget: Seconds of matching per frame
+        :param hint: The placeholder text of the search box
+        :param close: Whether to close the popup after running a command
+        :param parent: The container to add the palette to, the current container by default
+        :param width: The width of the palette
+        '''
+        self.popup = popup
+        self.gui = popup.gui
+        self.limit = limit
+        self.budget = budget
+        self.labels = ()
+        self.callbacks = []
+        self.index = None
+        self.query = ''
+        self._search = None
+        self._generation = 0
+
+        parent = parent or self.gui.top_container_stack() or popup.root
+        self.input = self.gui.add_input_text(hint=hint, width=width, parent=parent, callback=self._changed)
+        self.results = VirtualList(popup,
+                                   (),
+                                   self._run_command,
+                                   rows=rows,
+                                   format=self._label,
+                                   close=close,
+                                   parent=parent,
+                                   width=width)
+        popup.add_visibility_callback(self._visibility_changed)
+        self.set_commands(commands)
+
+    def set_commands(self, commands: dict[str, Callable] | list[tuple[str, Callable]]):
+        '''
+        Replaces the commands and clears the search. The new index is built in the background.
+        '''
+        if isinstance(commands, dict):
+            commands = commands.items()
+        commands = list(commands)
+        self.labels, callbacks = zip(*commands) if commands else ((), ())
+        self.callbacks = [self.popup._callable(callback) for callback in callbacks]
+        self.index = None
+        self.query = ''
+        self._search = None
+        self.gui.set_value(self.input, '')
+        self.results.selected = self.results.offset = 0
+        self.results.refresh(range(len(self.labels)))
+        self._generation += 1
+        self.popup.manager._workers.submit(partial(FuzzyIndex, self.labels),
+                                           done=partial(self._indexed, self._generation))
+
+    def search(self, query: str):
+        '''
+        Filters the results. Matching continues over the next frames if it exceeds the budget.
+        '''
+        self.query = query
+        if self.index is None:  # Searched once the index is ready
+            return
+        self._search = self.index.search(query)
+        self._continue(self._search)
+
+    def _continue(self, search: FuzzySearch):
+        if search is not self._search:  # Superseded by a newer query
+            return
+        if search.ready(self.limit) or search.run(perf_counter() + self.budget):
+            self.results.selected = self.results.offset = 0
+            self.results.refresh(search.results(self.limit))
+        else:
+            self.popup.run_on_main(partial(self._continue, search), key=(self, 'search'))
+
+    def _indexed(self, generation: int, future):
+        def ready():
+            if generation != self._generation:  # The commands were replaced while indexing
+                return
+            try:
+                self.index = future.result()
+            except Exception as e:
+                print(f"Error in callback: {e}")
+                return
+            if self.query:
+                self.search(self.query)
+        self.popup.run_on_main(ready)
+
+    def _changed(self, sender, query):
+        self.search(query)
+
+    def _label(self, id_: int):
+        return self.labels[id_]
+
+    def _run_command(self, id_: int):
+        self.callbacks[id_]()
+
+    def _visibility_changed(self, visible: bool):
+        if visible:
+            self.gui.focus_item(self.input)
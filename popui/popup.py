@@ -1,20 +1,19 @@
-import sys
+import inspect
 import threading
-import faulthandler
+from itertools import count
+from time import perf_counter
 
 from .keys import KEYS
-from ahk import AHK
-from ahk.directives import NoTrayIcon
-from dearpygui import dearpygui as dpg
-from time import time
+from .keybinds import Keybind, KeybindDispatcher
+from .manager import PopupManager
+from .matching import ApplicationMatcher, ApplicationRule
+from .executor import CallbackExecutor
+from .virtual_list import VirtualList
+from .palette import CommandPalette
+from .sections import Section
+from .backend import Backend, DesktopSnapshot
+from .stats import LatencyRecord, LatencyStats
 from typing import Callable
-from screeninfo import get_monitors
-from tempfile import NamedTemporaryFile
-
-if not sys.stderr:
-    sys.stderr = NamedTemporaryFile(delete=False)
-
-faulthandler.enable()
 
 
 class Popup:
@@ -27,29 +26,51 @@ class Popup:
     KEY_DOWN = 1
     KEY_UP = 2
 
+    RENDER_CONTINUOUS = PopupManager.RENDER_CONTINUOUS
+    RENDER_ON_DEMAND = PopupManager.RENDER_ON_DEMAND
+
     def __init__(self,
                  hotkey: str,
                  build: Callable[['Popup', any], None],
                  *,
                  anchor: int = ON_MOUSE,
                  appplication: str = None,
+                 application=None,
+                 exclude=None,
+                 render_mode: int = RENDER_CONTINUOUS,
+                 idle_fps: float = 10,
+                 backend: Backend = None,
+                 executor: CallbackExecutor = None,
+                 lazy: bool = False,
+                 profile: bool = False,
+                 font: str = None,
+                 font_size: float = 13,
+                 manager: PopupManager = None,
                  **viewport_args: any):
         '''
-        :param hotkey: The keybind that toggles the popup window
+        :param hotkey: The keybind that toggles the popup window, or None for a popup shown only from code
         :param build: The function that builds the popup window
         :param anchor: The anchor point for the popup window (Popup.ON_MOUSE, Popup.ON_APP, Popup.ON_SCREEN)
         :param appplication: The application to anchor the popup window to, as an AHK title
+        :param application: The applications the popup is shown in, as a rule in AHK title format or a list
+                            of rules. Values can be exact, globs prefixed with "glob:" or regexes prefixed
+                            with "re:", e.g. "ahk_exe re:(code|notepad)\\.exe". Replaces the misspelled appplication
+        :param exclude: Rules for windows the popup is never shown in
+        :param render_mode: How block() schedules frames (Popup.RENDER_CONTINUOUS, Popup.RENDER_ON_DEMAND).
+                            On demand, a hidden popup sleeps until the hotkey wakes it and a visible one
+                            renders only on input, due frame callbacks or after mark_dirty()
+        :param idle_fps: The frame rate cap for a visible but idle popup in Popup.RENDER_ON_DEMAND mode
+        :param backend: The platform services to use, a DesktopBackend by default
+        :param executor: The pool that runs background callbacks, four threads by default
+        :param lazy: Defer building the popup window until it is first shown, or until prewarm() runs
+        :param profile: Record the main loop's stages and callback durations, see PopupManager.enable_profiling()
+        :param font: A TTF or OTF font file, rasterized at the DPI of the monitor the popup is shown on
+        :param font_size: The font size in pixels at 100% display scaling
+        :param manager: A PopupManager to share a context, hotkey listener and main loop with other popups.
+                        The render mode, backend, executor, font and viewport arguments other than width
+                        and height are then taken from the manager
         :param viewport_args: Additional arguments for the Dear PyGUI viewport
         '''
-        get_monitors()  # This somehow makes the text not blurry
-        self.ahk = AHK(directives=[NoTrayIcon(apply_to_hotkeys_process=True)])
-        self.ahk.add_hotkey(hotkey, callback=self.toggle)
-        self.ahk.start_hotkeys()
-
-        self.gui = dpg
-        self.application = appplication
-        self.anchor_point = anchor
-
         # Dimensions
         self.width = viewport_args.pop('width', 400)
         self.height = viewport_args.pop('height', 300)
@@ -57,40 +78,103 @@ class Popup:
         viewport_args['height'] = self.height
         self.viewport_args = viewport_args
 
+        standalone = manager is None
+        if standalone:
+            manager = PopupManager(render_mode=render_mode,
+                                   idle_fps=idle_fps,
+                                   backend=backend,
+                                   executor=executor,
+                                   font=font,
+                                   font_size=font_size,
+                                   **viewport_args)
+        self.manager = manager
+        self.backend = manager.backend
+        self.monitors = manager.monitors
+        self.ahk = manager.ahk
+        self.gui = manager.gui
+        self.scheduler = manager.scheduler
+        self.quit_event = manager.quit_event
+        if profile:
+            manager.enable_profiling()
+        self.application = application if application is not None else appplication
+        self.applications = ApplicationMatcher(self.application, exclude)
+        self.application_rule = None  # The rule that matched when the popup was last toggled
+        self.anchor_point = anchor
+        self._profiles = {}
+        self._shown_profile = None
+        self._building_rule = None
+
         self.build = build
-        self.cooldown = 0
+        self.cooldown = 0.01  # Seconds during which repeated hotkey presses are coalesced into one toggle
         self.built = False
         self.open = False
-        self.quit_event = threading.Event()
-        self.scheduled_action = None
-        self.scheduled_keybinds = []
+        self.root = None
+        self._busy = {}
+        self._busy_lock = threading.Lock()
+        self.keybinds = KeybindDispatcher(self.gui.is_key_down)
+        self._key_registry = None
+        self._key_handlers = {}
+        self._sections = {}
+        self._section = None  # The section being built, which owns what is created
+        self._lazy_names = count(1)
+        self._next_eviction = 0.0
+        self.build_budget = 0.008  # Seconds per frame spent building lazy sections
+        self.add_keybind('escape', self.hide)
         self._visibility_callbacks = []
-        self.setup()
-        dpg.set_frame_callback(dpg.get_frame_count() + 1, callback=self.hide)
+        self._latency_hooks = []
+        self.latency = LatencyStats()
+        self._trace = None
+        self._first_frame_trace = None
+        self._snapshot = None  # The desktop snapshot a toggle took, for the show it leads to
+        manager.register(self, hotkey)
+        if standalone:
+            manager.start_hotkeys()
+        if not lazy:
+            self.setup(hidden=True)
 
-    def setup(self):
+    @property
+    def window(self):
+        '''
+        The AHK window of the viewport
+        '''
+        return self.manager.window
+
+    def setup(self, hidden: bool = False):
         '''
         Builds the popup window for the first time
+
+        :param hidden: Build the popup without showing it. The shared viewport is then created off screen.
         '''
-        dpg.create_context()
-        dpg.setup_dearpygui()
+        if not self.manager.built:
+            self.manager.setup(hidden=True)
 
-        with dpg.window() as window:
+        with self.gui.window(show=False) as window:
             self.root = window
-            dpg.set_primary_window(window, True)
-        dpg.create_viewport(**self.viewport_args)
-        dpg.set_viewport_always_top(True)
-        with dpg.handler_registry():
-            dpg.add_key_press_handler(key=dpg.mvKey_Escape, callback=self.hide)
-
-        self.build(self)  # Add user content
-        dpg.set_frame_callback(dpg.get_frame_count() + 1, callback=self.focus)
-        dpg.show_viewport()
-        title = dpg.get_viewport_title()
-        self.window = self.ahk.find_window_by_class(title)
-        self.open = True
+        self._key_registry = self.gui.add_handler_registry()
+        self._key_handlers.clear()
+        for action in self.keybinds.actions():
+            self._add_key_handler(action)
+
+        if self.build:
+            self.build(self)  # Add user content
         self.built = True
-        self.anchor()
+        if not hidden:
+            self.show()
+
+    def prewarm(self):
+        '''
+        Schedules a lazy popup window to be built hidden by the main loop, so that it is ready
+        before the first hotkey press without delaying the constructor. Safe to call from any thread.
+
+        :return: The popup, for chaining
+        '''
+        if not self.built:
+            self.run_on_main(self._prewarm, key=(self, 'prewarm'))
+        return self
+
+    def _prewarm(self):
+        if not self.built:
+            self.setup(hidden=True)
 
     def focus(self):
         '''
@@ -98,15 +182,23 @@ class Popup:
         '''
         self.window.activate()
 
-    def anchor(self):
+    def anchor(self, snapshot: DesktopSnapshot = None):
         '''
         Anchors the popup window to the mouse, the active application, or the screen center
         depending on the selected anchor point.
+
+        :param snapshot: The desktop state to anchor to, taken from the backend if not given
         '''
-        viewport_width = dpg.get_viewport_width()
-        viewport_height = dpg.get_viewport_height()
-        if self.anchor_point == self.ON_MOUSE:
-            x, y = self.ahk.get_mouse_position(coord_mode='Screen')
+        if snapshot is None:
+            snapshot = self.backend.snapshot(self.window)
+        viewport_width = self.gui.get_viewport_width()
+        viewport_height = self.gui.get_viewport_height()
+        anchor_point = self.anchor_point
+        if self.application_rule and self.application_rule.anchor is not None:
+            anchor_point = self.application_rule.anchor
+
+        if anchor_point == self.ON_MOUSE:
+            x, y = snapshot.mouse
             monitor = self._get_bounding_monitor(x, y)
             off_x, off_y = viewport_width / 2, viewport_height / 2
             x = x - off_x
@@ -117,68 +209,183 @@ class Popup:
                 x = min(monitor.x + monitor.width - viewport_width, x)
                 y = min(monitor.y + monitor.height - viewport_height, y)
 
-        elif self.anchor_point == self.ON_APP:
-            active_window = self.ahk.get_active_window()
-            x, y, w, h = active_window.get_position()
+        elif anchor_point == self.ON_APP:
+            x, y, w, h = snapshot.active_position()
             off_x, off_y = viewport_width / 2, viewport_height / 2
             x = x + w/2 - off_x
             y = y + h/2 - off_y
 
-        elif self.anchor_point == self.ON_SCREEN:
-            x, y = self.ahk.get_mouse_position(coord_mode='Screen')
+        elif anchor_point == self.ON_SCREEN:
+            x, y = snapshot.mouse
             monitor = self._get_bounding_monitor(x, y)
-            x = monitor.x + monitor.width / 2 - viewport_width / 2
-            y = monitor.y + monitor.height / 2 - viewport_height / 2
+            if monitor:
+                x = monitor.x + monitor.width / 2
+                y = monitor.y + monitor.height / 2
+            x = x - viewport_width / 2
+            y = y - viewport_height / 2
 
-        dpg.set_viewport_pos((x, y))
+        self.manager.fonts.apply(self.monitors.dpi_at(x + viewport_width / 2, y + viewport_height / 2))
+        self.gui.set_viewport_pos((x, y))
 
     def add_visibility_callback(self, callback: Callable[[bool], None]):
-        self._visibility_callbacks.append(callback)
+        self._visibility_callbacks.append(self._callable(callback))
+        self._own(lambda: self.remove_visibility_callback(callback))
+
+    def remove_visibility_callback(self, callback: Callable[[bool], None]):
+        # Compared by equality, as each access to a bound method creates a new object
+        self._visibility_callbacks = [existing for existing in self._visibility_callbacks
+                                      if existing != callback and getattr(existing, '__wrapped__', None) != callback]
+
+    def _notify_visibility(self, visible: bool):
+        for callback in self._visibility_callbacks:
+            try:
+                callback(visible)
+            except Exception as e:
+                print(f"Error in callback: {e}")
+
+    async def shown(self):
+        '''
+        Waits until the popup is shown, returning immediately if it is already open
+        '''
+        await self._wait_for_visibility(True)
+
+    async def hidden(self):
+        '''
+        Waits until the popup is hidden, returning immediately if it is already closed
+        '''
+        await self._wait_for_visibility(False)
+
+    async def _wait_for_visibility(self, visible: bool):
+        if self.open == visible:
+            return
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        changed = loop.create_future()
+
+        def resolve():
+            if not changed.done():
+                changed.set_result(None)
+
+        def callback(value: bool):
+            if value == visible:
+                loop.call_soon_threadsafe(resolve)
+
+        self.add_visibility_callback(callback)
+        try:
+            await changed
+        finally:
+            self.remove_visibility_callback(callback)
+
+    def add_latency_hook(self, callback: Callable[[LatencyRecord], None]):
+        '''
+        Adds a callback which receives the LatencyRecord of every show and hide,
+        e.g. for exporting to telemetry. Records of a show are delivered after its first rendered frame.
+
+        :param callback: The function to call with each record
+        '''
+        self._latency_hooks.append(self._callable(callback))
+
+    def latency_stats(self):
+        '''
+        Returns rolling latency percentiles for the recent shows and hides, per stage,
+        as {action: {stage: {'count', 'p50', 'p95', 'p99', 'max'}}} in milliseconds
+        '''
+        return self.latency.summary()
+
+    @property
+    def profiler(self):
+        '''
+        The manager's profiler, or None if profiling is disabled
+        '''
+        return self.manager.profiler
 
     def hide(self):
         '''
-        Hides the popup window
+        Hides the popup window. Does nothing if it is not open, e.g. a lazy popup that was never shown.
         '''
+        if not self.built or not self.open:
+            return
+        trace = self._take_trace('hide')
         self.open = False
         self.window.hide()
-        for window in self.ahk.list_windows():
-            if window.title:
-                window.activate()
-                break
-        for callback in self._visibility_callbacks:
-            try:
-                callback(False)
-            except Exception as e:
-                print(f"Error in callback: {e}")
+        trace.mark('window_hide')
+        self._restore_focus()
+        trace.mark('restore_focus')
+        self._notify_visibility(False)
+        trace.mark('visibility_callbacks')
+        self._finish_trace(trace)
 
     def show(self):
         '''
         Shows the popup window
         '''
+        trace = self._take_trace('show')
         if not self.built:
-            self.setup()
-            return
+            self.setup(hidden=True)
+            self.call_later(self.focus)  # The new viewport may not accept focus before its first frame
+            trace.mark('setup')
+        snapshot, self._snapshot = self._snapshot, None
+        if snapshot is None:
+            snapshot = self.backend.snapshot(self.window)
+        self._remember_focus(snapshot)
+        trace.mark('remember_focus')
+        self.manager.activate(self)
+        self._show_profile()
         self.open = True
-        self.anchor()
-        self.window.show()
+        self.anchor(snapshot)
+        trace.mark('anchor')
+        if not snapshot.own_visible:  # Already visible when switching from another popup of the manager
+            self.window.show()
+        trace.mark('window_show')
         self.focus()
-        for callback in self._visibility_callbacks:
-            try:
-                callback(True)
-            except Exception as e:
-                print(f"Error in callback: {e}")
+        trace.mark('focus')
+        self._notify_visibility(True)
+        trace.mark('visibility_callbacks')
+        self._first_frame_trace = trace
 
-    def toggle(self):
+    def _remember_focus(self, snapshot: DesktopSnapshot):
+        '''
+        Remembers the active window so that hide() can give it focus back.
+        Switching between popups of the same manager keeps the original window.
         '''
-        Toggles the popup window visibility
+        active_window = snapshot.active
+        if active_window and active_window.id != self.window.id:
+            self.manager.previous_window = active_window
+
+    def _restore_focus(self):
+        '''
+        Activates the window that was active before the popup was shown. If it has closed since,
+        activating it does nothing and Windows falls back to the next window in the z-order.
         '''
-        if time() < self.cooldown:
+        previous, self.manager.previous_window = self.manager.previous_window, None
+        if not previous:
             return
-        self.cooldown = time() + 0.01
+        try:
+            previous.activate()
+        except Exception:  # Some AHK versions raise for windows that no longer exist
+            pass
 
+    def toggle(self):
+        '''
+        Toggles the popup window visibility on the main loop. Safe to call from any thread;
+        presses repeated while a toggle is pending or within the cooldown are coalesced into it.
+        '''
+        trace = LatencyRecord('toggle')
+        self.run_on_main(lambda: self._toggle(trace), key=(self, 'toggle'), cooldown=self.cooldown)
+
+    def _toggle(self, trace: LatencyRecord):
+        trace.action = 'hide' if self.open else 'show'
+        trace.mark('queued')
         if self.open:
+            self._trace = trace
             self.hide()
-        elif self._application_match():
+            return
+        snapshot = self.backend.snapshot(self.window)  # The one AHK round-trip matching and anchoring read from
+        if self._application_match(snapshot):
+            trace.mark('application_match')
+            self._trace = trace
+            self._snapshot = snapshot
             self.show()
 
     def block(self):
@@ -186,70 +393,159 @@ class Popup:
         Blocks the main thread and starts the main loop,
         which listens for the keybinding that toggles the popup window
         '''
-        while self.step():
-            pass
+        self.manager.block()
+
+    async def run_async(self):
+        '''
+        Runs the main loop on the running asyncio event loop until quit() is called,
+        yielding to other tasks between frames. Coroutine function callbacks run as tasks on this loop.
+        '''
+        await self.manager.run_async()
 
     def step(self):
         '''
         Steps the main loop once
         '''
-        try:
-            dpg.render_dearpygui_frame()
-            if self.scheduled_action:
-                self.scheduled_action()
-                self.scheduled_action = None
-            if self.scheduled_keybinds:
-                self._evaluate_keybinds()
-            if self.quit_event.is_set() or not dpg.is_dearpygui_running():
-                self._teardown()
-                return False
-            return True
-        except KeyboardInterrupt:
-            self._teardown()
-            return False
+        return self.manager.step()
+
+    def _process_frame(self):
+        '''
+        Finishes the latency trace of a show once its first frame was rendered,
+        and builds or evicts lazy sections
+        '''
+        if self._first_frame_trace and self.manager.built:
+            trace, self._first_frame_trace = self._first_frame_trace, None
+            trace.mark('first_frame')
+            self._finish_trace(trace)
+        if self._sections:
+            self._process_sections()
+
+    def run_on_main(self, callback: Callable, key=None, cooldown: float = 0):
+        '''
+        Queues a callback to run on the main loop's thread after the next frame. Safe to call from any thread.
+
+        :param callback: The function to call
+        :param key: Callbacks with the same key are coalesced while one is pending or within the cooldown
+        :param cooldown: Seconds after the callback was queued during which its key's callbacks are coalesced
+
+        :return: Whether the callback was queued
+        '''
+        return self.manager.run_on_main(callback, key=key, cooldown=cooldown)
+
+    def _deactivate(self):
+        '''
+        Closes the popup when another popup of the same manager is shown in its place
+        '''
+        if not self.open:
+            return
+        self.open = False
+        self._notify_visibility(False)
 
     def quit(self):
         '''
         Closes the popup window and breaks the main blocking loop
         '''
-        self.quit_event.set()
+        self.manager.quit()
 
-    def _teardown(self):
+    def mark_dirty(self):
         '''
-        Tears down the popup window and the Dear PyGUI context
+        Marks the popup content as changed so that the next frames are rendered
+        even when the popup is rendering on demand. Safe to call from any thread.
         '''
-        self.ahk.stop_hotkeys()
-        dpg.destroy_context()
+        self.manager.mark_dirty()
 
-    def add_button(self, label: str, callback: Callable, close=True, keybind: str = None, **kwargs):
+    def add_button(self,
+                   label: str,
+                   callback: Callable,
+                   close=True,
+                   keybind: str = None,
+                   background: bool = False,
+                   limit: int = 1,
+                   on_result: Callable = None,
+                   **kwargs):
         '''
         Adds a button to the popup window
 
         :param label: The button label
-        :param callback: The function to call when the button is pressed
+        :param callback: The function to call when the button is pressed, which may be a coroutine function
         :param close: Whether to close the window after pressing the button
         :param keybind: A keybind to associate with the button. If the button is visible,
                         the keybind will run the callback
+        :param background: Run the callback on the executor instead of the render thread.
+                           The button is disabled and marked busy until the callback returns
+        :param limit: How many background invocations of the callback may run at once.
+                      Presses past the limit are ignored
+        :param on_result: Called on the main loop's thread with the background callback's return value
         :param kwargs: Additional Dear PyGUI arguments to pass to the button
 
         :return: The button ID
         '''
-        if close:
-            callback = self._hide_before_calling(callback)
+        parent = kwargs.pop('parent', None) or self.gui.top_container_stack() or self.root
+        button = self.gui.add_button(label=label,
+                                     parent=parent,
+                                     **kwargs)
+        self._set_button_callback(button, label, callback, close, keybind, background, limit, on_result)
+        return button
 
-        parent = kwargs.pop('parent', None) or dpg.top_container_stack() or self.root
-        button = dpg.add_button(label=label,
-                                callback=callback,
-                                parent=parent,
-                                **kwargs)
+    def add_icon_button(self,
+                        icon: str,
+                        callback: Callable,
+                        label: str = None,
+                        size: int | tuple[int, int] = 32,
+                        close=True,
+                        keybind: str = None,
+                        background: bool = False,
+                        limit: int = 1,
+                        on_result: Callable = None,
+                        **kwargs):
+        '''
+        Adds a button showing an image. The image is decoded in the background and shows a placeholder
+        until then, and its texture is shared with every other item showing the same image at the same size.
 
-        if keybind:
-            callback = self._if_active(button, callback)
-            with dpg.handler_registry():
-                dpg.add_key_press_handler(key=KEYS.keys[keybind.lower()], callback=callback)
+        :param icon: The image file
+        :param callback: The function to call when the button is pressed, which may be a coroutine function
+        :param label: A tooltip for the button, and its name in profiles
+        :param size: The button's image width and height, or a (width, height) tuple
+        :param close: Whether to close the window after pressing the button
+        :param keybind: A keybind to associate with the button. If the button is visible,
+                        the keybind will run the callback
+        :param background: Run the callback on the executor instead of the render thread.
+                           The button is disabled and marked busy until the callback returns
+        :param limit: How many background invocations of the callback may run at once.
+                      Presses past the limit are ignored
+        :param on_result: Called on the main loop's thread with the background callback's return value
+        :param kwargs: Additional Dear PyGUI arguments to pass to the image button
 
+        :return: The button ID
+        '''
+        width, height = (size, size) if isinstance(size, int) else size
+        textures = self.manager.textures
+        parent = kwargs.pop('parent', None) or self.gui.top_container_stack() or self.root
+        button = self.gui.add_image_button(texture_tag=textures.placeholder(),
+                                           width=width,
+                                           height=height,
+                                           parent=parent,
+                                           **kwargs)
+        textures.show(button, icon, (width, height))
+        if label:
+            with self.gui.tooltip(parent=button):
+                self.gui.add_text(default_value=label)
+        self._set_button_callback(button, label or icon, callback, close, keybind, background, limit, on_result)
         return button
 
+    def _set_button_callback(self, button: int, label: str, callback: Callable, close: bool, keybind: str,
+                             background: bool, limit: int, on_result: Callable):
+        callback = self._callable(callback)
+        if background:
+            callback = self._in_background(callback, limit=limit, on_result=on_result, busy_item=button)
+        if close:
+            callback = self._hide_before_calling(callback)
+        callback = self._profiled(callback, f'button {label}')
+        self.gui.configure_item(button, callback=callback)
+
+        if keybind:
+            self.add_keybind(keybind, callback, condition=self._is_visible(button))
+
     def add_button_row(self, definitions: list[tuple[str, Callable]], **kwargs):
         '''
         Creates a row of buttons from the list of label-callback pairs
@@ -266,124 +562,549 @@ class Popup:
             result.append(button)
         return result
 
-    def add_horizontal_group(self, count: int):
+    def add_horizontal_group(self, count: int, **kwargs):
         '''
         Creates a table row with a specified number of cells and returns the cell IDs
         for adding content to the cells
 
         :param count: The number of cells to create
+        :param kwargs: Additional Dear PyGUI arguments to pass to the table
         :return: A list of cell IDs
         '''
         cells = []
-        with dpg.table(header_row=False):
+        with self.gui.table(header_row=False, **kwargs):
             for _ in range(count):
-                dpg.add_table_column()
-            with dpg.table_row():
+                self.gui.add_table_column()
+            with self.gui.table_row():
                 for _ in range(count):
-                    cells.append(dpg.add_table_cell())
+                    cells.append(self.gui.add_table_cell())
         return cells
 
-    def _application_match(self):
-        if not self.application:
+    def add_virtual_list(self, source, callback: Callable, rows: int = 10, close=True, **kwargs):
+        '''
+        Adds a scrollable list which creates items only for its visible rows, for thousands of entries.
+        The arrow, page, home and end keys move the selection and return activates it.
+
+        :param source: The entries, a sequence or any iterable such as a generator, which is consumed as it is scrolled
+        :param callback: The function to call with the entry when it is clicked or activated,
+                         which may be a coroutine function
+        :param rows: The number of visible rows
+        :param close: Whether to close the window after an entry is activated
+        :param kwargs: Additional VirtualList arguments, e.g. format, row_height, keyboard, parent and width
+
+        :return: The list, whose refresh() replaces the entries
+        '''
+        return VirtualList(self, source, callback, rows=rows, close=close, **kwargs)
+
+    def add_command_palette(self, commands: dict[str, Callable] | list[tuple[str, Callable]], rows: int = 10, close=True, **kwargs):
+        '''
+        Adds a search box which fuzzy matches a list of commands as you type, with the ranked
+        matches listed below it. The search index is built in the background and kept while the popup exists.
+
+        :param commands: The label and callback of each command, as a dictionary or a list of pairs.
+                         Callbacks may be coroutine functions
+        :param rows: The number of visible result rows
+        :param close: Whether to close the window after running a command
+        :param kwargs: Additional CommandPalette arguments, e.g. limit, budget, hint, parent and width
+
+        :return: The palette
+        '''
+        return CommandPalette(self, commands, rows=rows, close=close, **kwargs)
+
+    def add_layout(self, source, callbacks: dict[str, Callable] = None, watch: bool = False, **kwargs):
+        '''
+        Builds a declarative layout of buttons, rows, groups, text and keybinds
+
+        :param source: The path of a JSON or TOML layout file, or the layout as a list of items
+        :param callbacks: The functions the layout's callbacks refer to, by name
+        :param watch: Reload the layout file into the popup whenever it is saved
+        :param kwargs: Additional Layout arguments, e.g. cache_dir and parent
+
+        :return: The layout, whose reload() applies changes to the built items
+        '''
+        from .layout import Layout
+
+        layout = Layout(self, source, callbacks, **kwargs).build()
+        if watch:
+            layout.watch()
+            self._own(layout.stop_watching)
+        return layout
+
+    def bind(self, item: int, source, interval: float = 1.0, **kwargs):
+        '''
+        Keeps an item showing the latest value of a source. The source is only polled while the popup
+        is visible, and once immediately each time it is shown. Only changed values are written.
+
+        :param item: The item to write values to, e.g. a text item
+        :param source: A function returning the current value, an iterator or iterable yielding values,
+                       a coroutine function, or an async iterator
+        :param interval: Seconds between polls, or 0 to consume an iterator as fast as it yields
+        :param kwargs: Additional Binding arguments, e.g. format and attribute
+
+        :return: The binding, whose stop() ends it
+        '''
+        from .bindings import Binding
+
+        binding = Binding(self, item, source, interval=interval, **kwargs)
+        self._own(binding.stop)
+        return binding
+
+    # Sections
+    def add_section(self, name: str, build: Callable, **kwargs):
+        '''
+        Adds a named part of the content, built by its own function, which can later be cleared or rebuilt.
+        The keybinds, bindings, lists and callbacks added while building it belong to the section
+        and are released with its items. Sections can be nested.
+
+        :param name: The name to refer to the section by
+        :param build: The function that builds the section, called with the popup
+        :param kwargs: Additional Dear PyGUI arguments to pass to the section's group, e.g. parent
+
+        :return: The section's group ID
+        '''
+        section = self._new_section(name, build, kwargs)
+        self._build_section(section)
+        return section.container
+
+    def lazy_section(self, build: Callable, name: str = None, evict_after: float = None, **kwargs):
+        '''
+        Adds a section which is built the first time it becomes visible, e.g. inside a tab or a
+        collapsing header, instead of when the popup is built. If build is a generator function,
+        each yield lets the build continue on the next frame once build_budget seconds were spent,
+        so opening a heavy section does not stall rendering.
+
+        :param build: The function that builds the section, called with the popup
+        :param name: The name to refer to the section by, generated if omitted
+        :param evict_after: Seconds without being visible after which the section is cleared,
+                            to be built again when it is next visible. None keeps it
+        :param kwargs: Additional Dear PyGUI arguments to pass to the section's group, e.g. parent
+
+        :return: The section's group ID
+        '''
+        if name is None:
+            name = f'lazy section {next(self._lazy_names)}'
+        section = self._new_section(name, build, kwargs)
+        section.lazy = True
+        section.evict_after = evict_after
+        return section.container
+
+    def clear_section(self, name: str):
+        '''
+        Deletes a section's items and releases its keybinds, handlers, bindings and callbacks,
+        leaving the empty section in place. Call from the main loop's thread, e.g. from a callback.
+        '''
+        self._clear_section(self._get_section(name))
+        self.mark_dirty()
+
+    def rebuild_section(self, name: str, build: Callable = None):
+        '''
+        Clears a section and builds it again. Call from the main loop's thread, e.g. from a callback.
+
+        :param name: The section's name
+        :param build: A new function to build the section with, the current one by default
+        '''
+        section = self._get_section(name)
+        self._clear_section(section)
+        if build:
+            section.build = build
+        if not section.lazy:  # Lazy sections are built again when they are next visible
+            self._build_section(section)
+        self.mark_dirty()
+
+    def remove_section(self, name: str):
+        '''
+        Clears a section and deletes its group
+        '''
+        section = self._get_section(name)
+        self._clear_section(section)
+        self._forget_section(section)
+        self.gui.delete_item(section.container)
+        self.mark_dirty()
+
+    def sections(self):
+        '''
+        Returns the names of the sections
+        '''
+        return list(self._sections)
+
+    def _get_section(self, name: str):
+        try:
+            return self._sections[name]
+        except KeyError:
+            raise ValueError(f"Unknown section: {name}") from None
+
+    def _new_section(self, name: str, build: Callable, kwargs: dict):
+        if name in self._sections:
+            raise ValueError(f"Section already exists: {name}")
+        parent = kwargs.pop('parent', None) or self.gui.top_container_stack() or self.root
+        section = Section(name, self.gui.add_group(parent=parent, **kwargs), build, self._section)
+        if self._section:
+            self._section.children.append(section)
+        self._sections[name] = section
+        return section
+
+    def _build_section(self, section: Section, deadline: float = None):
+        '''
+        Builds a section, or continues its build. A generator build runs to completion,
+        or with a deadline, until the first yield after it.
+
+        :return: Whether the build finished
+        '''
+        outer, self._section = self._section, section
+        self.gui.push_container_stack(section.container)
+        try:
+            if section.steps is None:
+                steps = section.build(self)
+                if not inspect.isgenerator(steps):
+                    section.built = True
+                    section.builds += 1
+                    return True
+                section.steps = steps
+            for _ in section.steps:
+                if deadline is not None and perf_counter() >= deadline:
+                    return False
+            section.steps = None
+            section.built = True
+            section.builds += 1
             return True
-        active_window = self.ahk.get_active_window()
-        if not active_window:
-            return False
-        if ' ' not in self.application:
-            value = active_window.title
-            application = self.application
-        else:
-            type_, application = self.application.split(' ')
-            if type_ == 'ahk_class':
-                value = active_window.get_class()
-            elif type_ == 'ahk_exe':
-                value = active_window.get_exe()
-            else:
-                raise ValueError(f"Invalid application type: {self.application}")
-        return application == value
+        finally:
+            self.gui.pop_container_stack()
+            self._section = outer
+
+    def _process_sections(self):
+        '''
+        Continues building the visible lazy sections within the frame's budget, and once a second,
+        clears lazy sections which have not been visible for their eviction time
+        '''
+        now = perf_counter()
+        deadline = now + self.build_budget
+        evict = now >= self._next_eviction
+        if evict:
+            self._next_eviction = now + 1
+        building = False
+        for section in [section for section in self._sections.values() if section.lazy]:
+            if section.built and not (evict and section.evict_after is not None):
+                continue
+            visible = self.open and self.gui.is_item_visible(section.container)
+            if visible:
+                section.last_visible = now
+            if not section.built and visible:
+                if perf_counter() >= deadline:
+                    building = True
+                    continue
+                try:
+                    building |= not self._build_section(section, deadline)
+                except Exception as e:
+                    print(f"Error in callback: {e}")
+                    section.steps = None
+                    section.built = True
+            elif section.built and not visible and now - section.last_visible > section.evict_after:
+                self._clear_section(section)
+        if building:
+            self.mark_dirty()  # Keep rendering until the builds finish
+
+    def _clear_section(self, section: Section):
+        if section.steps is not None:
+            section.steps.close()
+            section.steps = None
+        section.built = False
+        for child in reversed(section.children):
+            self._clear_section(child)
+            self._sections.pop(child.name, None)
+        section.children.clear()
+        releases, section.releases = section.releases, []
+        for release in reversed(releases):
+            try:
+                release()
+            except Exception as e:
+                print(f"Error in callback: {e}")
+        for keybind in section.keybinds:
+            self.remove_keybind(keybind)
+        section.keybinds.clear()
+        if self.gui.does_item_exist(section.container):
+            self.gui.delete_item(section.container, children_only=True)
+
+    def _forget_section(self, section: Section):
+        self._sections.pop(section.name, None)
+        if section.parent:
+            section.parent.children.remove(section)
+
+    def _own(self, release: Callable):
+        '''
+        Records a function which releases something created outside of the section's container,
+        to be called when the section being built is cleared
+        '''
+        if self._section:
+            self._section.own(release)
+
+    def add_application(self, rule: str | ApplicationRule, build: Callable = None, anchor: int = None):
+        '''
+        Adds an application the popup is shown in, optionally with its own content and anchor point
+
+        :param rule: The application, as a rule in AHK title format
+        :param build: A function which builds content shown only while this application is active.
+                      It runs the first time the popup is shown in the application
+        :param anchor: The anchor point to use in this application
+
+        :return: The compiled rule
+        '''
+        if not isinstance(rule, ApplicationRule):
+            rule = ApplicationRule(rule, build=build, anchor=anchor)
+        return self.applications.add(rule)
+
+    def _application_match(self, snapshot: DesktopSnapshot):
+        if self.applications.matches_everything:
+            self.application_rule = None
+            return True
+        self.application_rule = self.applications.match(snapshot.active, snapshot.exe, snapshot.class_, snapshot.title)
+        return self.application_rule is not None
+
+    def _show_profile(self):
+        '''
+        Shows the content built for the matching application rule, building it on first use
+        '''
+        rule = self.application_rule if self.application_rule and self.application_rule.build else None
+        if rule is self._shown_profile:
+            return
+        if self._shown_profile:
+            self.gui.hide_item(self._profiles[self._shown_profile])
+        if rule:
+            if rule not in self._profiles:
+                with self.gui.group(parent=self.root) as group:
+                    self._building_rule = rule
+                    try:
+                        rule.build(self)
+                    finally:
+                        self._building_rule = None
+                self._profiles[rule] = group
+            self.gui.show_item(self._profiles[rule])
+        self._shown_profile = rule
 
     # Keybinds
-    def _evaluate_keybinds(self):
-        sorted_keybinds = sorted(self.scheduled_keybinds, key=lambda x: len(x[0]))
-        sorted_keybinds.pop()[1]()
-        self.scheduled_keybinds.clear()
+    def _add_key_handler(self, action: int):
+        '''
+        Adds the single handler which forwards every key event of this action to the dispatcher
+        '''
+        if action == self.KEY_PRESS:
+            handler = self.gui.add_key_press_handler
+        elif action == self.KEY_DOWN:
+            handler = self.gui.add_key_down_handler
+        elif action == self.KEY_UP:
+            handler = self.gui.add_key_release_handler
+        else:
+            raise ValueError(f"Invalid action: {action}")
+        self._key_handlers[action] = handler(parent=self._key_registry,
+                                             callback=self._key_callback,
+                                             user_data=action)
 
-    def _keybind_callback(self, modifiers: list[int], callback: Callable):
-        def callback_():
-            if modifiers:
-                for modifier in modifiers:
-                    if not dpg.is_key_down(modifier):
-                        return
-            self.scheduled_keybinds.append((modifiers, callback))
-        return callback_
+    def _key_callback(self, sender, app_data, action):
+        if self.manager.active is not self:
+            return
+        key = app_data[0] if isinstance(app_data, (list, tuple)) else app_data
+        keybind = self.keybinds.resolve(action, key)
+        if keybind:
+            self.run_on_main(keybind.callback)
 
     def add_keybind(self,
                     key: str,
                     callback: Callable,
                     modifiers: str | int | tuple[str | int] = (),
-                    action: int = KEY_PRESS):
+                    action: int = KEY_PRESS,
+                    background: bool = False,
+                    limit: int = 1,
+                    on_result: Callable = None,
+                    condition: Callable[[], bool] = None) -> Keybind:
         '''
-        Adds a keybind to the popup window
+        Adds a keybind to the popup window. When several keybinds match a key event,
+        only the one with the most modifiers is called, among those whose condition holds.
 
         :param key: The key to bind
-        :param callback: The function to call when the key is pressed
+        :param callback: The function to call when the key is pressed, which may be a coroutine function
         :param modifiers: The modifiers to use with the key
         :param action: The key action to listen for (Popup.KEY_PRESS, Popup.KEY_DOWN, Popup.KEY_UP)
+        :param background: Run the callback on the executor instead of the render thread
+        :param limit: How many background invocations of the callback may run at once.
+                      Presses past the limit are ignored
+        :param on_result: Called on the main loop's thread with the background callback's return value
+        :param condition: A function returning whether the keybind is active, e.g. whether the item it
+                          belongs to is visible. An inactive keybind does not fire and does not shadow others
+
+        :return: The keybind, which can be passed to remove_keybind()
         '''
-        if action == self.KEY_PRESS:
-            handler = dpg.add_key_press_handler
-        elif action == self.KEY_DOWN:
-            handler = dpg.add_key_down_handler
-        elif action == self.KEY_UP:
-            handler = dpg.add_key_release_handler
-        else:
+        if action not in (self.KEY_PRESS, self.KEY_DOWN, self.KEY_UP):
             raise ValueError(f"Invalid action: {action}")
 
-        if isinstance(modifiers, str):
-            modifiers = [KEYS[modifiers.lower()]]
-        else:
-            modifiers = [KEYS[modifier.lower()] for modifier in modifiers]
+        if isinstance(modifiers, (str, int)):
+            modifiers = [modifiers]
+        modifiers = [self._key_code(modifier) for modifier in modifiers]
+        callback = self._callable(callback)
+        if background:
+            callback = self._in_background(callback, limit=limit, on_result=on_result)
+        if self._building_rule:  # Keybinds added by an application's build only work in that application
+            condition = self._in_rule(self._building_rule, condition)
+        callback = self._profiled(callback, f'keybind {key}')
+
+        keybind = self.keybinds.add(self._key_code(key), modifiers, action, callback, condition)
+        if self._section:
+            self._section.keybinds.append(keybind)
+        if self._key_registry is not None and action not in self._key_handlers:
+            self._add_key_handler(action)
+        return keybind
+
+    def remove_keybind(self, keybind: Keybind):
+        '''
+        Removes a keybind added with add_keybind()
 
-        key = KEYS[key.lower()]
-        with dpg.handler_registry():
-            handler(key=key, callback=self._keybind_callback(modifiers, callback))
+        :param keybind: The keybind returned by add_keybind()
+        '''
+        self.keybinds.remove(keybind)
+
+    @staticmethod
+    def _key_code(key: str | int):
+        if isinstance(key, int):
+            return key
+        return KEYS[key.lower()]
 
     def call_later(self, callback: Callable, frames=1):
         '''
         Schedules a callback to run after a certain number of frames
 
-        :param callback: The function to call
+        :param callback: The function to call, which may be a coroutine function
         :param frames: The number of frames to wait before calling the function
         '''
-        dpg.set_frame_callback(dpg.get_frame_count() + frames, callback=callback)
+        name = getattr(callback, '__qualname__', repr(callback))
+        callback = self._profiled(self._callable(callback), f'frame callback {name}')
+        self.gui.set_frame_callback(self.gui.get_frame_count() + frames, callback=callback)
+        if self.scheduler:
+            self.scheduler.wake(frames + 1)
+
+    # Latency tracing
+    def _take_trace(self, action: str):
+        '''
+        Returns the trace started by toggle() for this action, or a new one if show() or hide()
+        was called directly
+        '''
+        trace, self._trace = self._trace, None
+        if not trace or trace.action != action:
+            trace = LatencyRecord(action)
+        return trace
+
+    def _finish_trace(self, trace: LatencyRecord):
+        self.latency.add(trace)
+        for hook in self._latency_hooks:
+            try:
+                hook(trace)
+            except Exception as e:
+                print(f"Error in latency hook: {e}")
 
     # Callbacks and callback wrappers
     def no_op(self):
         '''Does nothing'''
         pass
 
+    def _callable(self, callback: Callable):
+        '''
+        Wraps a coroutine function so that calling it starts it as a task instead of blocking
+        the caller. Other callbacks are returned unchanged.
+        '''
+        if not inspect.iscoroutinefunction(callback):
+            return callback
+        parameters = inspect.signature(callback).parameters.values()
+        if any(parameter.kind == parameter.VAR_POSITIONAL for parameter in parameters):
+            arity = 3
+        else:
+            arity = min(len(parameters), 3)
+
+        def callback_(sender=None, app_data=None, user_data=None):
+            self.manager.run_coroutine(callback(*(sender, app_data, user_data)[:arity]))
+        callback_.__wrapped__ = callback
+        return callback_
+
+    def _profiled(self, callback: Callable, name: str):
+        '''
+        Wraps a callback to record its duration if profiling is enabled
+        '''
+        profiler = self.manager.profiler
+        return profiler.wrap(callback, name) if profiler else callback
+
+    def _in_background(self, callback: Callable, limit: int = 1, on_result: Callable = None, busy_item: int = None):
+        '''
+        Wraps a callback so that calling it submits it to the executor. Coroutine function
+        callbacks already run without blocking and are returned unchanged.
+        '''
+        if inspect.iscoroutinefunction(getattr(callback, '__wrapped__', None)):
+            return callback
+
+        def finished(future):
+            self.run_on_main(lambda: self._deliver(future, on_result, busy_item))
+
+        def callback_():
+            self._set_busy(busy_item, 1)
+            if not self.manager.executor.submit(callback, limit=limit, done=finished):
+                self._set_busy(busy_item, -1)
+        return callback_
+
+    def _deliver(self, future, on_result: Callable, busy_item: int):
+        self._set_busy(busy_item, -1)
+        try:
+            result = future.result()
+        except Exception as e:
+            print(f"Error in callback: {e}")
+            return
+        if on_result:
+            on_result(result)
+
+    def _set_busy(self, item: int, change: int):
+        '''
+        Counts the background callbacks running for an item, disabling it and marking its label
+        while any are running
+        '''
+        if item is None:
+            return
+        with self._busy_lock:
+            if not self.gui.does_item_exist(item):  # Deleted while its callback ran, e.g. with its section
+                self._busy.pop(item, None)
+                return
+            count, label = self._busy.get(item, (0, None))
+            if not count:
+                label = self.gui.get_item_label(item)
+                self.gui.configure_item(item, enabled=False, label=f'{label} ...')
+            count += change
+            if count:
+                self._busy[item] = (count, label)
+            else:
+                self._busy.pop(item, None)
+                self.gui.configure_item(item, enabled=True, label=label)
+
     def _hide_before_calling(self, callback):
         def callback_():
             self.hide()
             callback()
         return callback_
 
-    def _if_active(self, element: int, callback):
-        def callback_():
-            if dpg.is_item_visible(element):
-                callback()
-        return callback_
+    def _in_rule(self, rule: ApplicationRule, condition: Callable[[], bool] = None):
+        return lambda: self._shown_profile is rule and (condition is None or condition())
+
+    def _is_visible(self, element: int):
+        return lambda: self.gui.is_item_visible(element)
 
     def __enter__(self):
-        dpg.push_container_stack(self.root)
-        return dpg
+        self.gui.push_container_stack(self.root)
+        return self.gui
 
     def __exit__(self, exc_type, exc_val, exc_tb):
-        dpg.pop_container_stack()
+        self.gui.pop_container_stack()
+
+    def refresh_monitors(self):
+        '''
+        Re-enumerates the monitors. The layout is refreshed automatically when the display
+        configuration changes, so this is only needed if that detection is unavailable.
+        '''
+        self.monitors.refresh()
 
     def _get_bounding_monitor(self, x, y):
-        for monitor in get_monitors():
-            if monitor.x <= x < monitor.x + monitor.width and \
-               monitor.y <= y < monitor.y + monitor.height:
-                return monitor
-        raise ValueError(f"Could not find monitor for coordinates: {x}, {y}")
+        '''
+        Returns the monitor containing the point, falling back to the nearest monitor
+        when the point is outside every monitor, or None if no monitors were found
+        '''
+        return self.monitors.nearest(x, y)
@@ -0,0 +1,162 @@
+import inspect
+import json
+import os
+import threading
+from array import array
+from time import perf_counter_ns
+from typing import Callable
+
+from .stats import LatencyStats
+
+MAX_NAMES = 2 ** 16  # Name IDs are stored as unsigned shorts
+OTHER = '<other>'  # The name spans are recorded under once MAX_NAMES names are in use
+
+
+class Profiler:
+    '''
+    Records the stages of each main loop step and the duration of each user callback in a ring buffer.
+
+    Every span is stored as four machine integers, so a profiler of the default capacity uses
+    under 120 KiB however long it runs. Callbacks slower than the threshold are reported as they happen.
+    Once MAX_NAMES distinct names were recorded, later new names are recorded as OTHER.
+    '''
+
+    def __init__(self, capacity: int = 4096, slow_callback: float = 0.05):
+        '''
+        :param capacity: How many of the most recent spans to keep
+        :param slow_callback: Seconds after which a callback is reported as slow, or None to never report
+        '''
+        self.capacity = capacity
+        self.slow_callback = slow_callback
+        self._starts = array('q', bytes(8 * capacity))
+        self._durations = array('q', bytes(8 * capacity))
+        self._threads = array('Q', bytes(8 * capacity))
+        self._names = array('H', bytes(2 * capacity))
+        self._name_ids = {}
+        self._name_list = []  # (name, category) by name ID
+        self._next = 0
+        self._count = 0
+        self._lock = threading.Lock()
+        self._slow_hooks = []
+
+    def record(self, name: str, category: str, start: int, duration: int):
+        '''
+        Records a span
+
+        :param name: What was timed, e.g. a stage or a callback label
+        :param category: 'frame' for main loop stages, 'callback' for user callbacks
+        :param start: The perf_counter_ns() time the span started
+        :param duration: The duration in nanoseconds
+        '''
+        with self._lock:
+            name_id = self._name_ids.get((name, category))
+            if name_id is None:
+                name_id = self._intern(name, category)
+            slot = self._next
+            self._starts[slot] = start
+            self._durations[slot] = duration
+            self._threads[slot] = threading.get_ident()
+            self._names[slot] = name_id
+            self._next = (slot + 1) % self.capacity
+            self._count = min(self._count + 1, self.capacity)
+        if category == 'callback' and self.slow_callback is not None and duration > self.slow_callback * 1e9:
+            self._report_slow(name, duration)
+
+    def _intern(self, name: str, category: str):
+        # Keep an ID free for the OTHER name of each category, so one is left however the table filled
+        if len(self._name_list) >= MAX_NAMES - 2:
+            name = OTHER
+            name_id = self._name_ids.get((name, category))
+            if name_id is not None:
+                return name_id
+            if len(self._name_list) >= MAX_NAMES:  # An undocumented category, share another OTHER ID
+                return next(name_id for (name_, _), name_id in self._name_ids.items() if name_ == OTHER)
+        name_id = self._name_ids[name, category] = len(self._name_list)
+        self._name_list.append((name, category))
+        return name_id
+
+    def wrap(self, callback: Callable, name: str):
+        '''
+        Returns a callback which records its duration under a name.
+        Like Dear PyGui, it passes on only as many of (sender, app_data, user_data) as the callback accepts.
+        '''
+        try:
+            parameters = inspect.signature(callback).parameters.values()
+        except (TypeError, ValueError):
+            arity = 3
+        else:
+            if any(parameter.kind == parameter.VAR_POSITIONAL for parameter in parameters):
+                arity = 3
+            else:
+                arity = min(len(parameters), 3)
+
+        def callback_(*args):
+            start = perf_counter_ns()
+            try:
+                return callback(*args[:arity])
+            finally:
+                try:
+                    self.record(name, 'callback', start, perf_counter_ns() - start)
+                except Exception as e:  # Profiling must never change what the callback returns or raises
+                    print(f"Error in profiler: {e}")
+        return callback_
+
+    def add_slow_hook(self, hook: Callable[[str, float], None]):
+        '''
+        Calls a hook with the name and duration in milliseconds of each slow callback, instead of printing it
+        '''
+        self._slow_hooks.append(hook)
+
+    def _report_slow(self, name: str, duration: int):
+        if not self._slow_hooks:
+            print(f"Slow callback {name}: {duration / 1e6:.1f} ms")
+        for hook in self._slow_hooks:
+            try:
+                hook(name, duration / 1e6)
+            except Exception as e:
+                print(f"Error in callback: {e}")
+
+    def spans(self):
+        '''
+        Returns the recorded spans, oldest first, as (name, category, start, duration, thread) tuples
+        '''
+        with self._lock:
+            first = (self._next - self._count) % self.capacity
+            slots = [(first + i) % self.capacity for i in range(self._count)]
+            return [(*self._name_list[self._names[slot]], self._starts[slot], self._durations[slot], self._threads[slot])
+                    for slot in slots]
+
+    def stats(self, category: str = None):
+        '''
+        Returns {name: {'count', 'p50', 'p95', 'p99', 'max'}} with durations in milliseconds,
+        over the spans still in the buffer
+
+        :param category: Only include 'frame' stages or 'callback' spans
+        '''
+        samples = {}
+        for name, category_, _, duration, _ in self.spans():
+            if category is None or category == category_:
+                samples.setdefault(name, []).append(duration)
+        return {name: LatencyStats._percentiles(durations) for name, durations in samples.items()}
+
+    def export_chrome_trace(self, path: str):
+        '''
+        Writes the recorded spans as a Chrome trace, which chrome://tracing and Perfetto can open
+        '''
+        spans = self.spans()
+        origin = min((start for _, _, start, _, _ in spans), default=0)
+        events = [{
+            'name': name,
+            'cat': category,
+            'ph': 'X',
+            'ts': (start - origin) / 1000,
+            'dur': duration / 1000,
+            'pid': os.getpid(),
+            'tid': thread,
+        } for name, category, start, duration, thread in spans]
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, file)
+
+    def clear(self):
+        with self._lock:
+            self._next = self._count = 0
@@ -0,0 +1,142 @@
+import asyncio
+import threading
+from time import monotonic
+
+try:
+    import win32event
+except ImportError:  # Not on Windows, fall back to plain timeouts
+    win32event = None
+
+
+class RenderScheduler:
+    '''
+    Decides when the main loop should render the next frame.
+
+    A hidden popup sleeps until something wakes it (the hotkey, a scheduled frame callback
+    or content being marked dirty). A visible popup renders immediately when woken or when
+    input arrives, and otherwise renders at most ``idle_fps`` frames per second.
+    '''
+
+    def __init__(self, idle_fps: float = 10, hidden_interval: float = 1.0, linger_frames: int = 3):
+        '''
+        :param idle_fps: The maximum frame rate while the popup is visible but idle.
+                         0 renders only when input arrives or the popup is woken
+        :param hidden_interval: The longest time in seconds to sleep between frames while hidden,
+                                which keeps the window's message queue serviced
+        :param linger_frames: How many frames to keep rendering after a wake-up, so that
+                              Dear PyGui can settle hover and click state
+        '''
+        self.idle_fps = idle_fps
+        self.hidden_interval = hidden_interval
+        self.linger_frames = linger_frames
+        self._wake_event = threading.Event()
+        self._lock = threading.Lock()
+        self._pending_frames = 0
+        self._async_wake = None
+        self._input_handle = None
+        if win32event:
+            self._input_handle = win32event.CreateEvent(None, False, False, None)
+
+    @property
+    def idle_interval(self):
+        if not self.idle_fps:
+            return None
+        return 1 / self.idle_fps
+
+    def wake(self, frames: int = None):
+        '''
+        Wakes the main loop and makes it render at least ``frames`` frames.
+        Safe to call from any thread.
+
+        :param frames: The number of frames to render, defaults to ``linger_frames``
+        '''
+        with self._lock:
+            self._pending_frames = max(self._pending_frames, frames or self.linger_frames)
+        self._wake_event.set()
+        if self._input_handle:
+            win32event.SetEvent(self._input_handle)
+        async_wake = self._async_wake
+        if async_wake:
+            async_wake()
+
+    def wait(self, visible: bool):
+        '''
+        Blocks until the next frame should be rendered
+
+        :param visible: Whether the popup is currently visible
+        '''
+        if self._take_pending_frame():
+            return
+        if visible:
+            woken = self._wait_for_input(self.idle_interval)
+        else:
+            woken = self._wake_event.wait(self.hidden_interval)
+        self._finish_wait(woken)
+
+    async def wait_async(self, visible: bool, poll_interval: float = 1 / 60):
+        '''
+        Waits like wait() without blocking the running asyncio event loop. Wake-ups resolve the wait
+        immediately. An event loop cannot also block on the window's message queue, so while visible
+        on Windows, input is polled every ``poll_interval`` seconds instead.
+
+        :param visible: Whether the popup is currently visible
+        :param poll_interval: How often to check for input while visible
+        '''
+        if self._take_pending_frame():
+            return
+        loop = asyncio.get_running_loop()
+        waiter = loop.create_future()
+
+        def resolve():
+            if not waiter.done():
+                waiter.set_result(True)
+
+        self._async_wake = lambda: loop.call_soon_threadsafe(resolve)
+        try:
+            if self._wake_event.is_set():
+                woken = True
+            elif visible and self._input_handle:
+                woken = await self._poll_for_input(waiter, self.idle_interval, poll_interval)
+            else:
+                done, _ = await asyncio.wait({waiter}, timeout=self.idle_interval if visible else self.hidden_interval)
+                woken = bool(done)
+        finally:
+            self._async_wake = None
+        self._finish_wait(woken)
+
+    async def _poll_for_input(self, waiter: asyncio.Future, timeout: float, poll_interval: float):
+        deadline = None if timeout is None else monotonic() + timeout
+        while True:
+            remaining = poll_interval if deadline is None else min(poll_interval, deadline - monotonic())
+            if remaining <= 0:
+                return False
+            done, _ = await asyncio.wait({waiter}, timeout=remaining)
+            if done or self._wait_for_input(0):
+                return True
+
+    def _take_pending_frame(self):
+        with self._lock:
+            if self._pending_frames > 0:
+                self._pending_frames -= 1
+                return True
+        return False
+
+    def _finish_wait(self, woken: bool):
+        self._wake_event.clear()
+        if woken:
+            with self._lock:
+                self._pending_frames = max(self._pending_frames, self.linger_frames)
+
+    def _wait_for_input(self, timeout: float):
+        '''
+        Waits for user input on the calling thread's message queue, a wake-up or the timeout.
+        Returns whether the wait ended early.
+        '''
+        if not self._input_handle:
+            return self._wake_event.wait(timeout)
+        milliseconds = win32event.INFINITE if timeout is None else int(timeout * 1000)
+        result = win32event.MsgWaitForMultipleObjects([self._input_handle],
+                                                      False,
+                                                      milliseconds,
+                                                      win32event.QS_ALLINPUT)
+        return result != win32event.WAIT_TIMEOUT
@@ -0,0 +1,45 @@
+from typing import Callable
+
+
+class Section:
+    '''
+    A named part of a popup's content, and everything that was created while building it.
+
+    The section's items live in its container, so deleting the container's children deletes them.
+    Keybinds, handlers, bindings and callbacks registered elsewhere are recorded with the section,
+    so clearing it releases them along with the items and a section can be rebuilt any number
+    of times without memory or handler counts growing.
+
+    A build function which is a generator is resumed after each yield, which lets a lazy section
+    spread its build over several frames.
+    '''
+
+    def __init__(self, name: str, container: int, build: Callable, parent: 'Section' = None):
+        '''
+        :param name: The name the popup knows the section by
+        :param container: The group holding the section's items
+        :param build: The function that builds the section's content
+        :param parent: The section this one was added in, which owns it
+        '''
+        self.name = name
+        self.container = container
+        self.build = build
+        self.parent = parent
+        self.children = []  # Sections added while building this one
+        self.keybinds = []
+        self.releases = []  # Functions which release resources created outside the container
+        self.builds = 0
+        self.built = False
+        self.lazy = False  # Built the first time it becomes visible, instead of when added
+        self.evict_after = None  # Seconds without being visible after which a lazy section is cleared
+        self.last_visible = 0.0
+        self.steps = None  # The generator of a build which is spread over several frames
+
+    def __repr__(self):
+        return f"Section({self.name!r}, keybinds={len(self.keybinds)}, releases={len(self.releases)})"
+
+    def own(self, release: Callable):
+        '''
+        Records a function to call when the section is cleared
+        '''
+        self.releases.append(release)
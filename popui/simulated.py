@@ -0,0 +1,597 @@
+'''
+An in-process simulated backend, for benchmarking and regression testing popups without a desktop.
+
+The simulated Dear PyGui module implements the subset of the API popui relies on and keeps
+its items in plain dictionaries. Input is scripted with press_key(), click(), type_text() and scroll_wheel(), and is
+delivered, along with item callbacks, on the thread calling render_dearpygui_frame().
+Tabs and collapsing headers are opened with set_value(), as in Dear PyGui.
+Images are not decoded: load_image() reads the size of PNG files and returns transparent pixels.
+Fonts are not rasterized, but adding one counts a font atlas rebuild on the next frame in gui.atlas_builds.
+With a refresh rate and vsync on, render_dearpygui_frame() blocks for a refresh interval like a real display.
+The simulated AHK object counts every call that would be a round-trip to the AHK process.
+'''
+import inspect
+import struct
+import threading
+from contextlib import contextmanager
+from itertools import count
+from types import SimpleNamespace
+from typing import Callable
+
+from dearpygui import dearpygui as dpg
+from screeninfo import Monitor
+
+from .backend import Backend, DesktopSnapshot
+
+
+_INPUT_HANDLERS = {
+    'key_press_handler': 'press',
+    'key_down_handler': 'down',
+    'key_release_handler': 'release',
+    'mouse_wheel_handler': 'wheel',
+}
+
+
+class SimulatedItem:
+    __slots__ = ('id', 'type', 'parent', 'children', 'config', 'value')
+
+    def __init__(self, id_, type_, parent, config):
+        self.id = id_
+        self.type = type_
+        self.parent = parent
+        self.children = []
+        self.config = config
+        self.value = config.pop('default_value', None)
+
+
+class SimulatedGui:
+    '''
+    A Dear PyGui compatible module backed by plain Python objects
+    '''
+
+    def __init__(self, desktop: 'SimulatedDesktop'):
+        self._desktop = desktop
+        self._ids = count(1000)
+        self._signatures = {}
+        self.destroy_context()
+
+    def __getattr__(self, name: str):
+        if name.startswith('mv'):
+            return getattr(dpg, name)
+        if name.startswith('add_'):
+            type_ = name[4:]
+            return lambda *args, **kwargs: self._add(type_, *args, **kwargs)
+        if hasattr(dpg, 'add_' + name):  # Container context managers, e.g. dpg.group()
+            return lambda *args, **kwargs: self._container(name, *args, **kwargs)
+        raise AttributeError(f"The simulated backend does not support dpg.{name}")
+
+    # Context and viewport
+    def create_context(self):
+        self.destroy_context()
+
+    def destroy_context(self):
+        self._items = {}
+        self._handlers = {}
+        self._stack = []
+        self._frame = 0
+        self._frame_callbacks = {}
+        self._events = []
+        self._held_keys = set()
+        self._hovered = None
+        self._focused = None
+        self._running = False
+        self._primary_window = None
+        self.viewport = None
+        self.font = None  # The bound font
+        self.font_scale = 1.0
+        self.vsync = True
+        self.atlas_builds = 0
+        self._fonts_changed = True  # The atlas is built on the first frame, for the default font
+
+    def setup_dearpygui(self):
+        self._running = True
+
+    def create_viewport(self, *, title: str = 'Dear PyGui', width: int = 1280, height: int = 800,
+                        x_pos: int = 100, y_pos: int = 100, **kwargs):
+        self.viewport = SimpleNamespace(title=title, width=width, height=height, pos=(x_pos, y_pos),
+                                        always_top=False, shown=False, config=kwargs)
+
+    def show_viewport(self, **kwargs):
+        self.viewport.shown = True
+        x, y = self.viewport.pos
+        self._desktop.open_window(self.viewport.title, x=x, y=y, width=self.viewport.width, height=self.viewport.height)
+
+    def get_viewport_title(self):
+        return self.viewport.title
+
+    def get_viewport_width(self):
+        return self.viewport.width
+
+    def get_viewport_height(self):
+        return self.viewport.height
+
+    def set_viewport_width(self, width: int):
+        self.viewport.width = width
+
+    def set_viewport_height(self, height: int):
+        self.viewport.height = height
+
+    def set_viewport_pos(self, pos):
+        self.viewport.pos = tuple(pos)
+        window = self._desktop.find_window(self.viewport.title)
+        if window:
+            window.x, window.y = pos
+
+    def get_viewport_pos(self):
+        return list(self.viewport.pos)
+
+    def set_viewport_always_top(self, value: bool):
+        self.viewport.always_top = value
+
+    def set_viewport_vsync(self, value: bool):
+        self.vsync = value
+
+    def is_viewport_vsync_on(self):
+        return self.vsync
+
+    def set_primary_window(self, window, value: bool):
+        self._primary_window = window if value else None
+
+    def is_dearpygui_running(self):
+        return self._running
+
+    def stop_dearpygui(self):
+        self._running = False
+
+    # Frames
+    def get_frame_count(self):
+        return self._frame
+
+    def set_frame_callback(self, frame: int, callback: Callable, **kwargs):
+        self._frame_callbacks.setdefault(frame, []).append((callback, kwargs.get('user_data')))
+
+    def render_dearpygui_frame(self):
+        if self.vsync and self._desktop.refresh_rate:
+            threading.Event().wait(1 / self._desktop.refresh_rate)
+        self._frame += 1
+        if self._fonts_changed:
+            self._fonts_changed = False
+            self.atlas_builds += 1
+        for callback, user_data in self._frame_callbacks.pop(self._frame, ()):
+            self._invoke(callback, None, None, user_data)
+        events, self._events = self._events, []
+        for event in events:
+            event()
+        for key in self._held_keys:
+            self._fire_input('down', key, [key, 0.0])
+
+    # Items
+    def _add(self, type_, *args, parent=0, tag=0, **kwargs):
+        if args:  # Positional arguments are only used by handlers for the key
+            kwargs['key'] = args[0]
+        id_ = tag or next(self._ids)
+        if not parent and not type_.endswith('registry'):  # Registries are root items, as in Dear PyGui
+            parent = self._stack[-1] if self._stack else None
+        kwargs.setdefault('show', True)
+        kwargs.setdefault('enabled', True)
+        item = SimulatedItem(id_, type_, parent, kwargs)
+        self._items[id_] = item
+        if type_.startswith('font') and type_ != 'font_registry':
+            self._fonts_changed = True
+        if type_ in _INPUT_HANDLERS:
+            self._handlers[id_] = item
+        if parent in self._items:
+            siblings = self._items[parent].children
+            before = kwargs.get('before')
+            siblings.insert(siblings.index(before) if before in siblings else len(siblings), id_)
+        return id_
+
+    @contextmanager
+    def _container(self, type_, *args, **kwargs):
+        id_ = self._add(type_, *args, **kwargs)
+        self._stack.append(id_)
+        try:
+            yield id_
+        finally:
+            self._stack.pop()
+
+    def push_container_stack(self, item):
+        self._stack.append(item)
+
+    def pop_container_stack(self):
+        return self._stack.pop() if self._stack else None
+
+    def top_container_stack(self):
+        return self._stack[-1] if self._stack else None
+
+    def last_item(self):
+        return next(reversed(self._items), None)
+
+    def does_item_exist(self, item):
+        return item in self._items
+
+    def get_all_items(self):
+        return list(self._items)
+
+    def delete_item(self, item, *, children_only: bool = False, **kwargs):
+        target = self._items[item]
+        for child in list(target.children):
+            self.delete_item(child)
+        if children_only:
+            return
+        parent = self._items.get(target.parent)
+        if parent:
+            parent.children.remove(item)
+        del self._items[item]
+        self._handlers.pop(item, None)
+
+    def get_item_children(self, item, slot: int = None):
+        children = list(self._items[item].children)
+        return children if slot is not None else {1: children}
+
+    def get_item_parent(self, item):
+        return self._items[item].parent
+
+    def get_item_type(self, item):
+        return self._items[item].type
+
+    def get_item_configuration(self, item):
+        return dict(self._items[item].config)
+
+    def get_item_label(self, item):
+        return self._items[item].config.get('label')
+
+    def get_item_user_data(self, item):
+        return self._items[item].config.get('user_data')
+
+    def configure_item(self, item, **kwargs):
+        self._items[item].config.update(kwargs)
+
+    def get_value(self, item):
+        return self._items[item].value
+
+    def set_value(self, item, value):
+        self._items[item].value = value
+
+    def show_item(self, item):
+        self.configure_item(item, show=True)
+
+    def hide_item(self, item, **kwargs):
+        self.configure_item(item, show=False)
+
+    def is_item_shown(self, item):
+        return self._items[item].config['show']
+
+    def is_item_visible(self, item):
+        if not self.viewport or not self.viewport.shown:
+            return False
+        window = self._desktop.find_window(self.viewport.title)
+        if window and not window.visible:
+            return False
+        while item in self._items:
+            target = self._items[item]
+            if not target.config['show']:
+                return False
+            if target.type == 'tab' and self._selected_tab(target.parent) != item:
+                return False
+            if target.type == 'collapsing_header' and not (target.value if target.value is not None
+                                                           else target.config.get('default_open', False)):
+                return False
+            item = target.parent
+        return True
+
+    def _selected_tab(self, tab_bar):
+        '''
+        Returns the tab a tab bar shows: the one set as its value, or else its first tab
+        '''
+        bar = self._items.get(tab_bar)
+        if bar is None:
+            return None
+        return bar.value if bar.value in bar.children else next(iter(bar.children), None)
+
+    # Textures
+    def load_image(self, file: str):
+        '''
+        Reads the size of a PNG file and returns (width, height, 4, data) with transparent pixels, or None
+        if it is not a PNG file
+        '''
+        try:
+            with open(file, 'rb') as image:
+                header = image.read(24)
+        except OSError:
+            return None
+        if header[:8] != b'\x89PNG\r\n\x1a\n':
+            return None
+        width, height = struct.unpack('>II', header[16:24])
+        return width, height, 4, [0.0] * (width * height * 4)
+
+    # Fonts
+    def bind_font(self, font):
+        self.font = font
+
+    def set_global_font_scale(self, scale: float):
+        self.font_scale = scale
+
+    def get_global_font_scale(self):
+        return self.font_scale
+
+    # Input
+    def is_key_down(self, key: int):
+        return key in self._held_keys
+
+    def press_key(self, key: int, modifiers=()):
+        '''
+        Queues a key press with the modifiers held down, delivered on the next frame
+        '''
+        def event():
+            held = set(self._held_keys)
+            self._held_keys.update(modifiers)
+            self._held_keys.add(key)
+            self._fire_input('press', key, key)
+            self._fire_input('release', key, key)
+            self._held_keys = held
+        self._events.append(event)
+
+    def hold_key(self, key: int):
+        self._events.append(lambda: self._held_keys.add(key))
+
+    def release_key(self, key: int):
+        self._events.append(lambda: self._held_keys.discard(key))
+
+    def click(self, item):
+        '''
+        Queues a click on an item, delivered on the next frame if the item is visible and enabled
+        '''
+        def event():
+            target = self._items.get(item)
+            if target and target.config['enabled'] and self.is_item_visible(item):
+                self._invoke(target.config.get('callback'), item, target.value, target.config.get('user_data'))
+        self._events.append(event)
+
+    def type_text(self, item, text: str):
+        '''
+        Queues replacing the text of an input, delivered with its callback on the next frame
+        '''
+        def event():
+            target = self._items.get(item)
+            if target and target.config['enabled'] and self.is_item_visible(item):
+                target.value = text
+                self._invoke(target.config.get('callback'), item, text, target.config.get('user_data'))
+        self._events.append(event)
+
+    def focus_item(self, item):
+        self._focused = item
+
+    def scroll_wheel(self, delta: int, item=None):
+        '''
+        Queues a mouse wheel scroll over an item, delivered on the next frame. Positive deltas scroll up.
+        '''
+        def event():
+            self._hovered = item
+            self._fire_input('wheel', None, delta)
+        self._events.append(event)
+
+    def is_item_hovered(self, item):
+        return item is not None and item == self._hovered
+
+    def _fire_input(self, action: str, key: int, app_data):
+        for item in list(self._handlers.values()):
+            if _INPUT_HANDLERS.get(item.type) != action or not item.config['show']:
+                continue
+            if item.config.get('key', -1) not in (-1, key):
+                continue
+            self._invoke(item.config.get('callback'), item.id, app_data, item.config.get('user_data'))
+
+    def _invoke(self, callback, sender, app_data, user_data):
+        '''
+        Calls a callback with as many of (sender, app_data, user_data) as it accepts, like Dear PyGui
+        '''
+        if not callback:
+            return
+        function = getattr(callback, '__func__', callback)
+        code = getattr(function, '__code__', None)
+        arity = self._signatures.get(code)
+        if arity is None:
+            parameters = inspect.signature(callback).parameters.values()
+            if any(parameter.kind == parameter.VAR_POSITIONAL for parameter in parameters):
+                arity = 3
+            else:
+                arity = min(len(parameters), 3)
+            if code:
+                self._signatures[code] = arity
+        callback(*(sender, app_data, user_data)[:arity])
+
+
+class SimulatedWindow:
+    '''
+    An AHK compatible window on the simulated desktop
+    '''
+
+    def __init__(self, desktop: 'SimulatedDesktop', id_: int, title: str, class_: str, exe: str,
+                 x: int, y: int, width: int, height: int):
+        self._desktop = desktop
+        self.id = id_
+        self.title = title
+        self.class_ = class_
+        self.exe = exe
+        self.x, self.y, self.width, self.height = x, y, width, height
+        self.visible = True
+        self.closed = False
+
+    def __repr__(self):
+        return f"SimulatedWindow(id={self.id}, title={self.title!r})"
+
+    def exists(self):
+        self._desktop.round_trip()
+        return not self.closed
+
+    def get_class(self):
+        self._desktop.round_trip()
+        return self.class_
+
+    def get_exe(self):
+        self._desktop.round_trip()
+        return self.exe
+
+    get_process_name = get_exe
+
+    def get_position(self):
+        self._desktop.round_trip()
+        return self.x, self.y, self.width, self.height
+
+    def activate(self):
+        self._desktop.round_trip()
+        if not self.closed:
+            self._desktop.active = self
+
+    def show(self):
+        self._desktop.round_trip()
+        self.visible = True
+
+    def hide(self):
+        self._desktop.round_trip()
+        self.visible = False
+        if self._desktop.active is self:
+            self._desktop.active = None
+
+    def close(self):
+        self._desktop.round_trip()
+        self.closed = True
+        self.visible = False
+        self._desktop.windows.remove(self)
+        if self._desktop.active is self:
+            self._desktop.active = None
+
+
+class SimulatedAHK:
+    '''
+    An AHK compatible hotkey and window manager for the simulated desktop.
+    Hotkeys are triggered with trigger(), on the calling thread.
+    '''
+
+    def __init__(self, desktop: 'SimulatedDesktop'):
+        self._desktop = desktop
+        self.hotkeys = {}
+        self.running = False
+
+    def add_hotkey(self, hotkey: str, callback: Callable, **kwargs):
+        self.hotkeys[hotkey] = callback
+
+    def remove_hotkey(self, hotkey: str):
+        self.hotkeys.pop(hotkey, None)
+
+    def start_hotkeys(self):
+        self.running = True
+
+    def stop_hotkeys(self):
+        self.running = False
+
+    def trigger(self, hotkey: str):
+        '''
+        Simulates the user pressing a hotkey
+        '''
+        if self.running and hotkey in self.hotkeys:
+            self.hotkeys[hotkey]()
+
+    def get_mouse_position(self, coord_mode: str = None, **kwargs):
+        self._desktop.round_trip()
+        return self._desktop.mouse
+
+    def get_active_window(self):
+        self._desktop.round_trip()
+        return self._desktop.active
+
+    def find_window_by_class(self, title: str):
+        self._desktop.round_trip()
+        return self._desktop.find_window(title)
+
+    find_window_by_title = find_window_by_class
+
+    def list_windows(self):
+        self._desktop.round_trip()
+        windows = list(self._desktop.windows)
+        for _ in windows:  # Reading each window's title is another round-trip
+            self._desktop.round_trip()
+        return windows
+
+
+class SimulatedDesktop:
+    '''
+    The monitors, windows and cursor shared by a simulated backend's gui and ahk objects
+    '''
+
+    def __init__(self, monitors: list = None, latency: float = 0, dpis: list = None, refresh_rate: float = None):
+        '''
+        :param monitors: The monitor layout, a single 1920x1080 monitor by default
+        :param latency: Seconds to spend on each simulated round-trip to the AHK process
+        :param dpis: The DPI of each monitor, 96 for all by default
+        :param refresh_rate: The frames per second vsync waits for, or None to render without waiting
+        '''
+        self.refresh_rate = refresh_rate
+        self.monitors = monitors or [Monitor(x=0, y=0, width=1920, height=1080, is_primary=True)]
+        self.dpis = dpis or [96] * len(self.monitors)
+        self.latency = latency
+        self.windows = []
+        self.active = None
+        self.mouse = (self.monitors[0].x + 100, self.monitors[0].y + 100)
+        self.round_trips = 0
+        self._ids = count(0x10000)
+        self._lock = threading.Lock()
+
+    def round_trip(self):
+        with self._lock:
+            self.round_trips += 1
+        if self.latency:
+            threading.Event().wait(self.latency)
+
+    def open_window(self, title: str, class_: str = None, exe: str = 'python.exe',
+                    x: int = 0, y: int = 0, width: int = 800, height: int = 600, activate: bool = True):
+        '''
+        Opens a window on the simulated desktop and returns it
+        '''
+        window = SimulatedWindow(self, next(self._ids), title, class_ or title, exe, x, y, width, height)
+        self.windows.insert(0, window)
+        if activate:
+            self.active = window
+        return window
+
+    def find_window(self, title: str):
+        return next((window for window in self.windows if window.title == title), None)
+
+
+class SimulatedBackend(Backend):
+    '''
+    A backend which runs entirely in-process, on any platform
+    '''
+
+    def __init__(self, monitors: list = None, latency: float = 0, dpis: list = None, refresh_rate: float = None):
+        '''
+        :param monitors: The monitor layout, a single 1920x1080 monitor by default
+        :param latency: Seconds to spend on each simulated round-trip to the AHK process
+        :param dpis: The DPI of each monitor, 96 for all by default
+        :param refresh_rate: The frames per second vsync waits for, or None to render without waiting
+        '''
+        self.desktop = SimulatedDesktop(monitors, latency, dpis, refresh_rate)
+        self.gui = SimulatedGui(self.desktop)
+        self.ahk = SimulatedAHK(self.desktop)
+
+    def get_monitors(self):
+        return list(self.desktop.monitors)
+
+    def display_signature(self):
+        return tuple((monitor.x, monitor.y, monitor.width, monitor.height) for monitor in self.desktop.monitors)
+
+    def monitor_dpi(self, monitor):
+        for known, dpi in zip(self.desktop.monitors, self.desktop.dpis):
+            if known is monitor:
+                return dpi
+        return 96
+
+    def snapshot(self, window=None):
+        self.desktop.round_trip()
+        active = self.desktop.active
+        own_visible = bool(window and window.visible and not window.closed)
+        if active is None:
+            return DesktopSnapshot(self.desktop.mouse, own_visible=own_visible)
+        return DesktopSnapshot(self.desktop.mouse, active, exe=active.exe, class_=active.class_, title=active.title,
+                               position=(active.x, active.y, active.width, active.height), own_visible=own_visible)
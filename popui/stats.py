@@ -0,0 +1,80 @@
+from collections import deque
+from time import monotonic_ns
+
+
+class LatencyRecord:
+    '''
+    The per-stage timings of a single show or hide, in nanoseconds.
+
+    Each stage is timed from the end of the previous stage, starting at the hotkey callback.
+    '''
+    __slots__ = ('action', 'start', 'stages', '_last')
+
+    def __init__(self, action: str):
+        self.action = action
+        self.start = self._last = monotonic_ns()
+        self.stages = {}
+
+    def mark(self, stage: str):
+        '''
+        Records the end of a stage
+        '''
+        now = monotonic_ns()
+        self.stages[stage] = now - self._last
+        self._last = now
+
+    @property
+    def total(self):
+        return self._last - self.start
+
+    def __repr__(self):
+        stages = ', '.join(f'{stage}={duration / 1e6:.2f}ms' for stage, duration in self.stages.items())
+        return f"LatencyRecord({self.action}: {stages}, total={self.total / 1e6:.2f}ms)"
+
+
+class LatencyStats:
+    '''
+    Rolling latency histograms per action and stage, keeping the most recent ``window`` samples
+    '''
+
+    def __init__(self, window: int = 1000):
+        self.window = window
+        self._samples = {}
+
+    def add(self, record: LatencyRecord):
+        stages = self._samples.setdefault(record.action, {})
+        for stage, duration in record.stages.items():
+            self._sample(stages, stage).append(duration)
+        self._sample(stages, 'total').append(record.total)
+
+    def summary(self):
+        '''
+        Returns {action: {stage: {'count', 'p50', 'p95', 'p99', 'max'}}} with durations in milliseconds
+        '''
+        return {action: {stage: self._percentiles(samples) for stage, samples in stages.items()}
+                for action, stages in self._samples.items()}
+
+    def clear(self):
+        self._samples.clear()
+
+    def _sample(self, stages: dict, stage: str):
+        try:
+            return stages[stage]
+        except KeyError:
+            return stages.setdefault(stage, deque(maxlen=self.window))
+
+    @staticmethod
+    def _percentiles(samples):
+        ordered = sorted(samples)
+        last = len(ordered) - 1
+
+        def percentile(p):
+            return ordered[round(last * p)] / 1e6
+
+        return {
+            'count': len(ordered),
+            'p50': percentile(0.50),
+            'p95': percentile(0.95),
+            'p99': percentile(0.99),
+            'max': ordered[-1] / 1e6,
+        }
@@ -0,0 +1,170 @@
+import os
+from collections import OrderedDict
+from functools import cache, partial
+
+
+@cache
+def _pillow():
+    '''
+    Returns PIL.Image, imported on first use so that importing popui does not pay for it, or None
+    '''
+    try:
+        from PIL import Image
+    except ImportError:  # Decode with Dear PyGui instead, at the image's own size
+        return None
+    return Image
+
+
+def _decode(gui, path: str, size: tuple):
+    '''
+    Decodes an image into (width, height, RGBA floats), resized to (width, height) if Pillow is installed
+    '''
+    Image = _pillow()
+    if Image is None:
+        image = gui.load_image(path)
+        if image is None:
+            raise ValueError(f"Could not decode {path}")
+        width, height, _, data = image
+        return width, height, data
+    with Image.open(path) as image:
+        image = image.convert('RGBA')
+        if size and image.size != size:
+            image = image.resize(size, Image.LANCZOS)
+        return image.width, image.height, [channel / 255 for channel in image.tobytes()]
+
+
+class _Texture:
+    __slots__ = ('texture', 'bytes', 'users')
+
+    def __init__(self):
+        self.texture = None  # The texture ID once uploaded
+        self.bytes = 0
+        self.users = set()  # Items waiting for or showing the texture
+
+
+class TextureCache:
+    '''
+    Images uploaded as Dear PyGui textures, each shared by every item showing the same file at the same size.
+
+    Images are decoded on a background thread and uploaded on the main loop's thread, and items
+    show a placeholder until then. Textures no item shows any more are kept for reuse until the
+    cache exceeds its memory budget, and are then deleted least recently used first.
+    '''
+
+    BYTES_PER_PIXEL = 16  # Dear PyGui stores textures as four 32-bit floats per pixel
+
+    def __init__(self, manager, budget: int = 64 * 2 ** 20):
+        '''
+        :param manager: The manager whose Dear PyGui context holds the textures
+        :param budget: The bytes of texture memory to keep before evicting unused textures
+        '''
+        self.manager = manager
+        self.gui = manager.gui
+        self.budget = budget
+        self.used = 0  # Bytes of uploaded textures
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()  # (path, size) -> _Texture, least recently used first
+        self._registry = None
+        self._placeholder = None
+
+    def __len__(self):
+        return len(self._entries)
+
+    def placeholder(self):
+        '''
+        Returns the texture items show while their image is decoded, a translucent grey pixel
+        '''
+        if self._placeholder is None:
+            self._placeholder = self.gui.add_static_texture(width=1, height=1, default_value=[0.5, 0.5, 0.5, 0.25],
+                                                            parent=self._texture_registry())
+        return self._placeholder
+
+    def show(self, item: int, path: str, size: tuple = None):
+        '''
+        Shows an image on an item with a texture, such as an image button, now if it is cached
+        and otherwise once it is decoded. Call from the main loop's thread.
+
+        :param item: The item to configure
+        :param path: The image file
+        :param size: The (width, height) to decode the image at, its own size if None
+        '''
+        key = (os.path.abspath(path), tuple(size) if size else None)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            entry = self._entries[key] = _Texture()
+            self.manager._workers.submit(partial(_decode, self.gui, key[0], key[1]),
+                                         done=lambda future: self.manager.run_on_main(partial(self._upload, key, entry, future)))
+        else:
+            self.hits += 1
+            self._entries.move_to_end(key)
+        entry.users.add(item)
+        if entry.texture is not None:
+            self.gui.configure_item(item, texture_tag=entry.texture)
+
+    def _upload(self, key: tuple, entry: _Texture, future):
+        if self._entries.get(key) is not entry:  # Cleared while decoding
+            return
+        try:
+            width, height, data = future.result()
+        except Exception as e:
+            print(f"Error loading image {key[0]}: {e}")
+            del self._entries[key]  # Decoded again the next time it is shown
+            self.used -= entry.bytes
+            return
+        entry.texture = self.gui.add_static_texture(width=width, height=height, default_value=data,
+                                                    parent=self._texture_registry())
+        entry.bytes = width * height * self.BYTES_PER_PIXEL
+        self.used += entry.bytes
+        for item in list(entry.users):
+            if self.gui.does_item_exist(item):
+                self.gui.configure_item(item, texture_tag=entry.texture)
+            else:
+                entry.users.discard(item)
+        self._evict()
+        self.manager.mark_dirty()
+
+    def _evict(self):
+        '''
+        Deletes least recently used textures which no item shows until the cache is within its budget
+        '''
+        for key in list(self._entries):
+            if self.used <= self.budget:
+                return
+            entry = self._entries[key]
+            entry.users = {item for item in entry.users if self.gui.does_item_exist(item)}
+            if entry.texture is None or entry.users:
+                continue
+            self.gui.delete_item(entry.texture)
+            self.used -= entry.bytes
+            self.evictions += 1
+            del self._entries[key]
+
+    def _texture_registry(self):
+        if self._registry is None:
+            self._registry = self.gui.add_texture_registry()
+        return self._registry
+
+    def stats(self):
+        '''
+        Returns {'textures', 'used', 'budget', 'hits', 'misses', 'evictions'}, with sizes in bytes
+        '''
+        return {
+            'textures': len(self._entries),
+            'used': self.used,
+            'budget': self.budget,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+        }
+
+    def clear(self):
+        '''
+        Forgets every texture, e.g. after the Dear PyGui context was destroyed
+        '''
+        self._entries.clear()
+        self.used = 0
+        self._registry = None
+        self._placeholder = None
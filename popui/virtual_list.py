@@ -0,0 +1,222 @@
+import sys
+from collections.abc import Sequence
+from itertools import islice
+from typing import Callable, Iterable
+
+
+class VirtualList:
+    '''
+    A scrollable list which keeps Dear PyGui items only for the rows on screen.
+
+    A fixed pool of selectable rows is created once. Scrolling relabels the rows instead of
+    creating and deleting items, so building and rendering cost the same for ten entries
+    as for a million. Sequences are indexed directly without copying. Other iterables,
+    e.g. generators, are consumed only as far as the list has been scrolled.
+    '''
+
+    CHUNK = 256  # How many entries to pull from an iterable source at a time
+
+    def __init__(self,
+                 popup,
+                 source: Sequence | Iterable,
+                 callback: Callable,
+                 *,
+                 rows: int = 10,
+                 row_height: int = 20,
+                 format: Callable = str,
+                 close: bool = True,
+                 keyboard: bool = True,
+                 parent: int = None,
+                 width: int = -1):
+        '''
+        :param popup: The popup the list belongs to
+        :param source: The entries, a sequence or any iterable
+        :param callback: Called with the entry when a row is clicked or activated with the keyboard
+        :param rows: The number of visible rows
+        :param row_height: The height of a row in pixels
+        :param format: Turns an entry into its row label
+        :param close: Whether to close the popup after an entry is activated
+        :param keyboard: Navigate with the arrow, page, home and end keys and activate with return
+        :param parent: The container to add the list to, the current container by default
+        :param width: The width of the list
+        '''
+        self.popup = popup
+        self.gui = popup.gui
+        self.format = format
+        self.rows = rows
+        self.offset = 0
+        self.selected = 0
+        self._labels = [None] * rows
+        self.keybinds = []
+        self.refresh(source, update=False)
+
+        self.callback = popup._callable(callback)
+        self.close = close
+
+        gui = self.gui
+        parent = parent or gui.top_container_stack() or popup.root
+        with gui.group(horizontal=True, parent=parent) as self.group:
+            with gui.child_window(width=width - 20,  # Leave room for the scrollbar
+                                  height=rows * row_height + 8,
+                                  no_scrollbar=True) as self.container:
+                self._rows = [gui.add_selectable(label='',
+                                                 height=row_height - 4,
+                                                 callback=self._row_clicked,
+                                                 user_data=row)
+                              for row in range(rows)]
+            self.scrollbar = gui.add_slider_int(vertical=True,
+                                                width=16,
+                                                height=rows * row_height + 8,
+                                                min_value=0,
+                                                max_value=0,
+                                                format='',
+                                                callback=self._scrollbar_moved)
+        self.wheel_handler = gui.add_mouse_wheel_handler(parent=popup._key_registry, callback=self._wheel)
+        popup._own(self.delete)
+
+        if keyboard:
+            for key, move in (('up', -1), ('down', 1), ('prior', -rows), ('next', rows)):
+                self._add_keybind(key, lambda move=move: self.move(move))
+            self._add_keybind('home', lambda: self.select(0))
+            self._add_keybind('end', lambda: self.select(self._load_all() - 1))
+            self._add_keybind('return', self.activate)
+        self._update()
+
+    def __len__(self):
+        return len(self._source)
+
+    def __getitem__(self, index: int):
+        self._load(index + 1)
+        return self._source[index]
+
+    def _add_keybind(self, key: str, callback: Callable):
+        self.keybinds.append(self.popup.add_keybind(key, callback, condition=self.popup._is_visible(self.container)))
+
+    def refresh(self, source: Sequence | Iterable, update: bool = True):
+        '''
+        Replaces the entries, keeping the scroll position and selection where possible
+        '''
+        if isinstance(source, Sequence):
+            self._source, self._iterator = source, None
+        else:
+            self._source, self._iterator = [], iter(source)
+        count = self._load(self.offset + self.rows)
+        self.offset = max(0, min(self.offset, count - self.rows))
+        self.selected = max(0, min(self.selected, count - 1))
+        if update:
+            self._update()
+
+    def _load(self, count: int):
+        '''
+        Pulls entries from an iterable source until it has at least count entries or is exhausted
+        '''
+        while self._iterator is not None and len(self._source) < count:
+            chunk = list(islice(self._iterator, max(self.CHUNK, count - len(self._source))))
+            self._source.extend(chunk)
+            if not chunk:
+                self._iterator = None
+        return len(self._source)
+
+    def _load_all(self):
+        return self._load(sys.maxsize)
+
+    def scroll(self, rows: int):
+        '''
+        Scrolls the list by a number of rows, down for positive numbers
+        '''
+        self.scroll_to(self.offset + rows)
+
+    def scroll_to(self, offset: int):
+        '''
+        Scrolls the list so that the entry at offset is the top row
+        '''
+        count = self._load(offset + self.rows)
+        offset = max(0, min(offset, count - self.rows))
+        if offset != self.offset:
+            self.offset = offset
+            self._update()
+
+    def select(self, index: int):
+        '''
+        Selects an entry, scrolling it into view
+        '''
+        count = self._load(index + 1)
+        index = max(0, min(index, count - 1))
+        self.selected = index
+        if index < self.offset:
+            self.offset = index
+        elif index >= self.offset + self.rows:
+            self.offset = index - self.rows + 1
+        self._update()
+
+    def move(self, rows: int):
+        '''
+        Moves the selection by a number of rows, down for positive numbers
+        '''
+        self.select(self.selected + rows)
+
+    @property
+    def selection(self):
+        '''
+        The selected entry, or None if the list is empty
+        '''
+        return self[self.selected] if self._load(self.selected + 1) > self.selected else None
+
+    def activate(self, index: int = None):
+        '''
+        Calls the callback with an entry, the selected one by default
+        '''
+        if index is not None:
+            self.select(index)
+        if self._load(self.selected + 1) <= self.selected:
+            return
+        if self.close:
+            self.popup.hide()
+        self.callback(self._source[self.selected])
+
+    def delete(self):
+        '''
+        Deletes the list's items and keybinds
+        '''
+        for keybind in self.keybinds:
+            self.popup.remove_keybind(keybind)
+        self.keybinds.clear()
+        for item in (self.wheel_handler, self.group):
+            if self.gui.does_item_exist(item):
+                self.gui.delete_item(item)
+
+    def _update(self):
+        '''
+        Relabels the row pool for the current offset. Only rows whose label changed are reconfigured.
+        '''
+        gui = self.gui
+        count = self._load(self.offset + self.rows + 1)
+        for row, item in enumerate(self._rows):
+            index = self.offset + row
+            label = self.format(self._source[index]) if index < count else None
+            if label != self._labels[row]:
+                if label is None:
+                    gui.configure_item(item, show=False)
+                elif self._labels[row] is None:
+                    gui.configure_item(item, label=label, show=True)
+                else:
+                    gui.configure_item(item, label=label)
+                self._labels[row] = label
+            gui.set_value(item, index == self.selected)
+        # An iterable source reports one more entry than it has loaded while it may have more
+        total = count if self._iterator is None else count + 1
+        last = max(total - self.rows, 0)
+        gui.configure_item(self.scrollbar, max_value=last)
+        gui.set_value(self.scrollbar, last - self.offset)  # Vertical sliders have their maximum at the top
+        self.popup.mark_dirty()
+
+    def _row_clicked(self, sender, app_data, row):
+        self.activate(self.offset + row)
+
+    def _scrollbar_moved(self, sender, value):
+        last = self.gui.get_item_configuration(self.scrollbar)['max_value']
+        self.scroll_to(last - value)
+
+    def _wheel(self, sender, delta):
+        if self.popup.manager.active is self.popup and self.gui.is_item_hovered(self.container):
+            self.scroll(-int(delta) * 3)
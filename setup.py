@@ -30,6 +30,9 @@ setup(
         'pywin32',
         'screeninfo'
     ],
+    entry_points={
+        'console_scripts': ['popui = popui.daemon:main'],
+    },
     keywords=['gui', 'popup', 'dearpygui', 'autohotkey'],
     classifiers=[
         'Intended Audience :: Developers',
@@ -0,0 +1,38 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+# The smallest run of each benchmark, to check that it still works rather than to measure anything
+BENCHMARKS = {
+    'daemon': ['--simulated', '--runs', '2', '--buttons', '5'],
+    'executor': ['--simulated', '--clicks', '1', '--work', '1'],
+    'fonts': ['--simulated'],
+    'hot_paths': ['--iterations', '50'],
+    'import_time': ['--runs', '1', '--max-ms', '1000', '--max-popup-ms', '10000'],
+    'lazy_sections': ['--simulated', '--tabs', '2', '--items', '5'],
+    'manager': ['--simulated', '--popups', '1', '2', '--frames', '5'],
+    'palette': ['--entries', '500', '--query', 'ab'],
+    'render_scheduler': ['--simulated', '--seconds', '0.2'],
+    'round_trips': ['--toggles', '2', '--latency', '0'],
+    'soak': ['--simulated', '--cycles', '50', '--every', '10', '--max-warm-up', '200', '--max-growth', '100000'],
+    'startup': ['--simulated', '--buttons', '5', '--runs', '1'],
+    'virtual_list': ['--simulated', '--counts', '10', '--frames', '5'],
+}
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_every_benchmark_is_run():
+    modules = {name[:-3] for name in os.listdir(os.path.join(ROOT, 'benchmarks'))
+               if name.endswith('.py') and name != '__init__.py'}
+    assert modules == set(BENCHMARKS)
+
+
+@pytest.mark.parametrize('name', BENCHMARKS)
+def test_benchmark_runs(name):
+    result = subprocess.run([sys.executable, '-m', f'benchmarks.{name}', *BENCHMARKS[name]],
+                            cwd=ROOT, capture_output=True, text=True, timeout=300)
+    assert result.returncode == 0, result.stdout + result.stderr
+    assert 'Task was destroyed but it is pending' not in result.stderr
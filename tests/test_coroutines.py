@@ -0,0 +1,50 @@
+import asyncio
+import threading
+from time import perf_counter
+
+from popui import Popup
+from popui.simulated import SimulatedBackend
+
+
+def test_coroutine_callback_does_not_block_frames_under_block():
+    finished = threading.Event()
+
+    async def slow():
+        await asyncio.sleep(0.3)
+        finished.set()
+
+    popup = Popup(None, lambda popup: None, backend=SimulatedBackend())
+    popup.show()
+    popup.step()
+    start = perf_counter()
+    popup.manager.run_coroutine(slow())
+    frames = 0
+    while not finished.is_set() and perf_counter() - start < 5:
+        popup.step()
+        frames += 1
+        if frames == 5:
+            assert perf_counter() - start < 0.2  # Frames kept rendering while the coroutine was pending
+    assert finished.is_set()
+    assert frames > 5
+    popup.quit()
+    popup.step()
+
+
+def test_run_async_leaves_other_tasks_the_frame():
+    popup = Popup(None, lambda popup: None, backend=SimulatedBackend(refresh_rate=60))
+    popup.show()
+
+    async def main():
+        runner = asyncio.create_task(popup.run_async())
+        await asyncio.sleep(0.05)
+        latencies = []
+        for _ in range(20):
+            start = perf_counter()
+            await asyncio.sleep(0.001)
+            latencies.append(perf_counter() - start)
+        assert not popup.gui.is_viewport_vsync_on()
+        popup.quit()
+        await runner
+        return sorted(latencies)[len(latencies) // 2]
+
+    assert asyncio.run(main()) < 0.008  # A blocking vsync wait would delay the task by a whole frame
@@ -0,0 +1,71 @@
+import threading
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Listener, Pipe
+from time import perf_counter
+
+import pytest
+
+from popui.daemon import PopupDaemon, request
+from popui.manager import PopupManager
+from popui.simulated import SimulatedBackend
+
+
+def run_request(daemon: PopupDaemon, message: dict, connection=None, seconds: float = 5):
+    '''
+    Handles a request on a client thread while stepping the main loop, and returns the response
+    '''
+    responses = []
+    thread = threading.Thread(target=lambda: responses.append(daemon.handle(message, connection)), daemon=True)
+    thread.start()
+    start = perf_counter()
+    while thread.is_alive() and perf_counter() - start < seconds:
+        daemon.manager.step()
+    thread.join(0)
+    daemon.manager.step()
+    return responses[0] if responses else None
+
+
+def test_choose_times_out_without_a_selection():
+    daemon = PopupDaemon(PopupManager(backend=SimulatedBackend()), timeout=0.3)
+    assert run_request(daemon, {'op': 'choose', 'items': ['a', 'b']}) == {'ok': True, 'index': None, 'choice': None}
+    assert not daemon.chooser.open
+    assert daemon._chooser_lock.acquire(blocking=False)
+    daemon._chooser_lock.release()
+
+
+def test_choose_is_cancelled_when_the_client_disconnects():
+    daemon = PopupDaemon(PopupManager(backend=SimulatedBackend()), timeout=60)
+    server, client = Pipe()
+    threading.Timer(0.3, client.close).start()
+    start = perf_counter()
+    response = run_request(daemon, {'op': 'choose', 'items': ['a', 'b']}, server)
+    assert response == {'ok': True, 'index': None, 'choice': None}
+    assert perf_counter() - start < 5
+    assert not daemon.chooser.open
+    assert run_request(daemon, {'op': 'ping'}) == {'ok': True}
+
+
+def test_show_times_out_when_the_main_loop_is_stuck():
+    daemon = PopupDaemon(PopupManager(backend=SimulatedBackend()), timeout=0.3)
+    daemon.add('launcher', lambda popup: None)
+    start = perf_counter()
+    response = daemon.handle({'op': 'show', 'popup': 'launcher'})  # Nothing steps the main loop
+    assert response == {'ok': False, 'error': "Timed out waiting for the main loop"}
+    assert perf_counter() - start < 5
+
+
+def test_clients_with_the_wrong_authkey_do_not_stop_the_daemon(tmp_path):
+    daemon = PopupDaemon(PopupManager(backend=SimulatedBackend()), authkey=b'secret')
+    address = str(tmp_path / 'popui.sock')
+    daemon.listener = Listener(address, 'AF_UNIX', authkey=daemon.authkey)
+    thread = threading.Thread(target=daemon._accept, daemon=True)
+    thread.start()
+    try:
+        with pytest.raises(AuthenticationError):
+            request({'op': 'ping'}, address, b'wrong')
+        thread.join(0.2)
+        assert thread.is_alive()
+        assert request({'op': 'ping'}, address, b'secret') == {'ok': True}
+    finally:
+        listener, daemon.listener = daemon.listener, None
+        listener.close()
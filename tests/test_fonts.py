@@ -0,0 +1,28 @@
+from screeninfo import Monitor
+
+from popui.manager import PopupManager
+from popui.simulated import SimulatedBackend
+
+
+def show_on_high_dpi_monitor(**manager_args):
+    backend = SimulatedBackend(monitors=[Monitor(x=0, y=0, width=1920, height=1080, is_primary=True),
+                                         Monitor(x=1920, y=0, width=3840, height=2160)],
+                               dpis=[96, 192])
+    manager = PopupManager(backend=backend, **manager_args)
+    manager.fonts.cache_dir = False
+    popup = manager.add(None, lambda popup: None)
+    backend.desktop.mouse = (3000, 500)
+    popup.show()
+    popup.step()
+    scale = popup.gui.get_global_font_scale()
+    popup.quit()
+    popup.step()
+    return scale
+
+
+def test_builtin_font_is_not_scaled_by_default():
+    assert show_on_high_dpi_monitor() == 1.0
+
+
+def test_builtin_font_is_scaled_on_request():
+    assert show_on_high_dpi_monitor(scale_builtin_font=True) == 2.0
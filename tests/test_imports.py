@@ -0,0 +1,18 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from benchmarks.import_time import DEFERRED
+
+
+@pytest.mark.parametrize('statement', ['import popui', 'from popui import Popup'])
+def test_heavy_modules_are_not_imported(statement, tmp_path):
+    (tmp_path / 'PIL').mkdir()  # An importable Pillow whether or not it is installed
+    (tmp_path / 'PIL' / '__init__.py').write_text('')
+    (tmp_path / 'PIL' / 'Image.py').write_text('')
+    environment = dict(os.environ, PYTHONPATH=os.pathsep.join([os.getcwd(), str(tmp_path)]))
+    check = f'{statement}\nimport sys\nprint(sorted({{name.split(".")[0] for name in sys.modules}} & {set(DEFERRED)!r}))'
+    result = subprocess.run([sys.executable, '-c', check], capture_output=True, text=True, check=True, env=environment)
+    assert result.stdout.strip() == '[]'
@@ -0,0 +1,67 @@
+from popui import Popup
+from popui.keybinds import KeybindDispatcher
+from popui.keys import KEYS
+from popui.simulated import SimulatedBackend
+
+
+def test_inactive_keybind_does_not_shadow_older_active_one():
+    keybinds = KeybindDispatcher(lambda key: False)
+    older = keybinds.add(KEYS['s'], (), 0, lambda: None, condition=lambda: True)
+    keybinds.add(KEYS['s'], (), 0, lambda: None, condition=lambda: False)
+    assert keybinds.resolve(0, KEYS['s']) is older
+
+
+def test_condition_is_evaluated_on_every_resolve():
+    active = {'newer': False}
+    keybinds = KeybindDispatcher(lambda key: False)
+    older = keybinds.add(KEYS['s'], (), 0, lambda: None)
+    newer = keybinds.add(KEYS['s'], (), 0, lambda: None, condition=lambda: active['newer'])
+    assert keybinds.resolve(0, KEYS['s']) is older
+    active['newer'] = True
+    assert keybinds.resolve(0, KEYS['s']) is newer
+
+
+def test_same_key_buttons_on_different_tabs_fire_the_visible_one():
+    pressed = []
+
+    def build(popup: Popup):
+        with popup.gui.tab_bar(parent=popup.root) as popup.tab_bar:
+            with popup.gui.tab(label='A') as popup.tab_a:
+                popup.add_button('Save A', lambda: pressed.append('A'), close=False, keybind='s')
+            with popup.gui.tab(label='B') as popup.tab_b:
+                popup.add_button('Save B', lambda: pressed.append('B'), close=False, keybind='s')
+
+    popup = Popup(None, build, backend=SimulatedBackend())
+    popup.show()
+    popup.step()
+    for tab, expected in ((popup.tab_a, 'A'), (popup.tab_b, 'B'), (popup.tab_a, 'A')):
+        popup.gui.set_value(popup.tab_bar, tab)
+        popup.gui.press_key(KEYS['s'])
+        popup.step()
+        popup.step()
+        assert pressed[-1] == expected
+    assert pressed == ['A', 'B', 'A']
+    popup.quit()
+    popup.step()
+
+
+def test_virtual_lists_on_different_tabs_keep_their_arrow_keys():
+    activated = []
+
+    def build(popup: Popup):
+        with popup.gui.tab_bar(parent=popup.root) as popup.tab_bar:
+            with popup.gui.tab(label='A') as popup.tab_a:
+                popup.add_virtual_list(['a1', 'a2'], activated.append, rows=2, close=False)
+            with popup.gui.tab(label='B'):
+                popup.add_virtual_list(['b1', 'b2'], activated.append, rows=2, close=False)
+
+    popup = Popup(None, build, backend=SimulatedBackend())
+    popup.show()
+    popup.step()
+    popup.gui.set_value(popup.tab_bar, popup.tab_a)
+    popup.gui.press_key(KEYS['return'])
+    popup.step()
+    popup.step()
+    assert activated and activated[-1].startswith('a')
+    popup.quit()
+    popup.step()
@@ -0,0 +1,41 @@
+import json
+import os
+
+from popui import Popup
+from popui.layout import load_plan
+from popui.simulated import SimulatedBackend
+
+
+def write_layout(path, label: str):
+    path.write_text(json.dumps([{'button': label, 'callback': 'no_op'}]))
+
+
+def test_plan_cache_keeps_the_latest_plan_of_each_file(tmp_path):
+    cache_dir = tmp_path / 'cache'
+    first, second = tmp_path / 'first.json', tmp_path / 'second.json'
+    write_layout(second, 'Other')
+    load_plan(str(second), str(cache_dir))
+    for label in ('Copy', 'Paste', 'Cut'):
+        write_layout(first, label)
+        assert load_plan(str(first), str(cache_dir))[0]['args']['label'] == label
+    assert len(os.listdir(cache_dir)) == 2
+    assert load_plan(str(second), str(cache_dir))[0]['args']['label'] == 'Other'
+
+
+def test_watch_after_stop_watching(tmp_path):
+    path = tmp_path / 'layout.json'
+    write_layout(path, 'Copy')
+    popup = Popup(None, lambda popup: None, backend=SimulatedBackend())
+    layout = popup.add_layout(str(path), cache_dir=False)
+    layout.watch(0.01)
+    first = layout._watcher
+    layout.stop_watching()
+    assert not first.is_alive()
+    layout.watch(0.01)
+    second = layout._watcher
+    first.join(0.1)
+    assert second.is_alive()
+    layout.stop_watching()
+    assert not second.is_alive()
+    popup.quit()
+    popup.step()
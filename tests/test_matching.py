@@ -0,0 +1,38 @@
+import subprocess
+import sys
+from itertools import count
+from types import SimpleNamespace
+
+from popui.matching import ApplicationMatcher
+
+_ids = count(1)
+
+
+def window(title: str, exe: str = 'notepad.exe', class_: str = 'Notepad'):
+    return SimpleNamespace(id=next(_ids), title=title, get_exe=lambda: exe, get_class=lambda: class_)
+
+
+def test_unprefixed_title_with_glob_characters_matches_exactly():
+    matcher = ApplicationMatcher('notes.txt [Read-Only] - Notepad')
+    assert matcher.match(window('notes.txt [Read-Only] - Notepad')) is not None
+    assert matcher.match(window('notes.txt R - Notepad')) is None
+
+
+def test_glob_prefix():
+    matcher = ApplicationMatcher('ahk_exe glob:code*.exe')
+    assert matcher.match(window('main.py', exe='Code - Insiders.exe')) is not None
+    assert matcher.match(window('main.py', exe='notepad.exe')) is None
+    assert ApplicationMatcher('ahk_exe code*.exe').match(window('main.py', exe='code.exe')) is None
+
+
+def test_regex_prefix():
+    matcher = ApplicationMatcher(r'ahk_exe re:(code|notepad)\.exe')
+    assert matcher.match(window('main.py', exe='notepad.exe')) is not None
+    assert matcher.match(window('main.py', exe='explorer.exe')) is None
+
+
+def test_popup_compiles_without_invalid_escape_warnings():
+    result = subprocess.run([sys.executable, '-W', 'error', '-c',
+                             'import ast, popui.popup, inspect; ast.parse(inspect.getsource(popui.popup))'],
+                            capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
@@ -0,0 +1,19 @@
+from screeninfo import Monitor
+
+from popui.monitors import BASE_DPI, MonitorIndex
+
+
+def test_no_monitors():
+    index = MonitorIndex(lambda: [], lambda: None, lambda monitor: 144)
+    assert index.monitor_at(10, 10) is None
+    assert index.nearest(10, 10) is None
+    assert index.dpi_at(10, 10) == BASE_DPI
+
+
+def test_monitors_disconnected_after_refresh():
+    monitors = [Monitor(x=0, y=0, width=1920, height=1080)]
+    index = MonitorIndex(lambda: monitors, lambda: len(monitors), lambda monitor: 144)
+    assert index.monitor_at(10, 10) is monitors[0]
+    monitors.clear()
+    assert index.monitor_at(10, 10) is None
+    assert index.dpi_at(10, 10) == BASE_DPI
@@ -0,0 +1,21 @@
+from benchmarks.palette import make_labels
+from popui.palette import FuzzyIndex
+
+
+def test_single_character_results_without_scoring():
+    labels = make_labels(5000)
+    index = FuzzyIndex(labels)
+    search = index.search('O')
+    assert search.ready(50)
+    assert not search.done
+    full = FuzzyIndex(labels).search('o')
+    full.run()
+    assert list(search.results(50)) == list(full.results(50))
+
+
+def test_single_character_with_too_few_prefix_matches_is_scored():
+    index = FuzzyIndex(['Open', 'Close', 'Reopen', 'Zoom'])
+    search = index.search('o')
+    assert not search.ready(3)
+    search.run()
+    assert [index.labels[id_] for id_ in search.results(3)] == ['Open', 'Zoom', 'Close']
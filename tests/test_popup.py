@@ -0,0 +1,15 @@
+from popui import Popup
+from popui.simulated import SimulatedBackend
+
+
+def test_hide_before_a_lazy_popup_is_shown():
+    popup = Popup(None, lambda popup: None, backend=SimulatedBackend(), lazy=True)
+    popup.hide()
+    assert not popup.built
+    popup.show()
+    popup.step()
+    popup.hide()
+    popup.hide()
+    assert not popup.open
+    popup.quit()
+    popup.step()
@@ -0,0 +1,23 @@
+from popui.profiler import MAX_NAMES, OTHER, Profiler
+
+
+def test_names_past_the_limit_are_recorded_as_other():
+    profiler = Profiler(capacity=8, slow_callback=None)
+    for i in range(MAX_NAMES + 10):
+        profiler.record(f'callback {i}', 'callback', i, 1)
+    profiler.record('update', 'frame', 0, 1)
+    assert len(profiler._name_list) <= MAX_NAMES
+    names = [name for name, _, _, _, _ in profiler.spans()]
+    assert names[:-1] == [OTHER] * 7
+    assert profiler.spans()[-1][:2] == (OTHER, 'frame')
+    profiler.record('callback 0', 'callback', 0, 1)
+    assert profiler.spans()[-1][0] == 'callback 0'
+
+
+def test_wrap_never_raises_from_recording():
+    profiler = Profiler(capacity=8, slow_callback=None)
+
+    def fail(*args):
+        raise OverflowError('full')
+    profiler.record = fail
+    assert profiler.wrap(lambda: 'result', 'callback')() == 'result'
@@ -0,0 +1,53 @@
+import struct
+import zlib
+from time import perf_counter
+
+from popui import Popup
+from popui.executor import CallbackExecutor
+from popui.simulated import SimulatedBackend
+
+
+def write_png(path, width: int, height: int):
+    def chunk(kind: bytes, data: bytes):
+        return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+    rows = b''.join(b'\x00' + b'\x00\x00\x00\xff' * width for _ in range(height))
+    with open(path, 'wb') as file:
+        file.write(b'\x89PNG\r\n\x1a\n' + chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 6, 0, 0, 0))
+                   + chunk(b'IDAT', zlib.compress(rows)) + chunk(b'IEND', b''))
+
+
+def test_icons_load_with_a_process_executor(tmp_path):
+    icon = tmp_path / 'icon.png'
+    write_png(icon, 4, 4)
+    buttons = []
+    popup = Popup(None, lambda popup: buttons.append(popup.add_icon_button(str(icon), print, size=4)),
+                  backend=SimulatedBackend(), executor=CallbackExecutor(processes=True))
+    popup.show()
+    start = perf_counter()
+    while popup.manager.textures.stats()['used'] == 0 and perf_counter() - start < 5:
+        popup.step()
+    assert popup.manager.textures.stats()['used'] > 0
+    assert popup.gui.get_item_configuration(buttons[0])['texture_tag'] != popup.manager.textures.placeholder()
+    assert popup.manager.executor._pool is None  # The user's process pool was never started
+    popup.quit()
+    popup.step()
+
+
+def test_failed_decode_is_retried(tmp_path):
+    icon = tmp_path / 'icon.png'
+    icon.write_bytes(b'not an image')
+    popup = Popup(None, lambda popup: None, backend=SimulatedBackend())
+    textures = popup.manager.textures
+    popup.show()
+    popup.add_icon_button(str(icon), print, size=4)
+    start = perf_counter()
+    while len(textures) and perf_counter() - start < 5:
+        popup.step()
+    assert len(textures) == 0
+    write_png(icon, 4, 4)
+    button = popup.add_icon_button(str(icon), print, size=4)
+    while textures.stats()['used'] == 0 and perf_counter() - start < 5:
+        popup.step()
+    assert popup.gui.get_item_configuration(button)['texture_tag'] != textures.placeholder()
+    popup.quit()
+    popup.step()